@@ -6,18 +6,121 @@ Script executor – runs a Python script in a background thread via QProcess.
 
 Emitted signals
 ---------------
-output_updated(str)          – a decoded line of stdout/stderr output
+output_updated(str)          – a batch of decoded stdout/stderr lines
 progress_updated(float, float, str)  – parsed [PROGRESS] line values
 process_finished(int)        – process exit code
+
+Output batching
+---------------
+Lines are not emitted one by one.  They are collected and flushed as a single
+``output_updated`` chunk once ``flush_interval_ms`` has elapsed since the last
+flush or once ``flush_max_bytes`` of text is pending, whichever comes first.
+Only the most recent ``[PROGRESS]`` value per flush is emitted.  Everything
+pending is flushed before ``process_finished`` is emitted.
+
+输出批处理
+----------
+输出行不会逐行发出，而是先收集，当距上次发送已超过 ``flush_interval_ms`` 或
+待发送文本达到 ``flush_max_bytes`` 时（以先到者为准），作为一个
+``output_updated`` 块统一发出。每次发送只保留最新的 ``[PROGRESS]`` 值。
+发出 ``process_finished`` 前会先发送所有待发送内容。
 """
 
+import codecs
 import os
 import platform
 import shlex
 import sys
+import time
 
 from PyQt6.QtCore import QProcess, QThread, pyqtSignal
 
+# Default flush policy: at most one output signal every 40 ms, or sooner
+# once 64 KiB of text is pending.
+# 默认发送策略：每 40 毫秒最多发出一次输出信号；待发送文本达到 64 KiB 时提前发送。
+DEFAULT_FLUSH_INTERVAL_MS = 40
+DEFAULT_FLUSH_MAX_BYTES = 64 * 1024
+# Seconds a terminated process gets to exit before it is killed.
+# 被终止的进程在被强制结束前可用于退出的秒数。
+KILL_TIMEOUT_SECONDS = 3
+
+
+class LineDecoder:
+    """Incrementally decode a byte stream into complete text lines.
+
+    Bytes go through an incremental UTF-8 decoder, so a multibyte character
+    split across two reads is completed by the next read instead of
+    corrupting the chunk.  Text after the last newline is carried over until
+    the rest of the line arrives.  If the stream turns out not to be UTF-8,
+    the decoder switches once – for the rest of the stream – to
+    *fallback_encoding* with ``errors='replace'``.
+
+    将字节流增量解码为完整的文本行。
+    字节经由增量 UTF-8 解码器处理，跨两次读取的多字节字符会由下一次读取补全，
+    而不会破坏整个数据块。最后一个换行符之后的文本会暂存，直到该行剩余部分到达。
+    若数据流并非 UTF-8，解码器会一次性切换到 *fallback_encoding*
+    （errors='replace'），并用于数据流的剩余部分。
+    """
+
+    def __init__(self, fallback_encoding: str = "utf-8") -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")("strict")
+        self._fallback_encoding = fallback_encoding
+        self._using_fallback = False
+        self._carry = ""
+
+    def feed(self, data: bytes) -> list[str]:
+        """Decode *data* and return the lines it completes (without newlines).
+
+        解码 *data* 并返回由其补全的各行（不含换行符）。
+        """
+        text = self._decode(data, final=False)
+        if "\n" not in text:
+            self._carry += text
+            return []
+        lines = (self._carry + text).split("\n")
+        self._carry = lines.pop()
+        return lines
+
+    def finish(self) -> list[str]:
+        """Flush the decoder at end of stream and return any remaining line.
+
+        在数据流结束时刷新解码器并返回剩余的行。
+        """
+        lines = self.feed(b"")
+        tail = self._carry + self._decode(b"", final=True)
+        self._carry = ""
+        if tail:
+            lines.append(tail)
+        return lines
+
+    def take_partial(self) -> str:
+        """Return and clear the incomplete line currently carried over.
+
+        返回并清空当前暂存的未完成行。
+        """
+        partial, self._carry = self._carry, ""
+        return partial
+
+    @property
+    def partial(self) -> str:
+        """The incomplete line currently carried over / 当前暂存的未完成行"""
+        return self._carry
+
+    def _decode(self, data: bytes, final: bool) -> str:
+        if not self._using_fallback:
+            try:
+                return self._decoder.decode(data, final)
+            except UnicodeDecodeError:
+                # Not UTF-8 after all: hand the undecoded bytes to the fallback.
+                # 数据并非 UTF-8：将尚未解码的字节交给备用解码器。
+                pending = self._decoder.getstate()[0]
+                self._decoder = codecs.getincrementaldecoder(self._fallback_encoding)(
+                    "replace"
+                )
+                self._using_fallback = True
+                data = pending + data
+        return self._decoder.decode(data, final)
+
 
 class ScriptExecutor(QThread):
     """Executes a script in a separate thread to keep the GUI responsive.
@@ -25,28 +128,58 @@ class ScriptExecutor(QThread):
     在独立线程中执行脚本，以保持 GUI 响应性。
     """
 
-    # Signal carrying a decoded output line / 携带已解码输出行的信号
+    # Signal carrying a batch of decoded output lines / 携带一批已解码输出行的信号
     output_updated = pyqtSignal(str)
     # Signal carrying (current, maximum, description) progress values / 携带进度值的信号
     progress_updated = pyqtSignal(float, float, str)
     # Signal carrying the process exit code / 携带进程退出码的信号
     process_finished = pyqtSignal(int)
 
-    def __init__(self, command: list, working_dir: str | None = None) -> None:
+    def __init__(
+        self,
+        command: list,
+        working_dir: str | None = None,
+        flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS,
+        flush_max_bytes: int = DEFAULT_FLUSH_MAX_BYTES,
+    ) -> None:
         """
         :param command: List of command arguments (script path + args).
                         命令参数列表（脚本路径 + 参数）。
         :param working_dir: Working directory for the subprocess.
                             子进程的工作目录。
+        :param flush_interval_ms: Maximum delay before pending output is emitted;
+                                  ``0`` emits after every read.
+                                  待发送输出的最长延迟；为 0 时每次读取后立即发送。
+        :param flush_max_bytes: Pending-text size that forces an early flush.
+                                强制提前发送的待发送文本大小。
         """
         super().__init__()
         self.command = command
         self.working_dir = working_dir
+        self.flush_interval_ms = max(0, flush_interval_ms)
+        self.flush_max_bytes = max(1, flush_max_bytes)
         self.process: QProcess | None = None
         # Choose encoding based on OS to handle console output correctly.
         # 根据操作系统选择编码，以正确处理控制台输出。
         self.output_encoding = "gbk" if platform.system() == "Windows" else "utf-8"
 
+        # Pending output batch and the latest unsent progress value.
+        # 待发送的输出批次以及最新的未发送进度值。
+        self._pending_lines: list[str] = []
+        self._pending_size = 0
+        self._pending_progress: tuple[float, float, str] | None = None
+        self._last_flush = time.monotonic()
+
+        # Streaming decoder for the merged stdout/stderr channel.
+        # 合并后的 stdout/stderr 通道的流式解码器。
+        self._line_decoder = LineDecoder(self.output_encoding)
+        self._last_data = time.monotonic()
+
+        # When terminate() was requested, and whether the request was sent.
+        # 请求 terminate() 的时间，以及是否已向进程发出该请求。
+        self._stop_requested: float | None = None
+        self._terminate_sent = False
+
     # ------------------------------------------------------------------
     # QThread interface
     # ------------------------------------------------------------------
@@ -72,11 +205,20 @@ class ScriptExecutor(QThread):
                 self.process.setWorkingDirectory(self.working_dir)
 
             self.process.readyReadStandardOutput.connect(self._handle_output)
-            self.process.finished.connect(self.process_finished.emit)
+            self.process.finished.connect(self._on_process_finished)
 
             self.process.start(sys.executable, self.command)
-            self.process.waitForFinished(-1)  # -1 = wait indefinitely / 无限等待
+            # Wake up once per flush interval so slow output is not held back.
+            # 每个发送间隔唤醒一次，避免缓慢的输出被积压。
+            tick_ms = self.flush_interval_ms or DEFAULT_FLUSH_INTERVAL_MS
+            while self.process.state() != QProcess.ProcessState.NotRunning:
+                self._handle_stop_request()
+                self.process.waitForFinished(tick_ms)
+                self._release_stalled_partial()
+                self._flush_output(force=False)
+            self._flush_output(force=True)
         except Exception as exc:
+            self._flush_output(force=True)
             self.output_updated.emit(f"Error executing command: {exc}\n")
             self.process_finished.emit(1)
 
@@ -84,24 +226,47 @@ class ScriptExecutor(QThread):
     # Internal helpers
     # ------------------------------------------------------------------
 
+    def _handle_stop_request(self) -> None:
+        """Terminate the process once requested; kill it after the timeout.
+
+        Runs in this thread, which owns the QProcess, so ``terminate()`` never
+        blocks the caller.
+
+        收到请求后终止进程，超时后强制结束。在拥有该 QProcess 的本线程中执行，
+        因此 ``terminate()`` 不会阻塞调用方。
+        """
+        if self._stop_requested is None:
+            return
+        if not self._terminate_sent:
+            self.process.terminate()
+            self._terminate_sent = True
+        elif time.monotonic() - self._stop_requested >= KILL_TIMEOUT_SECONDS:
+            self.process.kill()
+
     def _handle_output(self) -> None:
-        """Read buffered output, decode it, and route each line.
+        """Read buffered output, decode it, and route each complete line.
 
         Parses ``[PROGRESS] current/max | description`` lines and emits
         *progress_updated*; all other lines go to *output_updated*.
 
-        读取缓冲输出、解码，并逐行路由。
+        读取缓冲输出、解码，并逐个路由完整的行。
         解析 [PROGRESS] 行并发出 progress_updated；其余行发出 output_updated。
         """
         if not self.process:
             return
         data: bytes = self.process.readAllStandardOutput().data()
-        try:
-            decoded_text = data.decode("utf-8")
-        except UnicodeDecodeError:
-            decoded_text = data.decode(self.output_encoding, errors="replace")
+        if data:
+            self._last_data = time.monotonic()
+        self._route_lines(self._line_decoder.feed(data))
+        self._flush_output(force=False)
+
+    def _route_lines(self, lines: list[str]) -> None:
+        """Queue output lines and record the latest progress value.
 
-        for line in decoded_text.strip().split("\n"):
+        将输出行加入队列，并记录最新的进度值。
+        """
+        for line in lines:
+            line = line.rstrip("\r")
             if not line.strip():
                 continue
             if line.startswith("[PROGRESS]"):
@@ -111,13 +276,67 @@ class ScriptExecutor(QThread):
                     current_str, max_str = progress_part.split("/", 1)
                     current = float(current_str.strip())
                     maximum = float(max_str.strip())
-                    self.progress_updated.emit(current, maximum, description.strip())
+                    self._pending_progress = (current, maximum, description.strip())
                 except (ValueError, IndexError) as exc:
-                    self.output_updated.emit(
-                        f"Invalid progress format: {line}\nError: {exc}\n"
-                    )
+                    self._queue_text(f"Invalid progress format: {line}\nError: {exc}\n")
             else:
-                self.output_updated.emit(line + "\n")
+                self._queue_text(line + "\n")
+
+    def _release_stalled_partial(self) -> None:
+        """Emit an unterminated line once the process has gone quiet.
+
+        Keeps interactive prompts such as ``input('Continue? ')`` visible.
+        Partial ``[PROGRESS]`` lines are held until they are complete.
+
+        进程静默后发送未以换行结尾的行，使 ``input('Continue? ')`` 等交互提示
+        可见。不完整的 [PROGRESS] 行会保留到完整后再处理。
+        """
+        partial = self._line_decoder.partial
+        # Hold anything that is, or may still become, a [PROGRESS] line.
+        # 保留已经是（或可能成为）[PROGRESS] 行的内容。
+        if not partial or partial.startswith("[PROGRESS]"[: len(partial)]):
+            return
+        if (time.monotonic() - self._last_data) * 1000 < self.flush_interval_ms:
+            return
+        self._queue_text(self._line_decoder.take_partial())
+
+    def _queue_text(self, text: str) -> None:
+        """Add *text* to the pending output batch.
+
+        将 *text* 加入待发送的输出批次。
+        """
+        self._pending_lines.append(text)
+        self._pending_size += len(text)
+
+    def _flush_output(self, force: bool) -> None:
+        """Emit the pending batch if the flush policy says so (or if *force*).
+
+        按发送策略（或在 *force* 为真时）发出待发送批次。
+        """
+        if not self._pending_lines and self._pending_progress is None:
+            return
+        now = time.monotonic()
+        due = (now - self._last_flush) * 1000 >= self.flush_interval_ms
+        if not (force or due or self._pending_size >= self.flush_max_bytes):
+            return
+        if self._pending_lines:
+            self.output_updated.emit("".join(self._pending_lines))
+            self._pending_lines = []
+            self._pending_size = 0
+        if self._pending_progress is not None:
+            self.progress_updated.emit(*self._pending_progress)
+            self._pending_progress = None
+        self._last_flush = now
+
+    def _on_process_finished(self, exit_code: int) -> None:
+        """Drain remaining output, flush it, then report the exit code.
+
+        读取剩余输出并全部发送，然后上报退出码。
+        """
+        self._handle_output()
+        self._route_lines(self._line_decoder.finish())
+        self._flush_output(force=True)
+        self.process_finished.emit(exit_code)
 
     # ------------------------------------------------------------------
     # Public control methods
@@ -135,14 +354,16 @@ class ScriptExecutor(QThread):
             self.process.write(f"{text}\n".encode("utf-8"))
 
     def terminate(self) -> None:
-        """Gracefully stop the running process; kill it after a 3-second timeout.
+        """Ask the process to stop; it is killed if still running after
+        ``KILL_TIMEOUT_SECONDS``.
+
+        Returns immediately: the executor's own thread sends the request and
+        does the kill.  Wait for the thread (``QThread.wait``) to know that the
+        process is gone.
 
-        优雅地停止正在运行的进程；3 秒超时后强制结束。
+        请求进程停止；若 ``KILL_TIMEOUT_SECONDS`` 秒后仍在运行则强制结束。
+        本方法立即返回：由执行器自身的线程发送请求并强制结束进程。如需确认
+        进程已退出，请等待该线程（``QThread.wait``）。
         """
-        if (
-            self.process
-            and self.process.state() == QProcess.ProcessState.Running
-        ):
-            self.process.terminate()
-            if not self.process.waitForFinished(3000):
-                self.process.kill()
+        if self._stop_requested is None:
+            self._stop_requested = time.monotonic()
@@ -0,0 +1,383 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Job manager – queues script runs and executes several of them at once.
+任务管理器 – 将脚本运行排队，并可同时执行多个任务。
+
+Each submitted run becomes a ``Job`` that owns its own ``ScriptExecutor``
+(or one per shard, see ``shard_commands``).
+The ``JobManager`` starts pending jobs in submission order while fewer than
+``max_concurrent`` jobs are running.
+
+每次提交的运行都会成为一个拥有独立 ``ScriptExecutor``（或每个分片一个，
+见 ``shard_commands``）的 ``Job``。
+当运行中的任务少于 ``max_concurrent`` 时，``JobManager`` 按提交顺序启动
+排队中的任务。
+
+Job states
+----------
+pending → running → finished | failed | stopped
+pending → stopped   (cancelled before it started / 启动前被取消)
+"""
+
+import time
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from core.executor import (
+    DEFAULT_FLUSH_INTERVAL_MS,
+    DEFAULT_FLUSH_MAX_BYTES,
+    ScriptExecutor,
+)
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_FINISHED = "finished"
+JOB_FAILED = "failed"
+JOB_STOPPED = "stopped"
+
+# Default number of jobs allowed to run at the same time.
+# 默认允许同时运行的任务数量。
+DEFAULT_MAX_CONCURRENT_JOBS = 2
+
+
+def tag_lines(text: str, prefix: str) -> str:
+    """Prepend *prefix* to every non-empty line of *text*.
+
+    为 *text* 中每个非空行加上前缀 *prefix*。
+    """
+    return "\n".join(prefix + line if line else line for line in text.split("\n"))
+
+
+def shard_commands(command: list[str], paths: list[str], shards: int) -> list[list[str]]:
+    """One command per shard: *command*, ``--shard K/N`` and all of *paths*.
+
+    Every shard gets the full path list, so it expands directories and picks
+    its output location like a single run; the script then keeps only its own
+    share of the files (``scripts/_shared/shards.py``).  Only scripts whose
+    docstring contains ``[parallel-shards]`` understand ``--shard``.
+
+    每个分片一条命令：*command*、``--shard K/N`` 以及全部 *paths*。每个分片
+    都收到完整的路径列表，因此会像单次运行一样展开目录并确定输出位置，之后
+    脚本只处理属于自己的那部分文件（见 ``scripts/_shared/shards.py``）。只有
+    文档字符串中含 ``[parallel-shards]`` 的脚本支持 ``--shard``。
+    """
+    if shards <= 1:
+        return [command + paths]
+    return [command + ["--shard", f"{index}/{shards}"] + paths for index in range(1, shards + 1)]
+
+
+class Job(QObject):
+    """A single queued script run, optionally fanned out over several shards.
+
+    Each shard is a separate ``ScriptExecutor`` process running the same
+    script on its share of the files.  Output from several shards is tagged
+    with the shard number and their ``[PROGRESS]`` streams are merged into one
+    aggregate value (sum of current over sum of maximum).
+
+    单个排队的脚本运行任务，可选择分散到多个分片。每个分片都是一个独立的
+    ``ScriptExecutor`` 进程，对其分到的文件运行同一脚本。多个分片的输出会标注
+    分片编号，其 ``[PROGRESS]`` 流会合并为一个总进度（当前值之和 / 最大值之和）。
+
+    Emitted signals
+    ---------------
+    output_updated(str)                  – a batch of output lines
+    progress_updated(float, float, str)  – parsed (aggregate) [PROGRESS] values
+    state_changed(str)                   – the job's new state
+    """
+
+    output_updated = pyqtSignal(str)
+    progress_updated = pyqtSignal(float, float, str)
+    state_changed = pyqtSignal(str)
+
+    def __init__(
+        self,
+        job_id: int,
+        title: str,
+        commands: list[list],
+        flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS,
+        flush_max_bytes: int = DEFAULT_FLUSH_MAX_BYTES,
+        parent: QObject | None = None,
+    ) -> None:
+        """
+        :param job_id: Sequential number shown in the queue view.
+                       在队列视图中显示的序号。
+        :param title: Human-readable job title (usually the script name).
+                      任务标题（通常为脚本名称）。
+        :param commands: One command (script path followed by its arguments)
+                         per shard.
+                         每个分片一条命令（脚本路径及其参数）。
+        """
+        super().__init__(parent)
+        self.job_id = job_id
+        self.title = title
+        self.commands = commands
+        self.flush_interval_ms = flush_interval_ms
+        self.flush_max_bytes = flush_max_bytes
+        self.state = JOB_PENDING
+        self.exit_code: int | None = None
+        self.executors: list[ScriptExecutor] = []
+        # Latest (current, maximum) of every shard; (0, 0) until it reports.
+        # 每个分片最近上报的（当前值, 最大值）；上报前为 (0, 0)。
+        self._progress: dict[int, tuple[float, float]] = {
+            index: (0.0, 0.0) for index in range(len(commands))
+        }
+        self._exit_codes: dict[int, int] = {}
+
+    @property
+    def shard_count(self) -> int:
+        return len(self.commands)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def is_active(self) -> bool:
+        """Return True while the job is pending or running / 任务排队或运行中时返回 True"""
+        return self.state in (JOB_PENDING, JOB_RUNNING)
+
+    def is_done(self) -> bool:
+        """Return True once the job ended and all its threads have exited.
+
+        任务已结束且其所有线程均已退出时返回 True。
+        """
+        if self.is_active():
+            return False
+        return not any(executor.isRunning() for executor in self.executors)
+
+    def start(self) -> None:
+        """Launch one ScriptExecutor per shard / 为每个分片启动一个 ScriptExecutor"""
+        if self.state != JOB_PENDING:
+            return
+        for index, command in enumerate(self.commands):
+            executor = ScriptExecutor(
+                command,
+                flush_interval_ms=self.flush_interval_ms,
+                flush_max_bytes=self.flush_max_bytes,
+            )
+            executor.output_updated.connect(
+                lambda text, i=index: self._on_output(i, text)
+            )
+            executor.progress_updated.connect(
+                lambda cur, mx, desc, i=index: self._on_progress(i, cur, mx, desc)
+            )
+            executor.process_finished.connect(
+                lambda code, i=index: self._on_process_finished(i, code)
+            )
+            self.executors.append(executor)
+        self._set_state(JOB_RUNNING)
+        for executor in self.executors:
+            executor.start()
+
+    def stop(self) -> None:
+        """Cancel a pending job or terminate a running one.
+
+        取消排队中的任务，或终止运行中的任务。
+        """
+        if self.state == JOB_PENDING:
+            self._set_state(JOB_STOPPED)
+        elif self.state == JOB_RUNNING:
+            # Mark first so the exit codes of the killed processes are ignored.
+            # terminate() does not block, so all shards are stopped at once.
+            # 先标记状态，使被终止进程的退出码被忽略。terminate() 不会阻塞，
+            # 因此所有分片同时停止。
+            self._set_state(JOB_STOPPED)
+            for executor in self.executors:
+                executor.terminate()
+
+    def wait(self, msecs: int) -> bool:
+        """Block until every shard's executor thread has finished.
+
+        Returns False if *msecs* ran out first.
+
+        阻塞直到所有分片的执行器线程结束；*msecs* 先耗尽时返回 False。
+        """
+        deadline = time.monotonic() + msecs / 1000
+        for executor in self.executors:
+            remaining = max(0, int((deadline - time.monotonic()) * 1000))
+            if not executor.wait(remaining):
+                return False
+        return True
+
+    def send_input(self, text: str) -> None:
+        """Forward *text* to the stdin of every running shard.
+
+        将 *text* 转发到每个运行中分片的 stdin。
+        """
+        if self.state != JOB_RUNNING:
+            return
+        for index, executor in enumerate(self.executors):
+            if index not in self._exit_codes:
+                executor.send_input(text)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _on_output(self, shard: int, text: str) -> None:
+        if self.shard_count > 1:
+            prefix = f"[{shard + 1}/{self.shard_count}] "
+            text = tag_lines(text, prefix)
+        self.output_updated.emit(text)
+
+    def _on_progress(self, shard: int, current: float, maximum: float, description: str) -> None:
+        if self.shard_count == 1:
+            self.progress_updated.emit(current, maximum, description)
+            return
+        self._progress[shard] = (current, maximum)
+        if any(
+            mx <= 0 and index not in self._exit_codes
+            for index, (_, mx) in self._progress.items()
+        ):
+            # A running shard has not reported its maximum yet, so the total
+            # would still grow and the bar jump back: show a busy bar (0, 0).
+            # 仍有运行中的分片未上报最大值，总量还会增长、进度条会回跳: 显示忙碌状态 (0, 0)。
+            total_current = total_max = 0.0
+        else:
+            total_current = sum(cur for cur, _ in self._progress.values())
+            total_max = sum(mx for _, mx in self._progress.values())
+        self.progress_updated.emit(
+            total_current, total_max, f"[{shard + 1}/{self.shard_count}] {description}"
+        )
+
+    def _on_process_finished(self, shard: int, exit_code: int) -> None:
+        self._exit_codes[shard] = exit_code
+        if len(self._exit_codes) < self.shard_count:
+            return
+        # The first failing shard decides the job's exit code.
+        # 由第一个失败的分片决定任务的退出码。
+        self.exit_code = next(
+            (self._exit_codes[i] for i in sorted(self._exit_codes) if self._exit_codes[i] != 0),
+            0,
+        )
+        if self.state == JOB_RUNNING:
+            self._set_state(JOB_FINISHED if self.exit_code == 0 else JOB_FAILED)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        self.state_changed.emit(state)
+
+
+class JobManager(QObject):
+    """Runs queued jobs under a concurrency limit.
+
+    在并发上限内运行排队的任务。
+
+    Emitted signals
+    ---------------
+    job_added(object)           – a new ``Job`` was queued
+    job_state_changed(object)   – a ``Job`` changed state
+    """
+
+    job_added = pyqtSignal(object)
+    job_state_changed = pyqtSignal(object)
+
+    def __init__(
+        self,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT_JOBS,
+        flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS,
+        flush_max_bytes: int = DEFAULT_FLUSH_MAX_BYTES,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.max_concurrent = max(1, max_concurrent)
+        self.flush_interval_ms = flush_interval_ms
+        self.flush_max_bytes = flush_max_bytes
+        self.jobs: list[Job] = []
+        self._next_id = 1
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def submit(self, title: str, commands: list[list]) -> Job:
+        """Queue *commands* (one per shard) as a new job and start it if a
+        slot is free.  A sharded job occupies a single slot.
+
+        将 *commands*（每个分片一条）作为新任务加入队列；若有空闲槽位则立即
+        启动。分片任务只占用一个槽位。
+        """
+        job = Job(
+            self._next_id,
+            title,
+            commands,
+            flush_interval_ms=self.flush_interval_ms,
+            flush_max_bytes=self.flush_max_bytes,
+            parent=self,
+        )
+        self._next_id += 1
+        job.state_changed.connect(lambda _state, j=job: self._on_job_state_changed(j))
+        self.jobs.append(job)
+        self.job_added.emit(job)
+        self._schedule()
+        return job
+
+    def set_max_concurrent(self, max_concurrent: int) -> None:
+        """Change the concurrency limit / 修改并发上限"""
+        self.max_concurrent = max(1, max_concurrent)
+        self._schedule()
+
+    def running_jobs(self) -> list[Job]:
+        return [job for job in self.jobs if job.state == JOB_RUNNING]
+
+    def pending_jobs(self) -> list[Job]:
+        return [job for job in self.jobs if job.state == JOB_PENDING]
+
+    def has_active_jobs(self) -> bool:
+        return any(job.is_active() for job in self.jobs)
+
+    def stop_all(self) -> None:
+        """Cancel every pending job and terminate every running one.
+
+        取消所有排队任务并终止所有运行中的任务。
+        """
+        for job in self.pending_jobs():
+            job.stop()
+        for job in self.running_jobs():
+            job.stop()
+
+    def wait_all(self, msecs: int) -> bool:
+        """Block until the processes of every stopped or finished job are gone.
+
+        Only for shutdown: ``stop_all`` itself never blocks.  Returns False if
+        *msecs* ran out first.
+
+        阻塞直到所有已停止或已结束任务的进程退出。仅用于退出程序时：
+        ``stop_all`` 本身从不阻塞。*msecs* 先耗尽时返回 False。
+        """
+        deadline = time.monotonic() + msecs / 1000
+        for job in self.jobs:
+            remaining = max(0, int((deadline - time.monotonic()) * 1000))
+            if not job.wait(remaining):
+                return False
+        return True
+
+    def clear_finished(self) -> list[Job]:
+        """Forget jobs that are no longer active and return them.
+
+        移除已不再活动的任务并返回它们。
+        """
+        done = [job for job in self.jobs if job.is_done()]
+        self.jobs = [job for job in self.jobs if not job.is_done()]
+        return done
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _on_job_state_changed(self, job: Job) -> None:
+        self.job_state_changed.emit(job)
+        if not job.is_active():
+            self._schedule()
+
+    def _schedule(self) -> None:
+        """Start pending jobs in order while slots are free.
+
+        在有空闲槽位时按顺序启动排队中的任务。
+        """
+        free_slots = self.max_concurrent - len(self.running_jobs())
+        for job in self.pending_jobs():
+            if free_slots <= 0:
+                break
+            job.start()
+            free_slots -= 1
@@ -6,16 +6,33 @@ Script registry – discovers scripts and parses their parameters.
 
 Parameter-parsing strategy (backward-compatible)
 -------------------------------------------------
-1. Try ``python script.py --gui-schema``.  If the script exits 0 and prints
-   valid JSON, use that schema directly.
-2. Otherwise fall back to running ``python script.py --help`` and applying a
-   regex heuristic – exactly as the original code did.
+1. If the script mentions ``--gui-schema``, try
+   ``python script.py --gui-schema``.  If the script exits 0 and prints valid
+   JSON, use that schema directly.
+2. Otherwise read the ``argparse`` declarations statically from the script's
+   AST (``core.static_schema``) – no subprocess at all.
+3. Only when static analysis is inconclusive fall back to running
+   ``python script.py --help`` and applying a regex heuristic – exactly as
+   the original code did.
+
+Results are memoised in a persistent cache (``schema_cache.json`` next to
+``config.ini``).  Each entry is keyed by the script path and stores the file's
+mtime, size and SHA-256 digest, so unchanged scripts are never re-spawned and
+edited scripts are re-parsed automatically.  A lookup only stats the file;
+the content is hashed when mtime or size differ.
 
 参数解析策略（向后兼容）
-1. 尝试 ``python script.py --gui-schema``。若脚本以 0 退出并打印有效 JSON，
-   则直接使用该 schema。
-2. 否则回退到运行 ``python script.py --help`` 并使用正则表达式启发式解析，
-   与原代码完全一致。
+1. 若脚本中出现 ``--gui-schema``，尝试 ``python script.py --gui-schema``。
+   若脚本以 0 退出并打印有效 JSON，则直接使用该 schema。
+2. 否则从脚本 AST 中静态读取 ``argparse`` 声明（``core.static_schema``），
+   完全不启动子进程。
+3. 仅当静态分析无法得出结论时，才回退到运行 ``python script.py --help``
+   并使用正则表达式启发式解析，与原代码完全一致。
+
+解析结果会缓存到持久化文件（与 ``config.ini`` 同目录的 ``schema_cache.json``）。
+每个条目以脚本路径为键，并记录文件的修改时间、大小与 SHA-256 摘要；
+未修改的脚本不会被再次启动，脚本被编辑后缓存会自动失效。查询时仅读取文件
+状态，修改时间或大小不一致时才计算内容哈希。
 
 Expected --gui-schema JSON format
 ----------------------------------
@@ -31,17 +48,42 @@ Expected --gui-schema JSON format
 ]
 """
 
+import copy
 import glob
+import hashlib
 import json
 import os
 import re
 import subprocess
 import sys
+import threading
 from typing import Any
 
+from core.static_schema import extract_schema
+from core.utils import resource_path
+
 # Maximum seconds to wait for a script's --gui-schema response.
 # 等待脚本 --gui-schema 响应的最长秒数。
 _GUI_SCHEMA_TIMEOUT_SECONDS = 10
+# Maximum seconds to wait for a script's --help output.
+# 等待脚本 --help 输出的最长秒数。
+_HELP_TIMEOUT_SECONDS = 10
+
+# Persistent schema cache file, stored next to config.ini.
+# 持久化 schema 缓存文件，与 config.ini 位于同一目录。
+_SCHEMA_CACHE_FILE = "schema_cache.json"
+# Bump when the cached schema format or the parsing heuristics change.
+# 当缓存格式或解析启发式规则变化时递增此版本号。
+_SCHEMA_CACHE_VERSION = 3
+
+# In-memory mirror of the cache file (loaded lazily) and its guard lock.
+# 缓存文件的内存镜像（延迟加载）及其保护锁。
+_schema_cache: dict[str, dict[str, Any]] | None = None
+_schema_cache_lock = threading.Lock()
+
+# Docstring line by which a script opts in to the launcher's parallel shards.
+# 脚本通过文档字符串中的这一行声明支持启动器的并行分片模式。
+PARALLEL_SHARDS_MARKER = "[parallel-shards]"
 
 
 # ------------------------------------------------------------------
@@ -76,35 +118,63 @@ def scan(scripts_dir: str) -> list[dict[str, Any]]:
     每个字典包含键：path、name_zh、name_en。
     """
     results: list[dict[str, Any]] = []
+    for script_path in list_scripts(scripts_dir):
+        info = read_script_info(script_path)
+        if info is not None:
+            results.append(info)
+    return results
+
+
+def list_scripts(scripts_dir: str) -> list[str]:
+    """Return the sorted ``*.py`` paths in *scripts_dir*, creating it if absent.
+
+    返回 *scripts_dir* 中排序后的 ``*.py`` 路径；目录不存在时自动创建。
+    """
     if not os.path.exists(scripts_dir):
         os.makedirs(scripts_dir)
-        return results
+        return []
+    return sorted(glob.glob(os.path.join(scripts_dir, "*.py")))
 
-    for script_path in sorted(glob.glob(os.path.join(scripts_dir, "*.py"))):
-        try:
-            with open(script_path, "r", encoding="utf-8") as fh:
-                content = fh.read()
-            docstring = extract_docstring(content)
 
-            zh_name_match = re.search(r"\[display-name-zh\](.*?)\n", docstring)
-            en_name_match = re.search(r"\[display-name-en\](.*?)\n", docstring)
+def read_script_info(script_path: str) -> dict[str, Any] | None:
+    """Read *script_path* and return its ``path``/``name_zh``/``name_en`` dict.
 
-            zh_name = (
-                zh_name_match.group(1).strip()
-                if zh_name_match
-                else os.path.basename(script_path)
-            )
-            en_name = (
-                en_name_match.group(1).strip()
-                if en_name_match
-                else os.path.basename(script_path)
-            )
+    ``parallel_shards`` is True when the docstring contains the
+    ``[parallel-shards]`` marker, i.e. the script accepts ``--shard K/N``.
+    Returns *None* (after printing the error) when the file cannot be read.
 
-            results.append({"path": script_path, "name_zh": zh_name, "name_en": en_name})
-        except Exception as exc:  # noqa: BLE001
-            print(f"Error loading script {script_path}: {exc}")
+    读取 *script_path* 并返回其 path/name_zh/name_en 字典；文档字符串含
+    ``[parallel-shards]`` 标记（即脚本支持 ``--shard K/N``）时
+    ``parallel_shards`` 为 True。文件无法读取时打印错误并返回 None。
+    """
+    try:
+        with open(script_path, "r", encoding="utf-8") as fh:
+            content = fh.read()
+        docstring = extract_docstring(content)
 
-    return results
+        zh_name_match = re.search(r"\[display-name-zh\](.*?)\n", docstring)
+        en_name_match = re.search(r"\[display-name-en\](.*?)\n", docstring)
+
+        zh_name = (
+            zh_name_match.group(1).strip()
+            if zh_name_match
+            else os.path.basename(script_path)
+        )
+        en_name = (
+            en_name_match.group(1).strip()
+            if en_name_match
+            else os.path.basename(script_path)
+        )
+
+        return {
+            "path": script_path,
+            "name_zh": zh_name,
+            "name_en": en_name,
+            "parallel_shards": PARALLEL_SHARDS_MARKER in docstring,
+        }
+    except Exception as exc:  # noqa: BLE001
+        print(f"Error loading script {script_path}: {exc}")
+        return None
 
 
 # ------------------------------------------------------------------
@@ -114,21 +184,205 @@ def scan(scripts_dir: str) -> list[dict[str, Any]]:
 def parse_params(script_path: str) -> list[dict[str, Any]]:
     """Return a list of parameter dicts for *script_path*.
 
-    Tries ``--gui-schema`` first; falls back to ``--help`` regex.
+    Serves the result from the persistent schema cache when the script is
+    unchanged; otherwise tries ``--gui-schema`` (for scripts that implement
+    it), then static AST extraction, and only then the ``--help`` regex.
+    The result is stored in the cache.
 
     返回 *script_path* 的参数字典列表。
-    优先尝试 --gui-schema；失败则回退至 --help 正则解析。
+    脚本未修改时直接从持久化缓存返回；否则先尝试 --gui-schema（仅针对实现了
+    该标志的脚本），再尝试静态 AST 提取，最后才回退至 --help 正则解析，
+    并将结果写入缓存。
+    """
+    cached = _cache_lookup(script_path)
+    if cached is not None:
+        return cached
+
+    fingerprint = _file_fingerprint(script_path)
+    params = None
+    source = _read_source(script_path)
+    if source is None or "--gui-schema" in source:
+        params = _try_gui_schema(script_path)
+    if params is None and source is not None:
+        params = extract_schema(source)
+    if params is None:
+        params = _parse_help_text(script_path)
+        if params is None:
+            # Transient failure – do not poison the cache.
+            # 临时性失败 – 不写入缓存。
+            return []
+
+    if fingerprint is not None:
+        _cache_store(script_path, fingerprint, params)
+    return params
+
+
+def cached_params(script_path: str) -> list[dict[str, Any]] | None:
+    """Return the cached parameter list if *script_path* is unchanged, else None.
+
+    Never starts a subprocess, so it is safe on the GUI thread; on None,
+    hand the script to ``parse_params`` off that thread.
+
+    若 *script_path* 未修改则返回缓存的参数列表，否则返回 None。从不启动子进程，
+    因此可在 GUI 线程中调用；返回 None 时请在其他线程中调用 ``parse_params``。
+    """
+    return _cache_lookup(script_path)
+
+
+def clear_schema_cache() -> None:
+    """Drop every cached schema, both in memory and on disk.
+
+    清空所有已缓存的 schema（内存与磁盘）。
     """
-    params = _try_gui_schema(script_path)
-    if params is not None:
-        return params
-    return _parse_help_text(script_path)
+    global _schema_cache
+    with _schema_cache_lock:
+        _schema_cache = {}
+        try:
+            os.remove(resource_path(_SCHEMA_CACHE_FILE))
+        except OSError:
+            pass
+
+
+# ------------------------------------------------------------------
+# Schema cache
+# ------------------------------------------------------------------
+
+def _file_fingerprint(script_path: str) -> dict[str, Any] | None:
+    """Return ``{'mtime_ns', 'size', 'sha256'}`` for *script_path*, or *None*.
+
+    返回 *script_path* 的指纹（修改时间、大小、SHA-256），失败时返回 None。
+    """
+    try:
+        stat = os.stat(script_path)
+        with open(script_path, "rb") as fh:
+            digest = hashlib.sha256(fh.read()).hexdigest()
+    except OSError:
+        return None
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest}
+
+
+def _cache_key(script_path: str) -> str:
+    return os.path.normcase(os.path.abspath(script_path))
+
+
+def _load_schema_cache() -> dict[str, dict[str, Any]]:
+    """Return the in-memory cache, reading the cache file on first use.
+
+    Must be called with ``_schema_cache_lock`` held.
+
+    返回内存缓存，首次调用时读取缓存文件。调用方须持有 _schema_cache_lock。
+    """
+    global _schema_cache
+    if _schema_cache is None:
+        _schema_cache = {}
+        try:
+            with open(resource_path(_SCHEMA_CACHE_FILE), "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            if (
+                isinstance(data, dict)
+                and data.get("version") == _SCHEMA_CACHE_VERSION
+                and isinstance(data.get("entries"), dict)
+            ):
+                _schema_cache = data["entries"]
+        except (OSError, ValueError):
+            pass
+    return _schema_cache
+
+
+def _save_schema_cache(entries: dict[str, dict[str, Any]]) -> None:
+    """Atomically write *entries* to the cache file.
+
+    Must be called with ``_schema_cache_lock`` held.
+
+    原子地将 *entries* 写入缓存文件。调用方须持有 _schema_cache_lock。
+    """
+    cache_path = resource_path(_SCHEMA_CACHE_FILE)
+    tmp_path = f"{cache_path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(
+                {"version": _SCHEMA_CACHE_VERSION, "entries": entries},
+                fh,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, cache_path)
+    except OSError as exc:
+        print(f"Could not write schema cache: {exc}")
+
+
+def _cache_lookup(script_path: str) -> list[dict[str, Any]] | None:
+    """Return a copy of the cached params for *script_path* if it is unchanged.
+
+    A matching mtime and size is enough and costs a single ``stat``;
+    otherwise the content hash decides, so a ``touch`` or a fresh checkout
+    does not force a re-spawn.
+
+    若脚本未修改则返回缓存参数列表的副本。修改时间与大小一致即命中，只需一次
+    ``stat``；否则由内容哈希决定，因此仅 touch 或重新检出不会导致脚本被重新启动。
+    """
+    key = _cache_key(script_path)
+    try:
+        stat = os.stat(script_path)
+    except OSError:
+        return None
+    with _schema_cache_lock:
+        entry = _load_schema_cache().get(key)
+        if not entry:
+            return None
+        if entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+            return copy.deepcopy(entry.get("params", []))
+
+    # Hash outside the lock; other lookups need not wait for it.
+    # 在锁外计算哈希，其他查询无需等待。
+    fingerprint = _file_fingerprint(script_path)
+    if fingerprint is None:
+        return None
+    with _schema_cache_lock:
+        entries = _load_schema_cache()
+        entry = entries.get(key)
+        if not entry or entry.get("sha256") != fingerprint["sha256"]:
+            return None
+        # Same content, new timestamp – refresh the stat fields.
+        # 内容相同但时间戳变化 – 刷新状态字段。
+        entry.update(fingerprint)
+        _save_schema_cache(entries)
+        return copy.deepcopy(entry.get("params", []))
+
+
+def _cache_store(
+    script_path: str, fingerprint: dict[str, Any], params: list[dict[str, Any]]
+) -> None:
+    """Record *params* for *script_path* under *fingerprint* and persist it.
+
+    以 *fingerprint* 记录 *script_path* 的 *params* 并持久化。
+    """
+    key = _cache_key(script_path)
+    with _schema_cache_lock:
+        entries = _load_schema_cache()
+        entries[key] = {**fingerprint, "params": copy.deepcopy(params)}
+        # Forget scripts that no longer exist.
+        # 移除已不存在的脚本条目。
+        for stale_key in [k for k in entries if not os.path.exists(k)]:
+            del entries[stale_key]
+        _save_schema_cache(entries)
 
 
 # ------------------------------------------------------------------
 # Private helpers
 # ------------------------------------------------------------------
 
+def _read_source(script_path: str) -> str | None:
+    """Return the text of *script_path*, or *None* if it cannot be read.
+
+    返回 *script_path* 的文本内容；无法读取时返回 None。
+    """
+    try:
+        with open(script_path, "r", encoding="utf-8") as fh:
+            return fh.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
 def _try_gui_schema(script_path: str) -> list[dict[str, Any]] | None:
     """Attempt to obtain parameters via ``--gui-schema``.
 
@@ -159,12 +413,16 @@ def _try_gui_schema(script_path: str) -> list[dict[str, Any]] | None:
         return None
 
 
-def _parse_help_text(script_path: str) -> list[dict[str, Any]]:
+def _parse_help_text(script_path: str) -> list[dict[str, Any]] | None:
     """Parse parameters from ``python script.py --help`` output using regex.
 
     通过正则表达式从 ``--help`` 输出中解析参数。
     This is the original heuristic, kept 100% intact for backward compatibility.
     这是原始的启发式方法，保持 100% 不变以确保向后兼容。
+
+    Returns *None* when the script could not be run, so the failure is not
+    cached.
+    脚本无法运行时返回 None，以免失败结果被缓存。
     """
     params: list[dict[str, Any]] = []
     try:
@@ -174,6 +432,7 @@ def _parse_help_text(script_path: str) -> list[dict[str, Any]]:
             text=True,
             encoding="utf-8",
             errors="replace",
+            timeout=_HELP_TIMEOUT_SECONDS,
         )
         help_text = result.stdout
 
@@ -223,4 +482,5 @@ def _parse_help_text(script_path: str) -> list[dict[str, Any]]:
         print(
             f"Could not parse parameters for {os.path.basename(script_path)}: {exc}"
         )
+        return None
     return params
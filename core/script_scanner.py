@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Script scanner – discovers scripts and warms their parameter schemas off the
+GUI thread.
+脚本扫描器 – 在 GUI 线程之外发现脚本并预热其参数 schema。
+
+Script files are read by a bounded thread pool and reported in sorted order
+as soon as each one is ready, so the list fills incrementally.  Afterwards
+every script's schema is fetched through ``script_registry.parse_params``
+(which spawns ``--gui-schema`` / ``--help`` on a cache miss) with the same
+bounded concurrency.  The pool stays available after the scan:
+``request_schema`` parses a script the GUI needs now, reusing a prefetch
+that is still in flight.
+
+脚本文件由有界线程池读取，并在每个文件就绪后按排序顺序上报，
+使列表逐步填充。随后以相同的并发上限通过 ``script_registry.parse_params``
+（缓存未命中时会启动 --gui-schema / --help）获取每个脚本的 schema。
+扫描结束后线程池仍可使用：``request_schema`` 解析 GUI 当前需要的脚本，
+若该脚本的预取仍在进行则直接复用。
+
+Emitted signals
+---------------
+script_found(dict)        – info dict (``path``, ``name_zh``, ``name_en``,
+                            ``parallel_shards``)
+schema_ready(str, list)   – script path and its parameter list (prefetched
+                            or requested); emitted from a pool thread
+scan_finished()           – discovery and prefetch are both done
+"""
+
+import os
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+
+import core.script_registry as registry
+
+# Default upper bound on concurrently running worker tasks.
+# 并发工作任务数的默认上限。
+DEFAULT_MAX_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+
+class ScriptScanner(QThread):
+    """Scans a scripts directory and prefetches schemas in the background.
+
+    在后台扫描脚本目录并预取参数 schema。
+
+    Public API
+    ----------
+    request_schema(path)  – parse *path* in the pool; the result arrives via schema_ready
+    cancel()              – stop reporting and release the pool
+    """
+
+    # Signal carrying a discovered script's info dict / 携带已发现脚本信息的信号
+    script_found = pyqtSignal(dict)
+    # Signal carrying (script path, parameter list) / 携带（脚本路径, 参数列表）的信号
+    schema_ready = pyqtSignal(str, list)
+    # Signal emitted when all work is done / 所有工作完成时发出的信号
+    scan_finished = pyqtSignal()
+
+    def __init__(
+        self,
+        scripts_dir: str,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        prefetch: bool = True,
+        parent: QObject | None = None,
+    ) -> None:
+        """
+        :param scripts_dir: Directory to scan for ``*.py`` scripts.
+                            要扫描 ``*.py`` 脚本的目录。
+        :param max_workers: Maximum number of concurrent read/parse tasks.
+                            并发读取/解析任务的最大数量。
+        :param prefetch: Whether to warm every script's schema after discovery.
+                         发现完成后是否预热所有脚本的 schema。
+        """
+        super().__init__(parent)
+        self.scripts_dir = scripts_dir
+        self.max_workers = max(1, max_workers)
+        self.prefetch = prefetch
+        self._cancelled = False
+        # Outlives run(), so request_schema() works before, during and after the scan.
+        # 生命周期长于 run()，因此扫描前、扫描中和扫描后均可调用 request_schema()。
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="script-scan"
+        )
+        # Schema lookups still in flight, by script path / 按脚本路径记录仍在进行的 schema 查询
+        self._pending: dict[str, Future] = {}
+        self._pending_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # QThread interface
+    # ------------------------------------------------------------------
+
+    def run(self) -> None:
+        """Discover scripts, then prefetch their schemas.
+
+        发现脚本，然后预取其 schema。
+        """
+        try:
+            paths = registry.list_scripts(self.scripts_dir)
+            # map() yields in submission order, so the list stays sorted.
+            # map() 按提交顺序产出结果，因此列表保持有序。
+            for info in self._pool.map(registry.read_script_info, paths):
+                if self._cancelled:
+                    return
+                if info is not None:
+                    self.script_found.emit(info)
+
+            if not self.prefetch:
+                return
+            futures = [self.request_schema(path) for path in paths]
+            for future in futures:
+                if self._cancelled:
+                    return
+                if future is not None:
+                    future.exception()  # wait; errors are reported by _on_schema_done
+        except (RuntimeError, CancelledError):
+            pass  # pool shut down by cancel() / 线程池已被 cancel() 关闭
+        finally:
+            self.scan_finished.emit()
+
+    # ------------------------------------------------------------------
+    # Public control methods
+    # ------------------------------------------------------------------
+
+    def request_schema(self, script_path: str) -> Future | None:
+        """Parse *script_path* in the pool and emit ``schema_ready`` when done.
+
+        A lookup already in flight for the same script (e.g. its prefetch)
+        is reused instead of starting a second one.  Returns the future, or
+        None after ``cancel``.
+
+        在线程池中解析 *script_path*，完成后发出 ``schema_ready``。同一脚本已有
+        进行中的查询（例如其预取）时直接复用，不会重复启动。返回 future；
+        ``cancel`` 之后返回 None。
+        """
+        with self._pending_lock:
+            if self._cancelled:
+                return None
+            future = self._pending.get(script_path)
+            if future is None:
+                future = self._pool.submit(registry.parse_params, script_path)
+                self._pending[script_path] = future
+                future.add_done_callback(
+                    lambda done, path=script_path: self._on_schema_done(path, done)
+                )
+            return future
+
+    def cancel(self) -> None:
+        """Stop reporting results and drop queued tasks as soon as possible.
+
+        尽快停止上报结果并丢弃排队中的任务。
+        """
+        with self._pending_lock:
+            self._cancelled = True
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _on_schema_done(self, script_path: str, future: Future) -> None:
+        with self._pending_lock:
+            self._pending.pop(script_path, None)
+            if self._cancelled or future.cancelled():
+                return
+        try:
+            params = future.result()
+        except Exception as exc:  # noqa: BLE001
+            # Still report, so a waiting form does not wait forever.
+            # 仍然上报，避免等待中的表单一直等待。
+            print(f"Could not read parameters for {script_path}: {exc}")
+            params = []
+        self.schema_ready.emit(script_path, params)
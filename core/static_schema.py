@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Static schema extraction – reads a script's ``argparse`` declarations from
+its AST without executing it.
+静态 schema 提取 – 从脚本的 AST 中读取 ``argparse`` 声明，而无需执行脚本。
+
+Every ``<obj>.add_argument(...)`` call in the module is inspected, which
+covers parsers, ``add_argument_group`` groups and mutually exclusive groups
+alike.  The result uses the same dict format as ``--gui-schema``::
+
+    {"name": "--sort-by", "type": "choice", "choices": ["name", "date"],
+     "default": "name", "help": "... [display: name=文件名,File Name | ...]"}
+
+When the declarations cannot be understood statically (sub-parsers,
+``*args``/``**kwargs`` forwarding, computed option names, choices or
+defaults, ...) ``extract_schema`` returns *None* and the caller should fall
+back to running the script.  ``type`` and ``metavar`` are not needed for the
+schema and are not read.
+
+模块中每个 ``<obj>.add_argument(...)`` 调用都会被检查，因此解析器、
+``add_argument_group`` 分组和互斥分组都能覆盖。结果与 ``--gui-schema`` 的
+字典格式相同。当声明无法被静态理解时（子解析器、``*args``/``**kwargs``
+转发、计算得到的选项名、可选值或默认值等），``extract_schema`` 返回 None，
+调用方应回退为执行脚本。schema 不需要 ``type`` 和 ``metavar``，因此不读取。
+"""
+
+import ast
+from typing import Any
+
+# Flags consumed by the launcher itself – never shown as parameters.
+# 启动器自身使用的标志 – 不作为参数显示。
+_INTERNAL_FLAGS = ("--gui-mode", "--lang")
+
+# argparse actions that take no value on the command line.
+# 命令行上不需要取值的 argparse 动作。
+_FLAG_ACTIONS = ("store_true", "store_false", "store_const", "count")
+
+# argparse actions that never make sense as a GUI parameter.
+# 不适合作为 GUI 参数的 argparse 动作。
+_SKIPPED_ACTIONS = ("help", "version")
+
+# Marker returned for keyword values that are not plain literals.
+# 关键字参数值不是普通字面量时返回的标记。
+_NOT_LITERAL = object()
+
+
+class _Inconclusive(Exception):
+    """Raised when the script's arguments cannot be determined statically."""
+
+
+def extract_schema(source: str) -> list[dict[str, Any]] | None:
+    """Return the parameter list declared in *source*, or *None*.
+
+    *None* means static analysis was inconclusive; an empty list means the
+    script declares no optional parameters.
+
+    返回 *source* 中声明的参数列表，无法静态确定时返回 None；
+    空列表表示脚本未声明任何可选参数。
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+
+    calls: list[ast.Call] = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call) or not isinstance(node.func, ast.Attribute):
+            continue
+        if node.func.attr == "add_subparsers":
+            return None
+        if node.func.attr == "add_argument":
+            calls.append(node)
+    if not calls:
+        return None
+
+    params: list[dict[str, Any]] = []
+    try:
+        for call in sorted(calls, key=lambda c: (c.lineno, c.col_offset)):
+            param = _param_from_call(call)
+            if param is not None:
+                params.append(param)
+    except _Inconclusive:
+        return None
+    return params
+
+
+# ------------------------------------------------------------------
+# Private helpers
+# ------------------------------------------------------------------
+
+def _param_from_call(call: ast.Call) -> dict[str, Any] | None:
+    """Convert one ``add_argument`` call into a parameter dict.
+
+    Returns *None* for arguments the GUI should not show (positionals,
+    suppressed or internal options).
+
+    将单个 ``add_argument`` 调用转换为参数字典；
+    对于 GUI 不应显示的参数（位置参数、被抑制或内部选项）返回 None。
+    """
+    option_strings: list[str] = []
+    for arg in call.args:
+        if isinstance(arg, ast.Starred):
+            raise _Inconclusive
+        value = _literal(arg)
+        if not isinstance(value, str):
+            raise _Inconclusive
+        option_strings.append(value)
+
+    keywords: dict[str, Any] = {}
+    for kw in call.keywords:
+        if kw.arg is None:  # **kwargs forwarding
+            raise _Inconclusive
+        keywords[kw.arg] = kw.value
+
+    if not option_strings or not all(o.startswith("-") for o in option_strings):
+        return None  # Positional argument / 位置参数
+
+    long_names = [o for o in option_strings if o.startswith("--")]
+    name = long_names[0] if long_names else option_strings[0]
+    if name in _INTERNAL_FLAGS:
+        return None
+
+    help_node = keywords.get("help")
+    if help_node is not None and _is_suppress(help_node):
+        return None
+
+    action = _literal(keywords["action"]) if "action" in keywords else "store"
+    if action is _NOT_LITERAL:
+        raise _Inconclusive
+    if action in _SKIPPED_ACTIONS:
+        return None
+
+    choices: Any = None
+    if "choices" in keywords:
+        choices = _literal(keywords["choices"])
+        if choices is _NOT_LITERAL or not isinstance(choices, (list, tuple, set)):
+            raise _Inconclusive
+
+    default = None
+    if "default" in keywords and not _is_suppress(keywords["default"]):
+        default = _literal(keywords["default"])
+    nargs = _literal(keywords["nargs"]) if "nargs" in keywords else None
+
+    param: dict[str, Any] = {"name": name}
+    if action in _FLAG_ACTIONS or nargs == 0:
+        param["type"] = "flag"
+    elif choices is not None:
+        param["type"] = "choice"
+        param["choices"] = [str(c) for c in choices]
+    else:
+        param["type"] = "value"
+
+    # Flags start unchecked, matching the --help heuristic, so only their
+    # defaults may be computed.  A computed default of a value or choice is
+    # only known at run time: let the caller ask --help.
+    # 标志默认不勾选（与 --help 启发式一致），因此只有标志的默认值可以是计算值。
+    # 取值或选项参数的计算默认值只能在运行时得知：交由调用方通过 --help 获取。
+    if param["type"] != "flag" and default is _NOT_LITERAL:
+        raise _Inconclusive
+    # Empty defaults are omitted / 空默认值直接省略
+    if (
+        param["type"] != "flag"
+        and default is not None
+        and default != ""
+        and not isinstance(default, (list, tuple, set, dict))
+    ):
+        param["default"] = str(default)
+
+    help_text = _literal(help_node) if help_node is not None else ""
+    if not isinstance(help_text, str):
+        help_text = ""
+    param["help"] = _expand_help(help_text, default, choices)
+    return param
+
+
+def _literal(node: ast.AST) -> Any:
+    """Return the literal value of *node*, or ``_NOT_LITERAL``.
+
+    返回 *node* 的字面量值；若不是字面量则返回 ``_NOT_LITERAL``。
+    """
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return _NOT_LITERAL
+
+
+def _is_suppress(node: ast.AST) -> bool:
+    """Return True if *node* is ``argparse.SUPPRESS`` (in any spelling).
+
+    判断 *node* 是否为 ``argparse.SUPPRESS``（任意写法）。
+    """
+    if isinstance(node, ast.Attribute) and node.attr == "SUPPRESS":
+        return True
+    if isinstance(node, ast.Name) and node.id == "SUPPRESS":
+        return True
+    return _literal(node) == "==SUPPRESS=="
+
+
+def _expand_help(help_text: str, default: Any, choices: Any) -> str:
+    """Expand argparse ``%(default)s``-style placeholders where possible.
+
+    尽可能展开 argparse 风格的 ``%(default)s`` 占位符。
+    """
+    if "%" not in help_text:
+        return help_text
+    values = {
+        "default": None if default is _NOT_LITERAL else default,
+        "choices": ", ".join(str(c) for c in choices) if choices else None,
+    }
+    try:
+        return help_text % values
+    except (KeyError, TypeError, ValueError):
+        return help_text
@@ -0,0 +1,12 @@
+"""
+Helpers shared by the toolkit scripts (standard library only).
+工具箱脚本共用的辅助模块（仅依赖标准库）。
+
+Scripts run as ``python scripts/<name>.py``, which puts ``scripts/`` on
+``sys.path``, so they import these modules as ``from _shared.xxx import ...``.
+The package is a directory, so the launcher never lists it as a script.
+
+脚本以 ``python scripts/<name>.py`` 方式运行，``scripts/`` 会被加入
+``sys.path``，因此可通过 ``from _shared.xxx import ...`` 导入。
+该包是一个目录，启动器不会将其列为脚本。
+"""
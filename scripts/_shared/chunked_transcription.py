@@ -0,0 +1,239 @@
+"""
+Parallel transcription of long media, in chunks cut at pauses.
+在停顿处切块、并行转写长音视频。
+
+One ``WhisperModel.transcribe`` call keeps a single group of cores busy for
+the whole recording.  ``ChunkedTranscriber`` instead
+
+1. decodes the audio once and runs VAD once over it;
+2. cuts it into chunks of about ``chunk_seconds`` at the midpoint of the
+   longest pause near each target position (a hard cut only when there is
+   no pause at all);
+3. transcribes every chunk, padded with ``overlap_seconds`` of audio on both
+   sides so speech at a cut is heard whole, in a pool of worker processes,
+   each holding its own model;
+4. shifts the timestamps back to the recording and stitches the chunks: a
+   segment belongs to the chunk whose own (unpadded) span contains its
+   midpoint, so a sentence heard by two neighbouring chunks is kept once.
+
+``transcribe`` has the contract of ``WhisperModel.transcribe`` – segments in
+order, plus an info object with ``duration`` and ``language`` – so callers
+use it like a model.  Segments of a chunk are released as soon as that chunk
+and all before it are done, and the plan of the last audio is reused, so the
+second language pass of a merge does not decode or run VAD again.
+
+Every worker loads a full model copy; with ``large-v3`` that is ~1.5 GB of
+memory per worker.  Whisper's context does not cross a cut, which is why
+cuts are placed in pauses.
+
+单次 ``WhisperModel.transcribe`` 调用在整段录音期间只占用一组 CPU 核心。
+``ChunkedTranscriber`` 的做法是：先对音频解码一次并运行一次 VAD；在每个目标
+位置附近最长停顿的中点处切成约 ``chunk_seconds`` 秒的块（完全没有停顿时才
+硬切）；每块两侧各多带 ``overlap_seconds`` 秒音频，以免切点处的语音被截断，
+并在工作进程池中转写（每个进程持有自己的模型）；最后把时间戳移回整段录音并
+拼接——片段归属于其中点落在自身（不含填充）范围内的块，因此相邻两块都听到
+的句子只保留一次。``transcribe`` 与 ``WhisperModel.transcribe`` 的接口一致
+（按顺序返回片段，以及带 ``duration`` 和 ``language`` 的信息对象），调用方
+可像使用模型一样使用它。某块及其之前的所有块完成后即可取得其片段；最近一段
+音频的切块计划会被复用，因此合并模式的第二次转写无需再次解码或运行 VAD。
+每个工作进程都会加载一份完整模型（``large-v3`` 约占 1.5 GB 内存）。Whisper
+的上下文不会跨越切点，因此切点都放在停顿处。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from _shared.whisper_models import DEFAULT_COMPUTE_TYPE, load_whisper_model
+
+SAMPLING_RATE = 16000
+DEFAULT_CHUNK_SECONDS = 300
+DEFAULT_OVERLAP_SECONDS = 2.0
+# Pauses shorter than this are not reported by VAD / 短于此值的停顿不会被 VAD 报告
+_MIN_PAUSE_MS = 500
+# Cuts are searched within this fraction of the target around it.
+# 在目标位置前后该比例范围内寻找切点。
+_CUT_WINDOW = 0.25
+# Threads each worker's model uses / 每个工作进程的模型使用的线程数
+_THREADS_PER_WORKER = 4
+
+
+def default_chunk_workers() -> int:
+    """Worker processes for this host: one per ``_THREADS_PER_WORKER`` cores."""
+    return max(1, (os.cpu_count() or 1) // _THREADS_PER_WORKER)
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A piece of the recording, in samples / 录音中的一块（单位: 采样点）"""
+
+    start: int  # first sample owned by the chunk / 本块拥有的第一个采样点
+    end: int  # one past the last owned sample / 本块拥有的最后一个采样点之后
+    padded_start: int
+    padded_end: int
+
+
+@dataclass
+class ChunkedInfo:
+    """Stand-in for faster-whisper's ``TranscriptionInfo`` / faster-whisper ``TranscriptionInfo`` 的替身"""
+
+    duration: float
+    language: str | None
+    chunks: int
+
+
+def plan_chunks(
+    speech: list[dict[str, int]],
+    total_samples: int,
+    chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+    overlap_seconds: float = DEFAULT_OVERLAP_SECONDS,
+    sampling_rate: int = SAMPLING_RATE,
+) -> list[Chunk]:
+    """Cut a recording into chunks at pauses between VAD *speech* regions.
+
+    *speech* is VAD output: ``{"start": sample, "end": sample}`` in order.
+
+    按 VAD 语音区间 *speech* 之间的停顿把录音切成若干块。
+    """
+    target = int(chunk_seconds * sampling_rate)
+    overlap = int(overlap_seconds * sampling_rate)
+    # (midpoint, length) of every pause / 每个停顿的（中点, 长度）
+    pauses = [
+        ((before["end"] + after["start"]) // 2, after["start"] - before["end"])
+        for before, after in zip(speech, speech[1:])
+        if after["start"] > before["end"]
+    ]
+    cuts = []
+    last = 0
+    # Leave the final chunk at least a quarter of the target long.
+    # 最后一块至少保留目标长度的四分之一。
+    while target > 0 and total_samples - last > target * (1 + _CUT_WINDOW):
+        low = last + target * (1 - _CUT_WINDOW)
+        high = last + target * (1 + _CUT_WINDOW)
+        window = [pause for pause in pauses if low <= pause[0] <= high]
+        cut = max(window, key=lambda pause: pause[1])[0] if window else last + target
+        cuts.append(cut)
+        last = cut
+    bounds = [0, *cuts, total_samples]
+    return [
+        Chunk(start, end, max(0, start - overlap), min(total_samples, end + overlap))
+        for start, end in zip(bounds, bounds[1:])
+    ]
+
+
+class ChunkedTranscriber:
+    """Transcribes long audio chunk-wise in a pool of processes, like a ``WhisperModel``.
+
+    以进程池分块转写长音频，用法与 ``WhisperModel`` 相同。
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        workers: int = 0,
+        compute_type: str = DEFAULT_COMPUTE_TYPE,
+        chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+        overlap_seconds: float = DEFAULT_OVERLAP_SECONDS,
+    ) -> None:
+        """
+        :param workers: Worker processes, each with its own model copy
+                        (0: ``default_chunk_workers()``).
+                        工作进程数，每个进程各有一份模型（0 表示自动）。
+        """
+        self.workers = workers if workers > 0 else default_chunk_workers()
+        self.chunk_seconds = chunk_seconds
+        self.overlap_seconds = overlap_seconds
+        cpu_threads = max(1, (os.cpu_count() or 1) // self.workers)
+        self._pool = ProcessPoolExecutor(
+            self.workers,
+            initializer=_init_worker,
+            initargs=(model_name, compute_type, cpu_threads),
+        )
+        self._plan_lock = threading.Lock()
+        # (audio argument, decoded audio, chunks) of the last call / 上一次调用的音频及切块计划
+        self._last_plan: tuple[Any, Any, list[Chunk]] | None = None
+
+    def transcribe(self, audio, **options) -> tuple[Iterator[Any], ChunkedInfo]:
+        """Same contract as ``WhisperModel.transcribe``; *audio* is a path or 16 kHz samples.
+
+        与 ``WhisperModel.transcribe`` 的接口相同；*audio* 为路径或 16 kHz 采样数据。
+        """
+        samples, chunks = self._plan(audio)
+        futures = [
+            self._pool.submit(
+                _transcribe_chunk,
+                samples[chunk.padded_start:chunk.padded_end],
+                chunk.padded_start / SAMPLING_RATE,
+                chunk.start / SAMPLING_RATE,
+                # The last chunk owns everything after its start.
+                # 最后一块拥有其起点之后的所有片段。
+                chunk.end / SAMPLING_RATE if index < len(chunks) - 1 else float("inf"),
+                options,
+            )
+            for index, chunk in enumerate(chunks)
+        ]
+        info = ChunkedInfo(len(samples) / SAMPLING_RATE, options.get("language"), len(chunks))
+        return _in_order(futures), info
+
+    def close(self) -> None:
+        self._pool.shutdown(cancel_futures=True)
+
+    def __enter__(self) -> ChunkedTranscriber:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _plan(self, audio) -> tuple[Any, list[Chunk]]:
+        key = os.path.abspath(audio) if isinstance(audio, (str, os.PathLike)) else audio
+        with self._plan_lock:
+            last = self._last_plan
+            if last is not None and (last[0] is key or (isinstance(key, str) and last[0] == key)):
+                return last[1], last[2]
+            from faster_whisper import decode_audio
+            from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+            samples = decode_audio(key, sampling_rate=SAMPLING_RATE) if isinstance(key, str) else audio
+            speech = get_speech_timestamps(samples, VadOptions(min_silence_duration_ms=_MIN_PAUSE_MS))
+            chunks = plan_chunks(
+                speech, len(samples), self.chunk_seconds, self.overlap_seconds, SAMPLING_RATE
+            )
+            self._last_plan = (key, samples, chunks)
+            return samples, chunks
+
+
+def _in_order(futures) -> Iterator[Any]:
+    for future in futures:
+        yield from future.result()
+
+
+# ---------------------------------------------------------------------------
+# Worker processes
+# ---------------------------------------------------------------------------
+
+_worker_model = None
+
+
+def _init_worker(model_name: str, compute_type: str, cpu_threads: int) -> None:
+    global _worker_model
+    _worker_model = load_whisper_model(model_name, "cpu", compute_type, cpu_threads=cpu_threads)
+
+
+def _transcribe_chunk(samples, offset: float, own_start: float, own_end: float, options) -> list[Any]:
+    """Transcribe one padded chunk; keep the segments whose midpoint it owns."""
+    segments, _ = _worker_model.transcribe(samples, **options)
+    kept = []
+    for segment in segments:
+        segment.start += offset
+        segment.end += offset
+        for word in segment.words or ():
+            word.start += offset
+            word.end += offset
+        if own_start <= (segment.start + segment.end) / 2 < own_end:
+            kept.append(segment)
+    return kept
@@ -0,0 +1,160 @@
+"""
+Fuzzy page-containment engine used by the slimmer scripts.
+瘦身脚本使用的模糊页面包含判断引擎。
+
+A line ``a`` of one page is *contained* in the next page's lines when some
+line ``b`` satisfies either
+
+* ``SequenceMatcher(None, a, b).ratio() >= sim_threshold``, or
+* ``len(b) > len(a) and b.startswith(a)`` (the "continued line" rule).
+
+``ContainmentIndex`` answers exactly that question, with the same result as
+comparing ``a`` against every ``b``, but it rejects most candidates with exact
+upper bounds before running the full ``ratio()``:
+
+1. exact hash hit – identical short lines have ratio 1.0;
+2. prefix rule – one ``bisect`` into the sorted lines;
+3. length window – ``real_quick_ratio`` bound, candidates found by ``bisect``
+   over the lines sorted by length;
+4. ``quick_ratio`` bound – multiset character overlap from precomputed
+   ``Counter``s;
+5. full ``ratio()`` – with one cached ``SequenceMatcher`` per ``b`` so its
+   ``b2j`` index is built once per page instead of once per pair.
+
+Every gate is an upper bound on ``ratio()``, so no decision can change.
+Approximate filters such as MinHash are deliberately not used for that reason.
+
+对每一行 ``a``，若下一页存在满足相似度阈值或「续写行」前缀规则的行 ``b``，
+则视为被包含。``ContainmentIndex`` 在执行完整 ``ratio()`` 之前，先用精确的
+上界（完全相同、前缀、长度窗口、``quick_ratio``）排除绝大多数候选，并为每个
+``b`` 缓存一个 ``SequenceMatcher``。所有过滤条件都是 ``ratio()`` 的上界，
+因此判断结果与逐对比较完全一致；出于同样的原因，不使用 MinHash 等近似过滤。
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from difflib import SequenceMatcher
+
+DEFAULT_SIM_THRESHOLD = 0.9
+
+# difflib's autojunk heuristic only applies to sequences at least this long,
+# so below it an identical pair is guaranteed a ratio of 1.0.
+# difflib 的 autojunk 启发式仅对不短于此长度的序列生效；低于该长度时，
+# 完全相同的两行 ratio 必为 1.0。
+_AUTOJUNK_MIN_LEN = 200
+
+
+def _ratio_bound(matches: int, total: int) -> float:
+    """Same float arithmetic as ``difflib._calculate_ratio``."""
+    return 2.0 * matches / total if total else 1.0
+
+
+class ContainmentIndex:
+    """Answers "is this line fuzzily contained in *lines_b*?" queries.
+
+    回答「某行是否模糊包含于 *lines_b*」的查询。
+    """
+
+    def __init__(self, lines_b: list[str], sim_threshold: float = DEFAULT_SIM_THRESHOLD) -> None:
+        self.sim_threshold = sim_threshold
+        self.lines = list(dict.fromkeys(lines_b))
+        self._exact = set(self.lines)
+        self._sorted = sorted(self.lines)
+        by_length = sorted(self.lines, key=len)
+        self._by_length = by_length
+        self._lengths = [len(line) for line in by_length]
+        self._counts: dict[str, Counter] = {}
+        self._matchers: dict[str, SequenceMatcher] = {}
+        self._memo: dict[str, bool] = {}
+
+    def contains(self, line_a: str) -> bool:
+        result = self._memo.get(line_a)
+        if result is None:
+            result = self._contains(line_a)
+            self._memo[line_a] = result
+        return result
+
+    def contains_all(self, lines_a: list[str]) -> bool:
+        """Same contract as the slimmers' ``is_subset_fuzzy``."""
+        if not lines_a:
+            return True
+        if not self.lines:
+            return False
+        return all(self.contains(line_a) for line_a in lines_a)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _contains(self, line_a: str) -> bool:
+        threshold = self.sim_threshold
+        len_a = len(line_a)
+        if line_a in self._exact and len_a < _AUTOJUNK_MIN_LEN and threshold <= 1.0:
+            return True
+        if self._has_longer_with_prefix(line_a):
+            return True
+
+        lo, hi = self._length_window(len_a)
+        count_a: Counter | None = None
+        for index in range(lo, hi):
+            line_b = self._by_length[index]
+            total = len_a + len(line_b)
+            if _ratio_bound(min(len_a, len(line_b)), total) < threshold:
+                continue
+            if count_a is None:
+                count_a = Counter(line_a)
+            overlap = sum((count_a & self._count(line_b)).values())
+            if _ratio_bound(overlap, total) < threshold:
+                continue
+            matcher = self._matcher(line_b)
+            matcher.set_seq1(line_a)
+            if matcher.ratio() >= threshold:
+                return True
+        return False
+
+    def _has_longer_with_prefix(self, line_a: str) -> bool:
+        # Lines starting with line_a sort right after any copies of line_a.
+        index = bisect_right(self._sorted, line_a)
+        return index < len(self._sorted) and self._sorted[index].startswith(line_a)
+
+    def _length_window(self, len_a: int) -> tuple[int, int]:
+        """Index range of lines whose length could reach the threshold.
+
+        The bounds are widened by one on each side; the exact
+        ``real_quick_ratio`` test in ``_contains`` settles the edges.
+        """
+        threshold = min(self.sim_threshold, 1.0)
+        if threshold <= 0:
+            return 0, len(self._by_length)
+        min_len = int(len_a * threshold / (2.0 - threshold)) - 1
+        max_len = int(len_a * (2.0 - threshold) / threshold) + 1
+        return (
+            bisect_left(self._lengths, min_len),
+            bisect_right(self._lengths, max_len),
+        )
+
+    def _count(self, line_b: str) -> Counter:
+        counts = self._counts.get(line_b)
+        if counts is None:
+            counts = self._counts[line_b] = Counter(line_b)
+        return counts
+
+    def _matcher(self, line_b: str) -> SequenceMatcher:
+        matcher = self._matchers.get(line_b)
+        if matcher is None:
+            matcher = self._matchers[line_b] = SequenceMatcher(None, "", line_b)
+        return matcher
+
+
+def is_line_contained_fuzzy(
+    line_a: str, lines_b: list[str], sim_threshold: float = DEFAULT_SIM_THRESHOLD
+) -> bool:
+    return ContainmentIndex(lines_b, sim_threshold).contains(line_a)
+
+
+def is_subset_fuzzy(
+    lines_a: list[str], lines_b: list[str], sim_threshold: float = DEFAULT_SIM_THRESHOLD
+) -> bool:
+    return ContainmentIndex(lines_b, sim_threshold).contains_all(lines_a)
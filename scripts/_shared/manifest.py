@@ -0,0 +1,342 @@
+"""
+Build manifest for the incremental (``--incremental``) mode of batch scripts.
+批处理脚本增量模式（``--incremental``）使用的构建清单。
+
+Every output directory gets a ``.toolkit_manifest.json`` that records, per
+output file name, what produced it:
+
+* the tool name and script version (a digest of the script's source and
+  of the ``_shared`` modules it has imported),
+* the parameters that influence the output,
+* every input's absolute path, size, mtime and SHA-256, and
+* size and mtime of every file the run wrote.
+
+An output is *up to date* – and its work can be skipped, make-style – when
+all of that still matches.  An input whose size and mtime are unchanged is
+not rehashed; one that was merely touched is rehashed and still counts as
+unchanged.  An output that was deleted or edited by hand is regenerated.
+
+``save()`` merges this run's entries into the file on disk and replaces it
+atomically, holding a lock file while it does, so shards of one job writing
+to the same directory keep each other's entries.
+
+每个输出目录都有一个 ``.toolkit_manifest.json``，按输出文件名记录其来源：
+工具名与脚本版本（脚本及其已导入的 ``_shared`` 模块源码的摘要）、影响输出的参数、每个输入的绝对路径、
+大小、修改时间和 SHA-256，以及本次写出的各文件的大小和修改时间。
+以上信息全部一致时，输出即为「最新」，可像 make 一样跳过。大小和修改时间
+未变的输入不会重新计算哈希；仅被 touch 的输入会重新计算哈希，仍视为未变化。
+被删除或手动修改的输出会重新生成。``save()`` 在持有锁文件期间把本次运行的
+条目合并进磁盘上的文件并原子替换，因此同一任务的多个分片写入同一目录时不会
+互相覆盖条目。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import time
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from _shared.page_cache import file_sha256
+
+MANIFEST_NAME = ".toolkit_manifest.json"
+# Bump when the manifest layout changes / 清单格式变化时递增
+_FORMAT_VERSION = 1
+# Seconds to wait for another process's lock, and the age after which a lock
+# left behind by a killed process is broken.
+# 等待其他进程释放锁的秒数，以及被终止进程遗留的锁在多久之后视为失效。
+_LOCK_TIMEOUT = 10
+_STALE_LOCK_AGE = 60
+
+
+class OutputManifest:
+    """Up-to-date checks and records for the outputs of one script run.
+
+    一次脚本运行中各输出的「是否最新」判断与记录。
+
+    Public API
+    ----------
+    is_up_to_date(output, inputs, params)         – True if the work can be skipped
+    record(output, inputs, params, written=None)  – remember a finished output
+    save()                                        – write the touched manifests
+    checked / skipped                             – counters for the summary
+    """
+
+    def __init__(self, tool: str, script_path: str) -> None:
+        """
+        :param tool: Name stored with every entry; outputs of another tool
+                     with the same file name are never considered up to date.
+                     随条目保存的工具名；同名输出若由其他工具生成，不视为最新。
+        :param script_path: The running script (``__file__``); its digest,
+                            together with those of the ``_shared`` modules
+                            loaded so far, is the script version.
+                            当前脚本（``__file__``），其摘要与已加载的
+                            ``_shared`` 模块的摘要共同作为脚本版本。
+        """
+        self.tool = tool
+        self.version = script_version(script_path)
+        self.checked = 0
+        self.skipped = 0
+        # Loaded manifests and the entries changed by this run, per directory.
+        # 按目录保存已加载的清单，以及本次运行修改的条目。
+        self._manifests: dict[str, dict[str, Any]] = {}
+        self._changed: dict[str, dict[str, dict[str, Any]]] = {}
+        # (size, mtime_ns, sha256) of inputs seen in this run.
+        # 本次运行中见过的输入的（大小, 修改时间, SHA-256）。
+        self._inputs: dict[str, tuple[int, int, str]] = {}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def is_up_to_date(
+        self,
+        output_path: str | os.PathLike,
+        inputs: Iterable[str | os.PathLike],
+        params: Mapping[str, Any],
+    ) -> bool:
+        """Whether *output_path* was built from the same inputs and parameters.
+
+        判断 *output_path* 是否由相同的输入和参数生成。
+        """
+        self.checked += 1
+        directory, name = _split(output_path)
+        entry = self._load(directory).get(name)
+        if not isinstance(entry, dict):
+            return False
+        try:
+            fresh = (
+                entry.get("tool") == self.tool
+                and entry.get("version") == self.version
+                and entry.get("params") == _normalize(params)
+                and self._inputs_match(entry, inputs)
+                and _outputs_match(directory, entry.get("written"))
+            )
+        except (OSError, TypeError, ValueError, KeyError):
+            fresh = False
+        if fresh:
+            self.skipped += 1
+            if entry.pop("_touched", False):
+                # Store the new mtimes so touched inputs are not rehashed
+                # on every later run.
+                # 保存新的修改时间，避免之后每次运行都重新计算哈希。
+                self._changed.setdefault(directory, {})[name] = entry
+        return fresh
+
+    def record(
+        self,
+        output_path: str | os.PathLike,
+        inputs: Iterable[str | os.PathLike],
+        params: Mapping[str, Any],
+        written: Iterable[str | os.PathLike] | None = None,
+    ) -> None:
+        """Remember that *output_path* was built from *inputs* and *params*.
+
+        *written* lists the files the run actually wrote, all in the
+        directory of *output_path* (default: just *output_path*); pass an
+        empty list when the run legitimately produced nothing, e.g. a slimmer
+        that found no redundant page.
+
+        记录 *output_path* 由 *inputs* 和 *params* 生成。*written* 为本次实际
+        写出的文件，均须位于 *output_path* 所在目录（默认仅 *output_path*）；
+        若运行本就不产生输出（如瘦身器未发现冗余页），请传入空列表。
+        """
+        directory, name = _split(output_path)
+        if written is None:
+            written = [output_path]
+        try:
+            entry = {
+                "tool": self.tool,
+                "version": self.version,
+                "params": _normalize(params),
+                "inputs": [self._input_state(path) for path in inputs],
+                "written": [_output_state(path) for path in written],
+            }
+        except OSError:
+            return
+        self._load(directory)[name] = entry
+        self._changed.setdefault(directory, {})[name] = entry
+
+    def save(self) -> None:
+        """Merge this run's entries into the manifests on disk.
+
+        The read-merge-replace runs under ``<manifest>.lock`` so that
+        concurrent runs (the shards of one job) do not drop each other's
+        entries.  Failures are ignored: the outputs are already written, and
+        a missing entry only means the work is redone next time.
+
+        将本次运行的条目合并写入磁盘上的清单。读取、合并、替换在持有
+        ``<清单>.lock`` 期间进行，并发运行（同一任务的各分片）不会丢失彼此的
+        条目。失败会被忽略：输出已经写好，缺失的条目只会导致下次重新处理。
+        """
+        for directory, changed in self._changed.items():
+            manifest_path = os.path.join(directory, MANIFEST_NAME)
+            lock_path = _acquire_lock(f"{manifest_path}.lock")
+            if lock_path is None:
+                continue
+            try:
+                entries = _read_entries(manifest_path)
+                entries.update(changed)
+                _write_entries(manifest_path, entries)
+            finally:
+                _release_lock(lock_path)
+        self._changed.clear()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _load(self, directory: str) -> dict[str, Any]:
+        entries = self._manifests.get(directory)
+        if entries is None:
+            entries = self._manifests[directory] = _read_entries(
+                os.path.join(directory, MANIFEST_NAME)
+            )
+        return entries
+
+    def _inputs_match(self, entry: dict[str, Any], inputs: Iterable[str | os.PathLike]) -> bool:
+        """Compare *inputs* with the entry's; a touched but identical input
+        gets its new state written into *entry*, flagged ``_touched``."""
+        recorded = entry.get("inputs")
+        paths = [os.path.abspath(path) for path in inputs]
+        if not isinstance(recorded, list) or len(recorded) != len(paths):
+            return False
+        updated = []
+        for path, state in zip(paths, recorded):
+            if state["path"] != path:
+                return False
+            stat = os.stat(path)
+            if stat.st_size != state["size"]:
+                return False
+            if stat.st_mtime_ns == state["mtime_ns"]:
+                self._inputs[path] = (stat.st_size, stat.st_mtime_ns, state["sha256"])
+                updated.append(state)
+                continue
+            current = self._input_state(path)
+            if current["sha256"] != state["sha256"]:
+                return False
+            updated.append(current)
+            entry["_touched"] = True
+        entry["inputs"] = updated
+        return True
+
+    def _input_state(self, path: str | os.PathLike) -> dict[str, Any]:
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        known = self._inputs.get(path)
+        if known is None or known[:2] != (stat.st_size, stat.st_mtime_ns):
+            known = self._inputs[path] = (stat.st_size, stat.st_mtime_ns, file_sha256(path))
+        return {"path": path, "size": known[0], "mtime_ns": known[1], "sha256": known[2]}
+
+
+def script_version(script_path: str | os.PathLike) -> str:
+    """Digest of *script_path* and of every ``_shared`` module imported so far.
+
+    A fix in a shared module (a parser, the containment engine, ...) thus
+    invalidates the outputs of every tool that uses it.  Scripts import their
+    ``_shared`` modules at the top, before the manifest is created.
+
+    *script_path* 及目前已导入的所有 ``_shared`` 模块的摘要；共享模块（解析器、
+    包含判断引擎等）中的修复因此会使所有使用它的工具的输出失效。脚本在文件开头
+    导入 ``_shared`` 模块，早于创建清单。
+    """
+    digest = hashlib.sha256(file_sha256(script_path).encode("ascii"))
+    for name in sorted(sys.modules):
+        if name != "_shared" and not name.startswith("_shared."):
+            continue
+        module_path = getattr(sys.modules[name], "__file__", None)
+        if module_path:
+            digest.update(f"\0{name}\0{file_sha256(module_path)}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _split(output_path: str | os.PathLike) -> tuple[str, str]:
+    return os.path.split(os.path.abspath(output_path))
+
+
+def _normalize(params: Mapping[str, Any]) -> dict[str, Any]:
+    """Parameters as they read back from JSON (tuples become lists etc.)."""
+    return json.loads(json.dumps(dict(params), sort_keys=True))
+
+
+def _output_state(path: str | os.PathLike) -> dict[str, Any]:
+    stat = os.stat(path)
+    return {"name": os.path.basename(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _outputs_match(directory: str, recorded: Any) -> bool:
+    if not isinstance(recorded, list):
+        return False
+    for state in recorded:
+        try:
+            stat = os.stat(os.path.join(directory, state["name"]))
+        except FileNotFoundError:
+            return False
+        if (stat.st_size, stat.st_mtime_ns) != (state["size"], state["mtime_ns"]):
+            return False
+    return True
+
+
+def _write_entries(manifest_path: str, entries: dict[str, Any]) -> None:
+    temp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as fh:
+            json.dump(
+                {"format": _FORMAT_VERSION, "outputs": entries},
+                fh,
+                ensure_ascii=False,
+                indent=1,
+            )
+        os.replace(temp_path, manifest_path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def _acquire_lock(lock_path: str) -> str | None:
+    """Create *lock_path* exclusively, waiting up to ``_LOCK_TIMEOUT`` seconds.
+
+    Returns the path, or None when the lock could not be taken.
+    独占创建 *lock_path*，最多等待 ``_LOCK_TIMEOUT`` 秒；成功返回该路径，否则返回 None。
+    """
+    deadline = time.monotonic() + _LOCK_TIMEOUT
+    while True:
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return lock_path
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > _STALE_LOCK_AGE:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue
+        except OSError:
+            return None
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(0.05)
+
+
+def _release_lock(lock_path: str) -> None:
+    try:
+        os.remove(lock_path)
+    except OSError:
+        pass
+
+
+def _read_entries(manifest_path: str) -> dict[str, Any]:
+    try:
+        with open(manifest_path, encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("format") != _FORMAT_VERSION:
+        return {}
+    outputs = data.get("outputs")
+    return outputs if isinstance(outputs, dict) else {}
@@ -0,0 +1,199 @@
+"""
+Batched OCR of image files for the text extractor.
+文本提取器使用的批量图片 OCR。
+
+``OcrPool.submit`` takes every image of a run up front and returns one
+future per file, in input order, so OCR runs ahead of the caller:
+
+* on a GPU, or with one worker, a single ``easyocr.Reader`` recognizes the
+  images in this process while a thread pool decodes the next few;
+* on a multi-core CPU host, ``workers`` processes each hold a reader replica
+  (with ``cores / workers`` torch threads) and decode their own images.
+
+Images are downscaled so their longest side is at most ``MAX_OCR_SIDE`` –
+easyocr's detector works on a canvas of that size anyway, so larger photos
+only cost decoding time and memory – and JPEGs are decoded at a reduced
+scale right away.  The text crops of an image are fed to the recognizer in
+batches of ``RECOGNIZER_BATCH_SIZE``.  ``images_per_second`` reports the
+throughput.
+
+``OcrPool.submit`` 一次接收本次运行的所有图片，并按输入顺序为每个文件返回一个
+future，使 OCR 先于调用方进行：在 GPU 上或只有一个工作进程时，由本进程中的一个
+``easyocr.Reader`` 识别，同时由线程池预先解码后续图片；在多核 CPU 主机上，
+``workers`` 个进程各持有一个识别器副本（各用 ``核心数 / workers`` 个 torch 线程），
+并各自解码图片。图片会缩小到最长边不超过 ``MAX_OCR_SIDE``（easyocr 的检测器
+本就在该尺寸的画布上工作，更大的照片只会增加解码时间和内存），JPEG 会直接以
+缩小的比例解码。同一图片中的文本区域按 ``RECOGNIZER_BATCH_SIZE`` 分批送入识别器。
+``images_per_second`` 报告吞吐量。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+OCR_LANGUAGES = ["ch_sim", "en"]
+# easyocr's default detection canvas_size / easyocr 检测器默认的 canvas_size
+MAX_OCR_SIDE = 2560
+RECOGNIZER_BATCH_SIZE = 8
+
+HEIF_EXTS = (".heic", ".heif")
+RAW_EXTS = (".raw", ".cr2", ".nef", ".arw", ".dng")
+
+_DECODE_THREADS = 4
+# Images decoded ahead of the recognizer / 预先解码的图片数
+_DECODE_AHEAD = 2 * _DECODE_THREADS
+_THREADS_PER_REPLICA = 4
+
+
+def default_ocr_workers() -> int:
+    """Reader replicas for a CPU host: one per ``_THREADS_PER_REPLICA`` cores."""
+    return max(1, (os.cpu_count() or 1) // _THREADS_PER_REPLICA)
+
+
+def load_ocr_image(file_path: str | os.PathLike, max_side: int = MAX_OCR_SIDE):
+    """RGB array of an image file, its longest side at most *max_side*.
+
+    读取图片文件为 RGB 数组，最长边不超过 *max_side*。
+    """
+    import numpy as np
+    from PIL import Image
+
+    ext = Path(file_path).suffix.lower()
+    if ext in HEIF_EXTS:
+        import pillow_heif
+
+        heif_file = pillow_heif.read_heif(file_path)
+        image = Image.frombytes(heif_file.mode, heif_file.size, heif_file.data, "raw")
+    elif ext in RAW_EXTS:
+        import rawpy
+
+        with rawpy.imread(str(file_path)) as raw:
+            image = Image.fromarray(raw.postprocess())
+    else:
+        image = Image.open(file_path)
+        # JPEG: decode at the smallest DCT scale still at least max_side.
+        # JPEG: 以不小于 max_side 的最小 DCT 缩放比例解码。
+        image.draft("RGB", (max_side, max_side))
+    image = image.convert("RGB")
+    if max(image.size) > max_side:
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+    return np.asarray(image)
+
+
+def ocr_image(reader, image) -> str:
+    """Paragraph text of a decoded image / 已解码图片的段落文本"""
+    return "\n".join(
+        reader.readtext(image, detail=0, paragraph=True, batch_size=RECOGNIZER_BATCH_SIZE)
+    )
+
+
+class OcrPool:
+    """OCR of image files ahead of their use, in input order.
+
+    按输入顺序提前对图片文件进行 OCR。
+    """
+
+    def __init__(self, gpu: bool = False, workers: int = 0, max_side: int = MAX_OCR_SIDE) -> None:
+        """
+        :param workers: Reader processes on CPU (0: ``default_ocr_workers()``);
+                        a GPU always uses one reader in this process.
+                        CPU 上的识别进程数（0 表示自动）；GPU 始终在本进程中使用一个识别器。
+        """
+        import easyocr
+
+        self.workers = 1 if gpu else (workers if workers > 0 else default_ocr_workers())
+        self.max_side = max_side
+        self.completed = 0
+        self._lock = threading.Lock()
+        self._started: float | None = None
+        self._finished: float | None = None
+        if self.workers > 1:
+            # Builds once here so the model files are downloaded before the
+            # replicas start, and fails early like the single reader would.
+            # 先在此构建一次，确保副本启动前模型文件已下载，并与单个识别器一样尽早报错。
+            easyocr.Reader(OCR_LANGUAGES, gpu=False, verbose=False)
+            cpu_threads = max(1, (os.cpu_count() or 1) // self.workers)
+            self._processes = ProcessPoolExecutor(
+                self.workers, initializer=_init_replica, initargs=(cpu_threads,)
+            )
+        else:
+            self._reader = easyocr.Reader(OCR_LANGUAGES, gpu=gpu)
+            self._decoder = ThreadPoolExecutor(_DECODE_THREADS)
+
+    def submit(self, paths: Iterable[str | os.PathLike]) -> list[Future]:
+        """One future per path, resolving to its text / 为每个路径返回一个解析为其文本的 future"""
+        paths = list(paths)
+        with self._lock:
+            if self._started is None:
+                self._started = time.perf_counter()
+        if self.workers > 1:
+            futures = [self._processes.submit(_ocr_file, path, self.max_side) for path in paths]
+            for future in futures:
+                future.add_done_callback(self._count)
+        else:
+            futures = [Future() for _ in paths]
+            threading.Thread(target=self._run_local, args=(paths, futures), daemon=True).start()
+        return futures
+
+    @property
+    def images_per_second(self) -> float:
+        with self._lock:
+            if not self.completed or self._finished is None or self._finished <= self._started:
+                return 0.0
+            return self.completed / (self._finished - self._started)
+
+    def close(self) -> None:
+        if self.workers > 1:
+            self._processes.shutdown(cancel_futures=True)
+        else:
+            self._decoder.shutdown(cancel_futures=True)
+
+    def _run_local(self, paths: list, futures: list[Future]) -> None:
+        items = deque(zip(paths, futures))
+        decoding: deque = deque()
+        while items or decoding:
+            while items and len(decoding) < _DECODE_AHEAD:
+                path, future = items.popleft()
+                decoding.append((self._decoder.submit(load_ocr_image, path, self.max_side), future))
+            image, future = decoding.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(ocr_image(self._reader, image.result()))
+            except Exception as exc:
+                future.set_exception(exc)
+            self._count(future)
+
+    def _count(self, future: Future) -> None:
+        if future.cancelled():
+            return
+        with self._lock:
+            if future.exception() is None:
+                self.completed += 1
+            self._finished = time.perf_counter()
+
+
+# ---------------------------------------------------------------------------
+# Reader replicas
+# ---------------------------------------------------------------------------
+
+_replica_reader = None
+
+
+def _init_replica(cpu_threads: int) -> None:
+    global _replica_reader
+    import easyocr
+    import torch
+
+    torch.set_num_threads(cpu_threads)
+    _replica_reader = easyocr.Reader(OCR_LANGUAGES, gpu=False, verbose=False)
+
+
+def _ocr_file(path: str | os.PathLike, max_side: int) -> str:
+    return ocr_image(_replica_reader, load_ocr_image(path, max_side))
@@ -0,0 +1,184 @@
+"""
+Slide and page counts of OOXML files (.pptx / .docx) read from the zip alone.
+直接从 zip 容器读取 OOXML 文件（.pptx / .docx）的幻灯片数和页数。
+
+``python-pptx`` and ``python-docx`` parse every XML part and relationship of
+a document; a count only needs one small part:
+
+* PPTX – the ``<p:sldIdLst>`` of the presentation part (exactly what
+  ``len(Presentation(path).slides)`` counts), else ``<Slides>`` in
+  ``docProps/app.xml``;
+* DOCX – ``<Pages>`` in ``docProps/app.xml`` as last laid out by the editor,
+  else the words of the main document part, counted with ``iterparse`` so
+  the XML is never held in memory.  Unlike python-docx's ``paragraphs`` and
+  ``tables``, this also counts content controls and nested tables.
+  Generators that start from a template keep its stale ``<Pages>``, so
+  ``<Pages>`` is only used when it is plausible against ``<Words>`` of the
+  same part; the document part is streamed only when ``<Words>`` is missing
+  (or 0, as templates leave it) or disagrees.
+
+Malformed files raise ``ValueError`` so callers can fall back to the full
+libraries.
+
+``python-pptx`` 和 ``python-docx`` 会解析文档的全部 XML 部件和关系，而计数只
+需要其中一个很小的部件：PPTX 读取演示文稿部件的 ``<p:sldIdLst>``（与
+``len(Presentation(path).slides)`` 完全一致），否则读取 ``docProps/app.xml``
+的 ``<Slides>``；DOCX 读取 ``docProps/app.xml`` 中编辑器最后排版得到的
+``<Pages>``，否则用 ``iterparse`` 流式统计主文档部件的字数，不会把整个 XML
+载入内存（与 python-docx 的 ``paragraphs``/``tables`` 不同，内容控件和嵌套
+表格中的文字也会计入）。基于模板生成文档的程序会保留模板中过时的 ``<Pages>``
+，因此仅当 ``<Pages>`` 与同一部件中的 ``<Words>`` 相符时才采用；仅在
+``<Words>`` 缺失（或为模板遗留的 0）或与之不符时，才流式统计文档部件的字数。
+文件损坏时抛出 ``ValueError``，由调用方退回完整库。
+"""
+
+from __future__ import annotations
+
+import posixpath
+import zipfile
+from xml.etree import ElementTree
+
+# Words per page of the word-count estimate / 按字数估算页数时每页的字数
+WORDS_PER_PAGE = 500
+# A saved page count below estimate / this is taken to be stale.
+# 保存的页数低于 估算值 / 该值 时视为过时。
+STALE_PAGES_FACTOR = 4
+
+_PACKAGE_RELS = "_rels/.rels"
+_APP_PROPERTIES = "docProps/app.xml"
+_OFFICE_DOCUMENT_REL = "/officeDocument"
+
+# Transitional and Strict OOXML namespaces / 过渡版与严格版 OOXML 命名空间
+_PML_NAMESPACES = (
+    "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "http://purl.oclc.org/ooxml/presentationml/main",
+)
+_WML_NAMESPACES = (
+    "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+    "http://purl.oclc.org/ooxml/wordprocessingml/main",
+)
+
+
+def _tags(namespaces: tuple[str, ...], name: str) -> frozenset[str]:
+    return frozenset(f"{{{ns}}}{name}" for ns in namespaces)
+
+
+_SLIDE_ID_TAGS = _tags(_PML_NAMESPACES, "sldId")
+_PARAGRAPH_TAGS = _tags(_WML_NAMESPACES, "p")
+_TEXT_TAGS = _tags(_WML_NAMESPACES, "t")
+# Run content that python-docx renders as whitespace / python-docx 视为空白的内容
+_SPACE_TAGS = frozenset().union(*(_tags(_WML_NAMESPACES, name) for name in ("tab", "br", "cr")))
+
+
+def pptx_slide_count(file_path: str) -> int:
+    """Number of slides in a .pptx / .pptx 文件的幻灯片数"""
+    try:
+        with zipfile.ZipFile(file_path) as zf:
+            part = _main_part(zf, "ppt/presentation.xml")
+            try:
+                with zf.open(part) as fh:
+                    return sum(
+                        1 for _, elem in ElementTree.iterparse(fh) if elem.tag in _SLIDE_ID_TAGS
+                    )
+            except (KeyError, ElementTree.ParseError):
+                pass
+            slides = _app_property(zf, "Slides")
+    except zipfile.BadZipFile as exc:
+        raise ValueError(f"Not an OOXML package: {exc}") from exc
+    if slides is None:
+        raise ValueError("Neither a slide list nor a Slides property was found")
+    return slides
+
+
+def docx_saved_page_count(file_path: str, word_count: int | None = None) -> int | None:
+    """``<Pages>`` saved in a .docx's ``docProps/app.xml``, or None.
+
+    None also when the value cannot be trusted: below a quarter of the
+    estimate for *word_count*, which defaults to the saved ``<Words>`` – with
+    no (or zero) ``<Words>`` there is nothing to check against.  Only this
+    small part is read; callers stream ``docx_word_count`` and ask again
+    when None comes back.
+
+    .docx 的 ``docProps/app.xml`` 中保存的 ``<Pages>``。该值不可信时同样返回
+    None：低于按 *word_count* 估算页数的四分之一；*word_count* 默认为保存的
+    ``<Words>``，没有（或为 0）时无从核对。只读取这个很小的部件；返回 None 时
+    由调用方流式统计 ``docx_word_count`` 后再次调用。
+    """
+    try:
+        with zipfile.ZipFile(file_path) as zf:
+            pages = _app_property(zf, "Pages")
+            saved_words = _app_property(zf, "Words")
+    except zipfile.BadZipFile as exc:
+        raise ValueError(f"Not an OOXML package: {exc}") from exc
+    if not pages:
+        return None
+    if word_count is None:
+        # Templates leave <Words>0</Words> behind / 模板会遗留 <Words>0</Words>
+        word_count = saved_words or None
+    if word_count is None or pages * STALE_PAGES_FACTOR < estimate_pages(word_count):
+        return None
+    return pages
+
+
+def docx_word_count(file_path: str) -> int:
+    """Whitespace-separated words in a .docx's main document part.
+
+    Runs of a paragraph are joined before splitting, as in ``paragraph.text``.
+
+    .docx 主文档部件中以空白分隔的词数；与 ``paragraph.text`` 相同，先拼接
+    段落内的各个文本块再切分。
+    """
+    words = 0
+    pieces: list[str] = []
+    try:
+        with zipfile.ZipFile(file_path) as zf:
+            with zf.open(_main_part(zf, "word/document.xml")) as fh:
+                for _, elem in ElementTree.iterparse(fh):
+                    tag = elem.tag
+                    if tag in _TEXT_TAGS:
+                        if elem.text:
+                            pieces.append(elem.text)
+                    elif tag in _SPACE_TAGS:
+                        pieces.append(" ")
+                    elif tag in _PARAGRAPH_TAGS:
+                        words += len("".join(pieces).split())
+                        pieces.clear()
+                        elem.clear()
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as exc:
+        raise ValueError(f"Unreadable document part: {exc}") from exc
+    return words
+
+
+def estimate_pages(word_count: int) -> int:
+    """Page estimate from a word count (at least one page) / 按字数估算页数（至少一页）"""
+    return max(1, (word_count + WORDS_PER_PAGE - 1) // WORDS_PER_PAGE)
+
+
+# ---------------------------------------------------------------------------
+# Internal helpers
+# ---------------------------------------------------------------------------
+
+def _main_part(zf: zipfile.ZipFile, default: str) -> str:
+    """Zip name of the package's main part, found via ``_rels/.rels``."""
+    try:
+        with zf.open(_PACKAGE_RELS) as fh:
+            for _, elem in ElementTree.iterparse(fh):
+                if elem.get("Type", "").endswith(_OFFICE_DOCUMENT_REL) and elem.get("Target"):
+                    name = posixpath.normpath(elem.get("Target").lstrip("/"))
+                    zf.getinfo(name)
+                    return name
+    except (KeyError, ElementTree.ParseError):
+        pass
+    return default
+
+
+def _app_property(zf: zipfile.ZipFile, name: str) -> int | None:
+    """Integer ``<name>`` of ``docProps/app.xml``, or None."""
+    try:
+        with zf.open(_APP_PROPERTIES) as fh:
+            for _, elem in ElementTree.iterparse(fh):
+                if elem.tag.rpartition("}")[2] == name:
+                    return int((elem.text or "").strip())
+    except (KeyError, ValueError, ElementTree.ParseError):
+        pass
+    return None
@@ -0,0 +1,335 @@
+"""
+Content-addressed on-disk cache of per-page PDF text.
+按内容寻址的 PDF 逐页文本磁盘缓存。
+
+The PDF tools (both slimmers, the text extractor and the page counter) tend
+to be re-run on the same files.  This cache lets them skip parsing on a
+re-run.  Entries live in one SQLite database in the user cache directory and
+are keyed by the SHA-256 of the file's content plus a *namespace* naming the
+extractor, because each tool reads text in its own way.  An entry holds
+
+* the page count,
+* the text lines of every page, as that extractor produced them, and
+* optionally one digest per page of its content streams, so a re-run on an
+  edited file can reuse the pages whose streams did not change.
+
+Hashing is skipped while a path's size and mtime are unchanged.  Entries are
+evicted least-recently-used once the payloads exceed the size cap.  A cache
+that cannot be opened or written never fails a run; it just misses.
+
+Environment variables
+---------------------
+TOOLKIT_PAGE_CACHE      ``0``/``off`` disables the cache; any other value is
+                        used as the database path.
+TOOLKIT_PAGE_CACHE_MB   size cap in MiB (default 256).
+
+PDF 工具（两个瘦身脚本、文本提取器和页数统计器）经常对同一批文件重复运行。
+本缓存让它们在重复运行时跳过解析。条目保存在用户缓存目录下的一个 SQLite
+数据库中，以文件内容的 SHA-256 加上表示提取器的 *命名空间* 为键（各工具的
+文本读取方式不同）。每个条目包含页数、各页由该提取器得到的文本行，以及
+可选的每页内容流摘要，使已编辑文件在重新运行时可复用内容流未变的页面。
+
+路径的大小和修改时间不变时不会重新计算哈希。负载总量超过上限后，按最近
+最少使用原则淘汰条目。缓存无法打开或写入时绝不会导致运行失败，只会视为未命中。
+
+环境变量：``TOOLKIT_PAGE_CACHE``（``0``/``off`` 禁用，其他值作为数据库路径）、
+``TOOLKIT_PAGE_CACHE_MB``（容量上限，单位 MiB，默认 256）。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+import zlib
+from dataclasses import dataclass
+
+CACHE_ENV = "TOOLKIT_PAGE_CACHE"
+CACHE_SIZE_ENV = "TOOLKIT_PAGE_CACHE_MB"
+DEFAULT_MAX_MB = 256
+
+# Namespace of ``page.get_text()`` from PyMuPDF, shared by the tools using it.
+# Lines are the page text split at ``"\n"``, so joining them is lossless.
+# 使用 PyMuPDF ``page.get_text()`` 的工具共用的命名空间；各行为按 ``"\n"``
+# 切分的页面文本，重新拼接即可无损还原。
+PYMUPDF_TEXT_NAMESPACE = "pymupdf-text/1"
+# Namespace of plain page counts / 纯页数的命名空间
+PAGE_COUNT_NAMESPACE = "page-count/1"
+
+_DB_NAME = "page_cache.sqlite3"
+# Bump when the table layout or the payload format changes.
+# 表结构或负载格式变化时递增。
+_SCHEMA_VERSION = 1
+# Bookkeeping bytes charged per entry on top of its payload.
+_ENTRY_OVERHEAD = 128
+_HASH_CHUNK = 1 << 20
+
+
+@dataclass
+class CachedDocument:
+    """A cache hit / 一次缓存命中"""
+
+    page_count: int
+    page_lines: list[list[str]] | None = None
+    stream_digests: list[str] | None = None
+
+
+def default_cache_dir() -> str:
+    """Per-user cache directory for the toolkit / 工具箱的用户缓存目录"""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+        return os.path.join(base, "Toolkit", "Cache")
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Caches/Toolkit")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "toolkit")
+
+
+def open_page_cache() -> PageCache | None:
+    """Open the shared cache as configured by the environment.
+
+    Returns None when the cache is disabled or cannot be opened.
+
+    按环境变量配置打开共享缓存；缓存被禁用或无法打开时返回 None。
+    """
+    setting = os.environ.get(CACHE_ENV, "").strip()
+    if setting.lower() in ("0", "off", "false", "no"):
+        return None
+    db_path = setting or os.path.join(default_cache_dir(), _DB_NAME)
+    try:
+        max_mb = float(os.environ.get(CACHE_SIZE_ENV) or DEFAULT_MAX_MB)
+    except ValueError:
+        max_mb = DEFAULT_MAX_MB
+    try:
+        return PageCache(db_path, int(max_mb * 1024 * 1024))
+    except (OSError, sqlite3.Error):
+        return None
+
+
+class PageCache:
+    """SQLite-backed page-text cache with LRU size-based eviction.
+
+    基于 SQLite、按容量进行 LRU 淘汰的页面文本缓存。
+
+    Public API
+    ----------
+    get(path, namespace)              – cached entry of the file, or None
+    get_previous(path, namespace)     – entry of the path's previous content
+    page_count(path)                  – page count from any namespace
+    put(path, namespace, count, ...)  – store an entry (and evict)
+    close()
+    """
+
+    def __init__(self, db_path: str, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.max_bytes = max(0, max_bytes)
+        self._conn = sqlite3.connect(db_path, timeout=10)
+        # Digests computed in this process, and the digest a path had before
+        # its content changed.
+        # 本进程中算出的摘要，以及路径内容变化前的摘要。
+        self._digests: dict[str, str] = {}
+        self._previous: dict[str, str] = {}
+        self._init_schema()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, file_path: str, namespace: str) -> CachedDocument | None:
+        try:
+            return self._get(self.file_digest(file_path), namespace, touch=True)
+        except (OSError, sqlite3.Error, ValueError):
+            return None
+
+    def get_previous(self, file_path: str, namespace: str) -> CachedDocument | None:
+        """Entry for the content *file_path* had before it last changed.
+
+        Only known after ``get``/``put`` noticed the change in this process.
+
+        *file_path* 上次变化前内容对应的条目；仅在本进程的 ``get``/``put``
+        发现变化后可用。
+        """
+        digest = self._previous.get(self._path_key(file_path))
+        if digest is None:
+            return None
+        try:
+            return self._get(digest, namespace, touch=False)
+        except (sqlite3.Error, ValueError):
+            return None
+
+    def page_count(self, file_path: str) -> int | None:
+        """Page count recorded by any tool for the file's content.
+
+        任一工具为该文件内容记录的页数。
+        """
+        try:
+            digest = self.file_digest(file_path)
+            row = self._conn.execute(
+                "SELECT page_count FROM documents WHERE digest = ? LIMIT 1", (digest,)
+            ).fetchone()
+        except (OSError, sqlite3.Error):
+            return None
+        return row[0] if row else None
+
+    def put(
+        self,
+        file_path: str,
+        namespace: str,
+        page_count: int,
+        page_lines: list[list[str]] | None = None,
+        stream_digests: list[str] | None = None,
+    ) -> None:
+        payload = zlib.compress(
+            json.dumps({"lines": page_lines, "streams": stream_digests}, ensure_ascii=False).encode("utf-8")
+        )
+        size = len(payload) + _ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        try:
+            digest = self.file_digest(file_path)
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO documents"
+                    " (digest, namespace, page_count, payload, size, last_used)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (digest, namespace, page_count, payload, size, time.time()),
+                )
+                self._evict()
+        except (OSError, sqlite3.Error):
+            pass
+
+    def file_digest(self, file_path: str) -> str:
+        """SHA-256 of the file, rehashed only when its size or mtime changed.
+
+        文件的 SHA-256；仅当大小或修改时间变化时才重新计算。
+        """
+        key = self._path_key(file_path)
+        digest = self._digests.get(key)
+        if digest is not None:
+            return digest
+        stat = os.stat(file_path)
+        row = self._conn.execute(
+            "SELECT size, mtime_ns, digest FROM files WHERE path = ?", (key,)
+        ).fetchone()
+        if row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            digest = row[2]
+        else:
+            digest = file_sha256(file_path)
+            if row is not None and row[2] != digest:
+                self._previous[key] = row[2]
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO files (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                    (key, stat.st_size, stat.st_mtime_ns, digest),
+                )
+        self._digests[key] = digest
+        return digest
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _init_schema(self) -> None:
+        conn = self._conn
+        conn.execute("PRAGMA journal_mode=WAL")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        with conn:
+            if version != _SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS files")
+                conn.execute("DROP TABLE IF EXISTS documents")
+                conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                " path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, digest TEXT)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                " digest TEXT, namespace TEXT, page_count INTEGER, payload BLOB,"
+                " size INTEGER, last_used REAL, PRIMARY KEY (digest, namespace))"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS documents_last_used ON documents (last_used)"
+            )
+
+    def _get(self, digest: str, namespace: str, touch: bool) -> CachedDocument | None:
+        row = self._conn.execute(
+            "SELECT page_count, payload FROM documents WHERE digest = ? AND namespace = ?",
+            (digest, namespace),
+        ).fetchone()
+        if row is None:
+            return None
+        if touch:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE documents SET last_used = ? WHERE digest = ? AND namespace = ?",
+                    (time.time(), digest, namespace),
+                )
+        data = json.loads(zlib.decompress(row[1]))
+        return CachedDocument(row[0], data.get("lines"), data.get("streams"))
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cap is met.
+
+        Must be called inside a transaction.
+        """
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM documents").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims: list[tuple[str, str]] = []
+        for digest, namespace, size in self._conn.execute(
+            "SELECT digest, namespace, size FROM documents ORDER BY last_used"
+        ):
+            victims.append((digest, namespace))
+            total -= size
+            if total <= self.max_bytes:
+                break
+        self._conn.executemany(
+            "DELETE FROM documents WHERE digest = ? AND namespace = ?", victims
+        )
+        self._conn.execute(
+            "DELETE FROM files WHERE digest NOT IN (SELECT digest FROM documents)"
+        )
+
+    @staticmethod
+    def _path_key(file_path: str) -> str:
+        return os.path.normcase(os.path.abspath(file_path))
+
+
+def pymupdf_page_texts(fitz, file_path: str, cache: PageCache | None = None) -> list[str]:
+    """``page.get_text()`` of every page, served from *cache* when possible.
+
+    *fitz* is the imported PyMuPDF module.
+
+    返回每页的 ``page.get_text()``，尽可能从 *cache* 读取。*fitz* 为已导入的
+    PyMuPDF 模块。
+    """
+    if cache is not None:
+        cached = cache.get(file_path, PYMUPDF_TEXT_NAMESPACE)
+        if cached is not None and cached.page_lines is not None:
+            return ["\n".join(lines) for lines in cached.page_lines]
+    with fitz.open(file_path) as doc:
+        page_texts = [page.get_text() for page in doc]
+    if cache is not None:
+        cache.put(
+            file_path,
+            PYMUPDF_TEXT_NAMESPACE,
+            len(page_texts),
+            [text.split("\n") for text in page_texts],
+        )
+    return page_texts
+
+
+def file_sha256(file_path: str) -> str:
+    """SHA-256 hex digest of a file, read in chunks / 分块读取计算文件的 SHA-256"""
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as fh:
+        while chunk := fh.read(_HASH_CHUNK):
+            sha.update(chunk)
+    return sha.hexdigest()
@@ -0,0 +1,681 @@
+"""
+Minimal, dependency-free access to the objects of a PDF file.
+不依赖第三方库的 PDF 对象读取模块。
+
+``XrefObjects`` reads the cross-reference data (classic ``xref`` tables,
+cross-reference streams, hybrid files and the whole ``/Prev`` chain of
+incremental updates) and materialises objects lazily from their offsets or
+object streams; ``load_objects`` falls back to a regex scan of the file when
+that data is damaged.  ``count_pages`` uses the same reader to answer the
+page count from the trailer, the catalog and the page-tree root alone.
+
+Used by the standalone slimmer and the page counter.
+
+``XrefObjects`` 读取交叉引用数据（传统 ``xref`` 表、交叉引用流、混合文件以及
+增量更新的整条 ``/Prev`` 链），并按偏移量或对象流按需加载对象；交叉引用
+数据损坏时，``load_objects`` 退回到对整个文件的正则扫描。``count_pages``
+使用同一读取器，仅凭 trailer、文档目录和页面树根节点得出页数。
+供独立版瘦身器和页数统计器使用。
+"""
+
+from __future__ import annotations
+
+import base64
+import mmap
+import os
+import re
+import zlib
+from collections.abc import Callable, Iterator, Mapping
+from dataclasses import dataclass, field
+
+# Anything holding the file's bytes: ``bytes`` or a read-only ``mmap``.
+Buffer = bytes | mmap.mmap
+
+
+@dataclass
+class PdfObject:
+    """An indirect object kept as the ``[start, end)`` view of ``source``.
+
+    Nothing is copied until ``body``/``dict_part`` is read, so a memory-mapped
+    file is only paged in for the objects that are actually inspected.
+    """
+
+    number: int
+    generation: int
+    source: Buffer
+    start: int
+    end: int
+    body_start: int = field(init=False)
+    body_end: int = field(init=False)
+    stream_pos: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.body_start = self.source.find(b"obj", self.start, self.end) + 3
+        self.body_end = self.source.rfind(b"endobj", self.start, self.end)
+        if self.body_end < 0:
+            self.body_end = self.end
+        self.stream_pos = self.source.find(b"stream", self.body_start, self.body_end)
+
+    @property
+    def raw(self) -> bytes:
+        return self.source[self.start : self.end]
+
+    @property
+    def body(self) -> bytes:
+        return self.source[self.body_start : self.body_end]
+
+    @property
+    def dict_part(self) -> bytes:
+        end = self.stream_pos if self.stream_pos >= 0 else self.body_end
+        return self.source[self.body_start : end]
+
+    def is_stream(self) -> bool:
+        return self.stream_pos >= 0
+
+
+def _apply_filters(stream: bytes, filters: list[str]) -> bytes:
+    data = stream
+    for flt in filters:
+        if flt == "ASCIIHexDecode":
+            hex_data = re.sub(rb"\s+", b"", data)
+            hex_data = hex_data.rstrip(b">")
+            if len(hex_data) % 2 == 1:
+                hex_data += b"0"
+            data = bytes.fromhex(hex_data.decode("ascii"))
+        elif flt == "ASCII85Decode":
+            try:
+                data = base64.a85decode(data, adobe=True)
+            except Exception as exc:  # pragma: no cover - defensive wrapper
+                raise ValueError(f"Invalid ASCII85 stream: {exc}") from exc
+        elif flt == "FlateDecode":
+            data = zlib.decompress(data)
+    return data
+
+
+def _parse_filters(dict_part: bytes) -> list[str]:
+    filters: list[str] = []
+    match = re.search(rb"/Filter\s*(\[.*?\]|/[A-Za-z0-9]+)", dict_part, re.S)
+    if not match:
+        return filters
+    token = match.group(1)
+    filters = re.findall(rb"/([A-Za-z0-9]+)", token)
+    return [f.decode("ascii", errors="ignore") for f in filters]
+
+
+def _apply_predictor(data: bytes, dict_part: bytes) -> bytes:
+    """Undo a PNG predictor (``/Predictor`` >= 10) declared in ``/DecodeParms``."""
+    match = re.search(rb"/Predictor\s+(\d+)", dict_part)
+    if not match or int(match.group(1)) < 10:
+        return data
+    columns_match = re.search(rb"/Columns\s+(\d+)", dict_part)
+    colors_match = re.search(rb"/Colors\s+(\d+)", dict_part)
+    bpc_match = re.search(rb"/BitsPerComponent\s+(\d+)", dict_part)
+    columns = int(columns_match.group(1)) if columns_match else 1
+    colors = int(colors_match.group(1)) if colors_match else 1
+    bpc = int(bpc_match.group(1)) if bpc_match else 8
+    bpp = max(1, colors * bpc // 8)
+    row_len = (columns * colors * bpc + 7) // 8
+
+    out = bytearray()
+    prev = bytearray(row_len)
+    for pos in range(0, len(data), row_len + 1):
+        filter_type = data[pos]
+        row = bytearray(data[pos + 1 : pos + 1 + row_len])
+        if filter_type == 1:  # Sub
+            for i in range(bpp, len(row)):
+                row[i] = (row[i] + row[i - bpp]) & 0xFF
+        elif filter_type == 2:  # Up
+            for i in range(len(row)):
+                row[i] = (row[i] + prev[i]) & 0xFF
+        elif filter_type == 3:  # Average
+            for i in range(len(row)):
+                left = row[i - bpp] if i >= bpp else 0
+                row[i] = (row[i] + ((left + prev[i]) >> 1)) & 0xFF
+        elif filter_type == 4:  # Paeth
+            for i in range(len(row)):
+                left = row[i - bpp] if i >= bpp else 0
+                up_left = prev[i - bpp] if i >= bpp else 0
+                estimate = left + prev[i] - up_left
+                dist_left, dist_up, dist_up_left = (
+                    abs(estimate - left),
+                    abs(estimate - prev[i]),
+                    abs(estimate - up_left),
+                )
+                if dist_left <= dist_up and dist_left <= dist_up_left:
+                    predicted = left
+                elif dist_up <= dist_up_left:
+                    predicted = prev[i]
+                else:
+                    predicted = up_left
+                row[i] = (row[i] + predicted) & 0xFF
+        out += row
+        prev = row
+    return bytes(out)
+
+
+_STREAM_KEYWORD_RE = re.compile(rb"stream\r?\n")
+
+
+def raw_stream(obj: PdfObject) -> bytes | None:
+    """Copy out just the (still encoded) stream data of *obj*."""
+    if not obj.is_stream():
+        return None
+    match = _STREAM_KEYWORD_RE.search(obj.source, obj.stream_pos, obj.body_end)
+    if not match:
+        return None
+    start = match.end()
+    end = obj.source.rfind(b"endstream", start, obj.body_end)
+    if end < 0:
+        return None
+    if obj.source[end - 2 : end] == b"\r\n":
+        end -= 2
+    elif obj.source[end - 1 : end] in (b"\n", b"\r"):
+        end -= 1
+    return obj.source[start:end]
+
+
+def _decode_stream(obj: PdfObject) -> bytes:
+    """Decode *obj*'s stream, raising on any error (used for xref/object streams)."""
+    stream = raw_stream(obj)
+    if stream is None:
+        raise ValueError(f"Object {obj.number} {obj.generation} is not a stream")
+    filters = _parse_filters(obj.dict_part)
+    data = _apply_filters(stream, filters) if filters else stream
+    return _apply_predictor(data, obj.dict_part)
+
+
+def extract_stream_bytes(obj: PdfObject) -> bytes | None:
+    stream = raw_stream(obj)
+    if stream is None:
+        return None
+    filters = _parse_filters(obj.dict_part)
+    try:
+        return _apply_filters(stream, filters) if filters else stream
+    except Exception:
+        return stream
+
+
+def parse_objects(data: Buffer) -> dict[tuple[int, int], PdfObject]:
+    objects: dict[tuple[int, int], PdfObject] = {}
+    for match in re.finditer(rb"(?m)^(\d+)\s+(\d+)\s+obj\b", data):
+        start = match.start()
+        end = data.find(b"endobj", match.end())
+        if end < 0:
+            continue
+        obj = PdfObject(
+            number=int(match.group(1)),
+            generation=int(match.group(2)),
+            source=data,
+            start=start,
+            end=end + 6,
+        )
+        objects[(obj.number, obj.generation)] = obj
+    return objects
+
+
+# ---------------------------------------------------------------------------
+# Cross-reference driven, lazy object access
+# ---------------------------------------------------------------------------
+
+_WHITESPACE = b" \t\r\n\f\x00"
+_STARTXREF_RE = re.compile(rb"startxref\s+(\d+)\s*%%EOF")
+_OBJ_HEADER_RE = re.compile(rb"(\d+)\s+(\d+)\s+obj\b")
+_XREF_SUBSECTION_RE = re.compile(rb"\s*(\d+)\s+(\d+)[ \t]*(?:\r\n|\r|\n)")
+_XREF_ENTRY_RE = re.compile(rb"\s*(\d+)\s+(\d+)\s+([nf])")
+_DICT_TOKEN_RE = re.compile(rb"<<|>>|[<(%]")
+_EOL_RE = re.compile(rb"[\r\n]")
+_LITERAL_TOKEN_RE = re.compile(rb"\\.|[()]", re.S)
+
+# Cross-reference entry kinds: (kind, field2, field3)
+#   XREF_FREE        – free entry
+#   XREF_OFFSET      – (offset, generation) of an uncompressed object
+#   XREF_COMPRESSED  – (object stream number, index within the stream)
+XREF_FREE, XREF_OFFSET, XREF_COMPRESSED = 0, 1, 2
+
+
+def _at(data: Buffer, pos: int, token: bytes) -> bool:
+    """``data.startswith(token, pos)`` for buffers (``mmap`` lacks startswith)."""
+    return data[pos : pos + len(token)] == token
+
+
+def _skip_whitespace(data: Buffer, pos: int) -> int:
+    while pos < len(data):
+        if data[pos] in _WHITESPACE:
+            pos += 1
+        elif data[pos] == 0x25:  # % comment
+            eol = _EOL_RE.search(data, pos)
+            pos = eol.end() if eol else len(data)
+        else:
+            break
+    return pos
+
+
+def literal_end(data: Buffer, pos: int) -> int:
+    """Return the offset just past the literal string starting at ``data[pos] == '('``."""
+    depth = 0
+    for match in _LITERAL_TOKEN_RE.finditer(data, pos):
+        token = match.group(0)
+        if token == b"(":
+            depth += 1
+        elif token == b")":
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    raise ValueError("Unterminated literal string")
+
+
+def _dict_end(data: Buffer, pos: int) -> int:
+    """Return the offset just past the dictionary starting at ``data[pos:pos+2] == '<<'``."""
+    depth = 0
+    while True:
+        match = _DICT_TOKEN_RE.search(data, pos)
+        if not match:
+            raise ValueError("Unterminated dictionary")
+        token = match.group(0)
+        if token == b"<<":
+            depth += 1
+            pos = match.end()
+        elif token == b">>":
+            depth -= 1
+            pos = match.end()
+            if depth == 0:
+                return pos
+        elif token == b"<":  # hex string
+            end = data.find(b">", match.end())
+            if end < 0:
+                raise ValueError("Unterminated hex string")
+            pos = end + 1
+        elif token == b"(":
+            pos = literal_end(data, match.start())
+        else:  # comment
+            eol = _EOL_RE.search(data, match.end())
+            pos = eol.end() if eol else len(data)
+
+
+def _dict_int(dict_part: bytes, key: bytes) -> int | None:
+    match = re.search(re.escape(key) + rb"\s+(\d+)\b(?!\s+\d+\s+R)", dict_part)
+    return int(match.group(1)) if match else None
+
+
+def _dict_int_array(dict_part: bytes, key: bytes) -> list[int] | None:
+    match = re.search(re.escape(key) + rb"\s*\[([\d\s]*)\]", dict_part)
+    return [int(v) for v in match.group(1).split()] if match else None
+
+
+def _object_span(
+    data: Buffer, offset: int, length_of: Callable[[tuple[int, int]], int | None]
+) -> tuple[int, int, int]:
+    """Locate the object whose header starts at *offset*.
+
+    Returns ``(number, generation, end)`` where ``end`` is just past
+    ``endobj``.  A stream's ``/Length`` is honoured (resolving an indirect
+    length through *length_of*) so binary data containing ``endobj`` cannot
+    cut the object short.
+    """
+    pos = _skip_whitespace(data, offset)
+    header = _OBJ_HEADER_RE.match(data, pos)
+    if not header:
+        raise ValueError(f"No object header at offset {offset}")
+    body_pos = _skip_whitespace(data, header.end())
+    search_from = body_pos
+    if _at(data, body_pos, b"<<"):
+        dict_end = _dict_end(data, body_pos)
+        after = _skip_whitespace(data, dict_end)
+        search_from = dict_end
+        if _at(data, after, b"stream"):
+            stream_start = after + 6
+            if _at(data, stream_start, b"\r\n"):
+                stream_start += 2
+            elif data[stream_start : stream_start + 1] in (b"\n", b"\r"):
+                stream_start += 1
+            dict_part = data[body_pos:dict_end]
+            length = _dict_int(dict_part, b"/Length")
+            if length is None:
+                length_ref = extract_ref(dict_part, rb"/Length")
+                length = length_of(length_ref) if length_ref else None
+            stream_end = stream_start + length if length is not None else -1
+            if stream_end >= 0 and _at(data, _skip_whitespace(data, stream_end), b"endstream"):
+                search_from = stream_end
+            else:
+                endstream = data.find(b"endstream", stream_start)
+                search_from = endstream if endstream >= 0 else stream_start
+    end = data.find(b"endobj", search_from)
+    if end < 0:
+        raise ValueError(f"Object at offset {offset} has no endobj")
+    return int(header.group(1)), int(header.group(2)), end + 6
+
+
+class XrefObjects(Mapping):
+    """Lazy ``{(number, generation): PdfObject}`` view of a PDF.
+
+    The cross-reference data (classic ``xref`` tables, cross-reference
+    streams, hybrid ``/XRefStm`` files and the whole ``/Prev`` chain) is read
+    once; objects are then materialised on first access straight from their
+    offset, or unpacked from the ``/ObjStm`` object stream that holds them.
+    Only the objects actually visited (page tree, content streams) are ever
+    parsed.  Should an xref offset turn out to be wrong, the object is looked
+    up in a one-off regex scan of the file instead.
+    """
+
+    def __init__(self, data: Buffer) -> None:
+        self.data = data
+        self.entries: dict[int, tuple[int, int, int]] = {}
+        self.trailer = b""
+        self.startxref = self._find_startxref()
+        self.xref_is_stream = False
+        self._cache: dict[tuple[int, int], PdfObject] = {}
+        self._object_streams: dict[int, list[tuple[int, bytes]]] = {}
+        self._scanned: dict[tuple[int, int], PdfObject] | None = None
+        self._read_xref_chain()
+
+    @property
+    def root_ref(self) -> tuple[int, int]:
+        ref = extract_ref(self.trailer, rb"/Root")
+        if ref is None:
+            raise ValueError("Trailer has no /Root")
+        return ref
+
+    # Mapping interface -----------------------------------------------------
+
+    def __getitem__(self, ref: tuple[int, int]) -> PdfObject:
+        obj = self._cache.get(ref)
+        if obj is None:
+            obj = self._load(ref)
+            self._cache[ref] = obj
+        return obj
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        for number, (kind, _, third) in self.entries.items():
+            if kind == XREF_OFFSET:
+                yield number, third
+            elif kind == XREF_COMPRESSED:
+                yield number, 0
+
+    def __len__(self) -> int:
+        return sum(1 for kind, _, _ in self.entries.values() if kind != XREF_FREE)
+
+    # Cross-reference reading -----------------------------------------------
+
+    def _find_startxref(self) -> int:
+        pos = self.data.rfind(b"startxref")
+        match = _STARTXREF_RE.match(self.data, pos) if pos >= 0 else None
+        if not match:
+            raise ValueError("Could not locate startxref")
+        return int(match.group(1))
+
+    def _read_xref_chain(self) -> None:
+        offset: int | None = self.startxref
+        visited: set[int] = set()
+        newest = True
+        while offset is not None and offset not in visited:
+            visited.add(offset)
+            pos = _skip_whitespace(self.data, offset)
+            if _at(self.data, pos, b"xref"):
+                section, trailer = self._read_xref_table(pos + 4)
+                xref_stm = _dict_int(trailer, b"/XRefStm")
+                if xref_stm is not None and xref_stm not in visited:
+                    visited.add(xref_stm)
+                    # Hybrid file: the stream lists the objects kept in object
+                    # streams, which the table marks as free or omits.
+                    stream_section, _ = self._read_xref_stream(xref_stm)
+                    for number, entry in stream_section.items():
+                        if section.get(number, (XREF_FREE,))[0] == XREF_FREE:
+                            section[number] = entry
+                is_stream = False
+            else:
+                section, trailer = self._read_xref_stream(pos)
+                is_stream = True
+            if newest:
+                self.trailer = trailer
+                self.xref_is_stream = is_stream
+                newest = False
+            for number, entry in section.items():
+                self.entries.setdefault(number, entry)
+            offset = _dict_int(trailer, b"/Prev")
+        if not self.entries:
+            raise ValueError("Empty cross-reference data")
+
+    def _read_xref_table(self, pos: int) -> tuple[dict[int, tuple[int, int, int]], bytes]:
+        section: dict[int, tuple[int, int, int]] = {}
+        data = self.data
+        while True:
+            subsection = _XREF_SUBSECTION_RE.match(data, pos)
+            if not subsection:
+                break
+            first, count = int(subsection.group(1)), int(subsection.group(2))
+            pos = subsection.end()
+            for number in range(first, first + count):
+                entry = _XREF_ENTRY_RE.match(data, pos)
+                if not entry:
+                    raise ValueError("Malformed xref table entry")
+                pos = entry.end()
+                if entry.group(3) == b"n":
+                    section[number] = (XREF_OFFSET, int(entry.group(1)), int(entry.group(2)))
+                else:
+                    section[number] = (XREF_FREE, 0, int(entry.group(2)))
+        pos = _skip_whitespace(data, pos)
+        if not _at(data, pos, b"trailer"):
+            raise ValueError("xref table is not followed by a trailer")
+        dict_start = _skip_whitespace(data, pos + 7)
+        return section, data[dict_start : _dict_end(data, dict_start)]
+
+    def _read_xref_stream(self, offset: int) -> tuple[dict[int, tuple[int, int, int]], bytes]:
+        number, generation, end = _object_span(self.data, offset, self._resolve_length)
+        obj = PdfObject(number, generation, self.data, offset, end)
+        dict_part = obj.dict_part
+        if not re.search(rb"/Type\s*/XRef\b", dict_part):
+            raise ValueError(f"Object at offset {offset} is not a cross-reference stream")
+        widths = _dict_int_array(dict_part, b"/W")
+        size = _dict_int(dict_part, b"/Size")
+        if not widths or len(widths) != 3 or size is None:
+            raise ValueError("Cross-reference stream lacks /W or /Size")
+        index = _dict_int_array(dict_part, b"/Index") or [0, size]
+        rows = _decode_stream(obj)
+
+        section: dict[int, tuple[int, int, int]] = {}
+        row_len = sum(widths)
+        w1, w2, _ = widths
+        pos = 0
+        for first, count in zip(index[::2], index[1::2]):
+            for number in range(first, first + count):
+                row = rows[pos : pos + row_len]
+                if len(row) < row_len:
+                    raise ValueError("Truncated cross-reference stream")
+                pos += row_len
+                kind = int.from_bytes(row[:w1], "big") if w1 else XREF_OFFSET
+                field2 = int.from_bytes(row[w1 : w1 + w2], "big")
+                field3 = int.from_bytes(row[w1 + w2 :], "big")
+                section[number] = (kind, field2, field3)
+        return section, dict_part.strip()
+
+    # Object loading ----------------------------------------------------------
+
+    def _load(self, ref: tuple[int, int]) -> PdfObject:
+        entry = self.entries.get(ref[0])
+        try:
+            if entry is not None and entry[0] == XREF_OFFSET and entry[2] == ref[1]:
+                return self._load_at(entry[1], ref)
+            if entry is not None and entry[0] == XREF_COMPRESSED and ref[1] == 0:
+                return self._load_compressed(ref[0], entry[1], entry[2])
+        except (ValueError, IndexError, zlib.error):
+            pass
+        return self._scan()[ref]
+
+    def _load_at(self, offset: int, ref: tuple[int, int]) -> PdfObject:
+        number, generation, end = _object_span(self.data, offset, self._resolve_length)
+        if (number, generation) != ref:
+            raise ValueError(f"xref offset {offset} does not point at {ref_text(ref)}")
+        start = _skip_whitespace(self.data, offset)
+        return PdfObject(number, generation, self.data, start, end)
+
+    def _load_compressed(self, number: int, stream_number: int, index: int) -> PdfObject:
+        members = self._object_streams.get(stream_number)
+        if members is None:
+            members = _unpack_object_stream(self[(stream_number, 0)])
+            self._object_streams[stream_number] = members
+        member_number, body = members[index]
+        if member_number != number:
+            raise ValueError(f"Object stream {stream_number} does not hold object {number}")
+        return _object_from_body(number, body)
+
+    def _resolve_length(self, ref: tuple[int, int]) -> int | None:
+        if ref in self._cache or self.entries.get(ref[0], (XREF_FREE,))[0] != XREF_FREE:
+            match = re.match(rb"\s*(\d+)", self[ref].body)
+            return int(match.group(1)) if match else None
+        return None
+
+    def _scan(self) -> dict[tuple[int, int], PdfObject]:
+        if self._scanned is None:
+            self._scanned = parse_objects(self.data)
+            _expand_object_streams(self._scanned)
+        return self._scanned
+
+
+def _object_from_body(number: int, body: bytes) -> PdfObject:
+    raw = f"{number} 0 obj\n".encode("ascii") + body.strip() + b"\nendobj"
+    return PdfObject(number=number, generation=0, source=raw, start=0, end=len(raw))
+
+
+def _unpack_object_stream(stream_obj: PdfObject) -> list[tuple[int, bytes]]:
+    """Return ``[(object number, object bytes), ...]`` stored in an ``/ObjStm``."""
+    dict_part = stream_obj.dict_part
+    count = _dict_int(dict_part, b"/N")
+    first = _dict_int(dict_part, b"/First")
+    if count is None or first is None:
+        raise ValueError(f"Object stream {stream_obj.number} lacks /N or /First")
+    data = _decode_stream(stream_obj)
+    header = [int(v) for v in data[:first].split()[: 2 * count]]
+    numbers, offsets = header[::2], header[1::2]
+    members: list[tuple[int, bytes]] = []
+    for i, (number, offset) in enumerate(zip(numbers, offsets)):
+        end = first + offsets[i + 1] if i + 1 < len(offsets) else len(data)
+        members.append((number, data[first + offset : end]))
+    return members
+
+
+def _expand_object_streams(objects: dict[tuple[int, int], PdfObject]) -> None:
+    """Add the members of every ``/ObjStm`` to a regex-scanned object map."""
+    for obj in list(objects.values()):
+        if not re.search(rb"/Type\s*/ObjStm\b", obj.dict_part):
+            continue
+        try:
+            members = _unpack_object_stream(obj)
+        except (ValueError, IndexError, zlib.error):
+            continue
+        for number, body in members:
+            objects.setdefault((number, 0), _object_from_body(number, body))
+
+
+def load_objects(
+    data: Buffer,
+) -> tuple[Mapping[tuple[int, int], PdfObject], tuple[int, int]]:
+    """Return ``(objects, catalog_ref)`` for *data*.
+
+    The xref-driven ``XrefObjects`` view is preferred; files whose
+    cross-reference data is missing or damaged fall back to a full regex scan
+    (which still unpacks object streams).
+    """
+    try:
+        objects = XrefObjects(data)
+        catalog_ref = objects.root_ref
+        objects[catalog_ref]
+        return objects, catalog_ref
+    except (ValueError, KeyError, IndexError, zlib.error):
+        pass
+    scanned = parse_objects(data)
+    _expand_object_streams(scanned)
+    return scanned, _find_catalog(scanned)
+
+
+def ref_text(ref: tuple[int, int]) -> str:
+    return f"{ref[0]} {ref[1]} R"
+
+
+def _find_catalog(objects: dict[tuple[int, int], PdfObject]) -> tuple[int, int]:
+    for key, obj in objects.items():
+        dict_part = obj.dict_part
+        if b"/Type /Catalog" in dict_part or b"/Type/Catalog" in dict_part:
+            return key
+    raise ValueError("Catalog object not found")
+
+
+def extract_ref(obj_body: bytes, field_name: bytes) -> tuple[int, int] | None:
+    match = re.search(field_name + rb"\s+(\d+)\s+(\d+)\s+R", obj_body)
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+
+def extract_refs_from_kids(obj_body: bytes) -> list[tuple[int, int]]:
+    match = re.search(rb"/Kids\s*\[(.*?)\]", obj_body, re.S)
+    if not match:
+        return []
+    return [(int(a), int(b)) for a, b in re.findall(rb"(\d+)\s+(\d+)\s+R", match.group(1))]
+
+
+def extract_count(obj_body: bytes) -> int:
+    match = re.search(rb"/Count\s+(\d+)", obj_body)
+    if not match:
+        return 0
+    return int(match.group(1))
+
+
+def is_pages_node(obj: PdfObject) -> bool:
+    dict_part = obj.dict_part
+    return b"/Type /Pages" in dict_part or b"/Type/Pages" in dict_part
+
+
+def is_page_node(obj: PdfObject) -> bool:
+    dict_part = obj.dict_part
+    return (
+        (b"/Type /Page" in dict_part or b"/Type/Page" in dict_part)
+        and b"/Type /Pages" not in dict_part
+        and b"/Type/Pages" not in dict_part
+    )
+
+
+# ---------------------------------------------------------------------------
+# Page count
+# ---------------------------------------------------------------------------
+
+_COUNT_RE = re.compile(rb"/Count\s+(\d+)(?:\s+(\d+)\s+R)?")
+
+
+def count_pages(file_path: str) -> int:
+    """Page count read from ``/Root`` → ``/Pages`` → ``/Count``.
+
+    Only the cross-reference data, the catalog and the page-tree root are
+    read (through a memory map), so the cost does not grow with the number
+    or size of the pages.  Raises ``ValueError`` when the file cannot be
+    read this way; callers fall back to a full parser.
+
+    按 ``/Root`` → ``/Pages`` → ``/Count`` 读取页数。仅读取交叉引用数据、
+    文档目录和页面树根节点（通过内存映射），耗时与页面数量和大小无关。
+    无法以此方式读取时抛出 ``ValueError``，由调用方退回完整解析器。
+    """
+    with open(file_path, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            raise ValueError("Empty file")
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            try:
+                objects = XrefObjects(data)
+                catalog = objects[objects.root_ref]
+                pages_ref = extract_ref(catalog.dict_part, rb"/Pages")
+                if pages_ref is None:
+                    raise ValueError("Catalog has no /Pages")
+                pages = objects[pages_ref]
+                if not is_pages_node(pages):
+                    raise ValueError("/Pages is not a page-tree node")
+                match = _COUNT_RE.search(pages.dict_part)
+                if match is None:
+                    raise ValueError("Page-tree root has no /Count")
+                if match.group(2) is None:
+                    return int(match.group(1))
+                # Indirect count: ``/Count 12 0 R``.
+                count_obj = objects[(int(match.group(1)), int(match.group(2)))]
+                value = re.match(rb"\s*(\d+)", count_obj.body)
+                if value is None:
+                    raise ValueError("Indirect /Count is not an integer")
+                return int(value.group(1))
+            except (KeyError, IndexError, zlib.error) as exc:
+                raise ValueError(f"Unreadable cross-reference data: {exc}") from exc
@@ -0,0 +1,53 @@
+"""
+Parallel-shard support for batch scripts run by the launcher.
+启动器并行分片模式下批处理脚本的支持代码。
+
+A script opts in with a ``[parallel-shards]`` line in its docstring.  The
+launcher then starts N copies of it, each with the *full* path list and
+``--shard K/N``.  Every copy expands and sorts the paths and picks its output
+location exactly as a single run would, and only then keeps its own share of
+the files (``select_shard``), so sharding never changes where the results go.
+
+脚本在文档字符串中加入 ``[parallel-shards]`` 一行即可启用。启动器随后启动
+该脚本的 N 个副本，每个副本都收到 *完整* 的路径列表及 ``--shard K/N``。各副本
+与单次运行完全一样地展开、排序路径并确定输出位置，之后才只保留属于自己的
+文件（``select_shard``），因此分片不会改变结果的保存位置。
+"""
+
+from __future__ import annotations
+
+import argparse
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+def add_shard_argument(parser: argparse.ArgumentParser) -> None:
+    """Add the hidden ``--shard K/N`` option / 添加隐藏的 ``--shard K/N`` 选项"""
+    parser.add_argument("--shard", type=parse_shard, default=None, help=argparse.SUPPRESS)
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """``"K/N"`` → ``(K, N)`` with ``1 <= K <= N`` / 将 ``"K/N"`` 解析为 ``(K, N)``"""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected K/N, got {value!r}") from None
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard {index} out of 1..{count}")
+    return index, count
+
+
+def select_shard(items: list[T], shard: tuple[int, int] | None) -> list[T]:
+    """The items of shard *K* of *N*, round-robin; all items when *shard* is None.
+
+    Round-robin keeps neighbouring (often similarly sized) files apart, and
+    the shard keeps their relative order.
+
+    按轮询方式取出第 *K*/*N* 个分片的条目；*shard* 为 None 时返回全部条目。
+    轮询可将相邻（通常大小相近）的文件分散开，分片内保持原有相对顺序。
+    """
+    if shard is None:
+        return items
+    index, count = shard
+    return items[index - 1::count]
@@ -0,0 +1,399 @@
+"""
+Whisper models loaded once per run and, optionally, kept warm between runs.
+每次运行只加载一次、并可在多次运行之间常驻的 Whisper 模型。
+
+Loading ``large-v3`` reads gigabytes of weights, which dominates batches of
+short clips.  This module offers two levels of reuse:
+
+* ``load_whisper_model`` – a per-process cache, so every file of a run
+  shares one ``WhisperModel``;
+* a *warm-model daemon* – a background process that holds one model and
+  serves ``transcribe`` requests over a local socket, so later toolkit runs
+  skip loading entirely.  ``connect_whisper_daemon`` starts it on first use;
+  it exits by itself after an idle period.
+
+The daemon listens on ``127.0.0.1`` only and requires the random key written,
+readable by the current user only, to its state file in the user cache
+directory.  Every connection is served on its own thread, so concurrent runs
+(parallel jobs or shards) are answered at once; their transcriptions share
+the one model, which runs them in turn.  ``RemoteWhisperModel.transcribe`` mirrors
+``WhisperModel.transcribe``: it returns a lazy segment generator and the
+transcription info, so callers cannot tell the two apart.  Audio is passed
+as an absolute path (the daemon runs on the same machine) or as an array.
+
+Command line::
+
+    python -m _shared.whisper_models serve large-v3 [--device cpu]
+           [--compute-type int8] [--idle-minutes 30]
+    python -m _shared.whisper_models stop large-v3
+
+加载 ``large-v3`` 需要读取数 GB 的权重，处理大量短音频时这会成为主要耗时。
+本模块提供两级复用：``load_whisper_model`` 在进程内缓存模型，一次运行中的
+所有文件共用一个 ``WhisperModel``；*常驻模型进程* 则在后台持有一个模型，通过
+本地套接字响应转写请求，之后的运行完全无需加载模型。
+``connect_whisper_daemon`` 会在首次使用时启动它，空闲一段时间后它会自动退出。
+常驻进程只监听 ``127.0.0.1``，并要求客户端提供随机密钥；密钥写在用户缓存目录
+下仅当前用户可读的状态文件中。每个连接由独立线程处理，因此并发的多次运行
+（并行任务或分片）都能立即得到响应，它们的转写共用同一个模型并依次执行。``RemoteWhisperModel.transcribe`` 与
+``WhisperModel.transcribe`` 的接口一致（返回惰性片段生成器和转写信息），调用方
+无需区分二者。音频以绝对路径（常驻进程位于同一台机器）或数组形式传递。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from typing import Any
+
+from _shared.page_cache import default_cache_dir
+
+DEFAULT_DEVICE = "cpu"
+DEFAULT_COMPUTE_TYPE = "int8"
+# Minutes without requests after which the daemon exits / 无请求多少分钟后常驻进程退出
+DEFAULT_IDLE_MINUTES = 30
+
+# Loading a large model for the first time includes downloading it.
+# 首次加载大模型时还包括下载时间。
+_START_TIMEOUT = 1800
+_POLL_INTERVAL = 0.5
+# Seconds a ping waits for the answer before the daemon counts as unreachable.
+# ping 等待应答的秒数，超时即视为常驻进程不可用。
+_PING_TIMEOUT = 5
+_WATCHDOG_INTERVAL = 15
+
+_models: dict[tuple[str, str, str, int, int], Any] = {}
+_models_lock = threading.Lock()
+
+
+def load_whisper_model(
+    name: str,
+    device: str = DEFAULT_DEVICE,
+    compute_type: str = DEFAULT_COMPUTE_TYPE,
+    num_workers: int = 1,
+    cpu_threads: int = 0,
+):
+    """The process-wide ``WhisperModel`` for this configuration, loaded on first use.
+
+    *num_workers* is the number of ``transcribe`` calls that can run in
+    parallel from different threads; the replicas share one copy of the
+    weights.  *cpu_threads* is the threads per call on CPU (0: library
+    default).
+
+    返回该配置在本进程内共用的 ``WhisperModel``，首次调用时加载。*num_workers*
+    为可在不同线程中并行执行的 ``transcribe`` 调用数，各副本共用同一份权重；
+    *cpu_threads* 为 CPU 上每次调用使用的线程数（0 表示库默认值）。
+    """
+    key = (name, device, compute_type, num_workers, cpu_threads)
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            from faster_whisper import WhisperModel
+
+            model = _models[key] = WhisperModel(
+                name,
+                device=device,
+                compute_type=compute_type,
+                num_workers=num_workers,
+                cpu_threads=cpu_threads,
+            )
+        return model
+
+
+# ---------------------------------------------------------------------------
+# Client side
+# ---------------------------------------------------------------------------
+
+class RemoteWhisperModel:
+    """Stand-in for ``WhisperModel`` whose transcriptions run in the daemon.
+
+    由常驻进程执行转写的 ``WhisperModel`` 替身。
+    """
+
+    def __init__(self, state: dict[str, Any]) -> None:
+        self.model_key = tuple(state["model"])
+        self.idle_minutes = state.get("idle_minutes", DEFAULT_IDLE_MINUTES)
+        self._address = tuple(state["address"])
+        self._authkey = bytes.fromhex(state["authkey"])
+
+    def transcribe(self, audio, **options) -> tuple[Iterator[Any], Any]:
+        """Same contract as ``WhisperModel.transcribe``.
+
+        Requests running at the same time share the daemon's model, which
+        transcribes them one after another.
+        """
+        if isinstance(audio, (str, os.PathLike)):
+            audio = os.path.abspath(audio)
+        conn = self._request({"op": "transcribe", "audio": audio, "options": options})
+        kind, payload = conn.recv()
+        if kind != "info":
+            conn.close()
+            raise RuntimeError(f"Whisper daemon error: {payload}")
+        return self._segments(conn), payload
+
+    def ping(self) -> bool:
+        try:
+            conn = self._request({"op": "ping"})
+            with conn:
+                if not conn.poll(_PING_TIMEOUT):
+                    return False
+                kind, payload = conn.recv()
+        except (OSError, EOFError, AuthenticationError):
+            return False
+        return kind == "pong" and tuple(payload) == self.model_key
+
+    def stop(self) -> None:
+        try:
+            with self._request({"op": "stop"}) as conn:
+                conn.recv()
+        except (OSError, EOFError):
+            pass
+
+    def _request(self, message: dict[str, Any]):
+        conn = Client(self._address, authkey=self._authkey)
+        try:
+            conn.send(message)
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    @staticmethod
+    def _segments(conn) -> Iterator[Any]:
+        with conn:
+            while True:
+                kind, payload = conn.recv()
+                if kind == "segment":
+                    yield payload
+                elif kind == "end":
+                    return
+                else:
+                    raise RuntimeError(f"Whisper daemon error: {payload}")
+
+
+def connect_whisper_daemon(
+    name: str,
+    device: str = DEFAULT_DEVICE,
+    compute_type: str = DEFAULT_COMPUTE_TYPE,
+    start: bool = True,
+    idle_minutes: float = DEFAULT_IDLE_MINUTES,
+) -> RemoteWhisperModel | None:
+    """The running daemon for this model, started first if *start* is set.
+
+    Returns None when no daemon could be reached, so callers can load the
+    model in-process instead.
+
+    返回该模型的常驻进程客户端；若设置了 *start*，在其未运行时先启动它。
+    无法连接时返回 None，调用方可改为在本进程加载模型。
+    """
+    state_path = _state_path(name, device, compute_type)
+    remote = _connect(state_path)
+    if remote is not None or not start:
+        return remote
+
+    process = _spawn_daemon(name, device, compute_type, idle_minutes)
+    deadline = time.monotonic() + _START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            # Lost a start-up race to another run, or failed to load the model.
+            # 与另一次运行同时启动而落败，或模型加载失败。
+            return _connect(state_path)
+        remote = _connect(state_path)
+        if remote is not None:
+            return remote
+        time.sleep(_POLL_INTERVAL)
+    return None
+
+
+def _connect(state_path: str) -> RemoteWhisperModel | None:
+    try:
+        with open(state_path, encoding="utf-8") as fh:
+            remote = RemoteWhisperModel(json.load(fh))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return remote if remote.ping() else None
+
+
+def _spawn_daemon(name: str, device: str, compute_type: str, idle_minutes: float):
+    command = [
+        sys.executable, "-m", "_shared.whisper_models", "serve", name,
+        "--device", device,
+        "--compute-type", compute_type,
+        "--idle-minutes", str(idle_minutes),
+    ]
+    options: dict[str, Any] = {}
+    if sys.platform == "win32":
+        options["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        options["start_new_session"] = True
+    os.makedirs(default_cache_dir(), exist_ok=True)
+    log_path = _state_path(name, device, compute_type, ".log")
+    with open(log_path, "ab") as log:
+        return subprocess.Popen(
+            command,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            **options,
+        )
+
+
+# ---------------------------------------------------------------------------
+# Daemon side
+# ---------------------------------------------------------------------------
+
+def serve(
+    name: str,
+    device: str = DEFAULT_DEVICE,
+    compute_type: str = DEFAULT_COMPUTE_TYPE,
+    idle_minutes: float = DEFAULT_IDLE_MINUTES,
+) -> None:
+    """Load the model and answer requests until idle for *idle_minutes*.
+
+    加载模型并响应请求，空闲 *idle_minutes* 分钟后退出。
+    """
+    state_path = _state_path(name, device, compute_type)
+    if _connect(state_path) is not None:
+        return
+    model = load_whisper_model(name, device, compute_type)
+    model_key = [name, device, compute_type]
+    authkey = secrets.token_bytes(32)
+    # Open connections and the time the last one ended / 打开的连接数与最近一个连接结束的时间
+    activity = {"busy": 0, "last": time.monotonic(), "lock": threading.Lock()}
+
+    with Listener(("127.0.0.1", 0), authkey=authkey) as listener:
+        _write_state(state_path, {
+            "model": model_key,
+            "address": list(listener.address),
+            "authkey": authkey.hex(),
+            "pid": os.getpid(),
+            "idle_minutes": idle_minutes,
+        })
+        threading.Thread(
+            target=_watchdog, args=(state_path, activity, idle_minutes * 60), daemon=True
+        ).start()
+        while True:
+            try:
+                conn = listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                # A client without the key, or one that hung up / 密钥错误或已断开的客户端
+                continue
+            with activity["lock"]:
+                activity["busy"] += 1
+            threading.Thread(
+                target=_serve_connection,
+                args=(conn, model, model_key, state_path, activity),
+                daemon=True,
+            ).start()
+
+
+def _serve_connection(conn, model, model_key: list[str], state_path: str, activity: dict[str, Any]) -> None:
+    try:
+        with conn:
+            if not _handle(conn, model, model_key):
+                _remove_state(state_path)
+                # The main thread is blocked in accept(); end the process outright.
+                # 主线程阻塞在 accept() 中，直接结束进程。
+                os._exit(0)
+    except (OSError, EOFError):
+        pass
+    finally:
+        with activity["lock"]:
+            activity["busy"] -= 1
+            activity["last"] = time.monotonic()
+
+
+def _handle(conn, model, model_key: list[str]) -> bool:
+    """Answer one request; False means the daemon should stop."""
+    request = conn.recv()
+    op = request.get("op")
+    if op == "ping":
+        conn.send(("pong", model_key))
+    elif op == "stop":
+        conn.send(("stopping", None))
+        return False
+    elif op == "transcribe":
+        try:
+            segments, info = model.transcribe(request["audio"], **request["options"])
+            conn.send(("info", info))
+            for segment in segments:
+                conn.send(("segment", segment))
+            conn.send(("end", None))
+        except (OSError, EOFError):
+            raise
+        except Exception as exc:
+            conn.send(("error", f"{type(exc).__name__}: {exc}"))
+    else:
+        conn.send(("error", f"unknown request {op!r}"))
+    return True
+
+
+def _watchdog(state_path: str, activity: dict[str, Any], idle_seconds: float) -> None:
+    while True:
+        time.sleep(_WATCHDOG_INTERVAL)
+        with activity["lock"]:
+            idle = not activity["busy"] and time.monotonic() - activity["last"] > idle_seconds
+        if idle:
+            _remove_state(state_path)
+            # The main thread is blocked in accept(); end the process outright.
+            # 主线程阻塞在 accept() 中，直接结束进程。
+            os._exit(0)
+
+
+# ---------------------------------------------------------------------------
+# State file
+# ---------------------------------------------------------------------------
+
+def _state_path(name: str, device: str, compute_type: str, suffix: str = ".json") -> str:
+    slug = re.sub(r"[^A-Za-z0-9.-]+", "_", f"{name}-{device}-{compute_type}")
+    return os.path.join(default_cache_dir(), f"whisper_daemon-{slug}{suffix}")
+
+
+def _write_state(state_path: str, state: dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    temp_path = f"{state_path}.{os.getpid()}.tmp"
+    # Only the current user may read the key / 仅当前用户可读取密钥
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        json.dump(state, fh)
+    os.replace(temp_path, state_path)
+
+
+def _remove_state(state_path: str) -> None:
+    try:
+        with open(state_path, encoding="utf-8") as fh:
+            if json.load(fh).get("pid") != os.getpid():
+                return
+        os.remove(state_path)
+    except (OSError, ValueError, AttributeError):
+        pass
+
+
+def _main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Warm Whisper model daemon / Whisper 模型常驻进程")
+    parser.add_argument("command", choices=["serve", "stop"])
+    parser.add_argument("model")
+    parser.add_argument("--device", default=DEFAULT_DEVICE)
+    parser.add_argument("--compute-type", default=DEFAULT_COMPUTE_TYPE)
+    parser.add_argument("--idle-minutes", type=float, default=DEFAULT_IDLE_MINUTES)
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        serve(args.model, args.device, args.compute_type, args.idle_minutes)
+    else:
+        remote = connect_whisper_daemon(args.model, args.device, args.compute_type, start=False)
+        if remote is not None:
+            remote.stop()
+
+
+if __name__ == "__main__":
+    _main()
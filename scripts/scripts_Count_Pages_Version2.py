@@ -22,7 +22,7 @@
   4. 在终端查看每个文件的页数和最终的总页数统计。
 ---
 可选参数:
-本脚本暂无任何可视化或手动可选参数。
+  --workers N: 同时统计的文件数 (默认 4；1 = 逐个统计，0 = CPU核心数)，其中最多 2 个线程启动 Word (COM)。结果按完成顺序输出，并显示累计页数和各类型小计。
 ---
 更新日志:
   - v0.1 (2025-08-05): Alpha版本。修复了在Windows环境下因打印特殊字符导致的UnicodeEncodeError。
@@ -44,7 +44,7 @@ Usage:
   4. Check the terminal for the page count of each file and the final total.
 ---
 Optional Parameters:
-This script currently has no visual or manual optional parameters.
+  --workers N: Files counted in parallel (default 4; 1 = one at a time, 0 = number of CPU cores); at most 2 of them start Word (COM). Results are printed as they finish, with a running total and per-type subtotals.
 ---
 Changelog:
   - v0.1 (2025-08-05): Alpha release. Fixed an encoding error on Windows environment.
@@ -54,6 +54,17 @@ import sys
 import os
 import subprocess
 import platform
+import queue
+import threading
+
+from _shared.page_cache import PAGE_COUNT_NAMESPACE, open_page_cache
+from _shared.office_pages import (
+    docx_saved_page_count,
+    docx_word_count,
+    estimate_pages,
+    pptx_slide_count,
+)
+from _shared.pdf_objects import count_pages
 
 # --- Dependency Management / 依赖管理 ---
 def install_and_import(package_name, import_name=None):
@@ -83,60 +94,6 @@ def install_and_import(package_name, import_name=None):
             return None
     return __import__(import_name)
 
-# --- Page Counting Functions / 页数计算函数 ---
-
-def get_pdf_page_count(file_path, pypdf):
-    """使用pypdf库获取PDF文件的页数。"""
-    try:
-        with open(file_path, 'rb') as f:
-            reader = pypdf.PdfReader(f)
-            return len(reader.pages)
-    except Exception as e:
-        print(f"    - Error reading PDF file: {e}")
-        return 0
-
-def get_pptx_page_count(file_path, pptx):
-    """使用python-pptx库获取PPTX文件的幻灯片数量。"""
-    try:
-        presentation = pptx.Presentation(file_path)
-        return len(presentation.slides)
-    except Exception as e:
-        print(f"    - Error reading PPTX file: {e}")
-        return 0
-
-def get_docx_page_count_windows(file_path, win32com_client):
-    """[仅Windows] 使用COM接口获取DOC/DOCX的精确页数。"""
-    try:
-        word = win32com_client.Dispatch("Word.Application")
-        word.Visible = False
-        doc = word.Documents.Open(os.path.abspath(file_path), ReadOnly=True)
-        page_count = doc.ComputeStatistics(2) # 2 corresponds to wdStatisticPages
-        doc.Close(False)
-        word.Quit()
-        return page_count
-    except Exception as e:
-        print(f"    - COM Error (is MS Word installed?): {e}")
-        return get_docx_page_count_approx(file_path)
-
-def get_docx_page_count_approx(file_path, python_docx=None):
-    """[跨平台] 通过估算字数获取DOCX的近似页数。"""
-    if python_docx is None: return 0
-    try:
-        doc = python_docx.Document(file_path)
-        word_count = sum(len(p.text.split()) for p in doc.paragraphs)
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    word_count += len(cell.text.split())
-        WORDS_PER_PAGE = 500
-        page_count = (word_count + WORDS_PER_PAGE - 1) // WORDS_PER_PAGE
-        print(f"    - (Approximation based on {word_count} words)")
-        return max(1, page_count)
-    except Exception as e:
-        print(f"    - Error reading DOCX for approximation: {e}")
-        return 0
-
-# --- Main Logic / 主逻辑 ---
 # --- Main Logic / 主逻辑 ---
 def main():
     """
@@ -167,9 +124,14 @@ def main():
             'approx_method': "    - (使用字数估算方法)",
             'approx_error': "    - 估算DOCX时出错: {e}",
             'approx_details': "    - (基于 {word_count} 字的估算)",
+            'docprops_pages': "    - (读取自文档属性中保存的页数)",
             'skip_ext': "    - 跳过 '{ext}' 文件：精确统计需要Windows环境下的MS Office。",
             'unsupported_type': "    - 不支持的文件类型。",
             'pages_found': "   => 找到的页数/幻灯片数: {pages}",
+            'count_error': "    - 统计时出错: {e}",
+            'workers': "并行统计线程数: {workers}",
+            'running_total': "   [{done}/{total}] 累计页数: {total_pages}",
+            'subtotal': "[小计] {ext}: {pages}",
             'all_done': "\n--- 所有任务已完成。 ---",
             'total_pages': "\n[总计] 估算的总页数: {total_pages}"
         },
@@ -194,9 +156,14 @@ def main():
             'approx_method': "    - (Using word count approximation method)",
             'approx_error': "    - Error reading DOCX for approximation: {e}",
             'approx_details': "    - (Approximation based on {word_count} words)",
+            'docprops_pages': "    - (Page count saved in the document properties)",
             'skip_ext': f"    - Skipping '{{ext}}' file: Precise counting requires MS Office on Windows.",
             'unsupported_type': "    - Unsupported file type.",
             'pages_found': "   => Pages/Slides found: {pages}",
+            'count_error': "    - Error while counting: {e}",
+            'workers': "Counting threads: {workers}",
+            'running_total': "   [{done}/{total}] Running total: {total_pages}",
+            'subtotal': "[SUBTOTAL] {ext}: {pages}",
             'all_done': "\n--- All tasks completed. ---",
             'total_pages': "\n[TOTAL] Total Estimated Page Count: {total_pages}"
         }
@@ -210,6 +177,13 @@ def main():
     parser.add_argument('--lang', type=str, default='en', choices=['zh', 'en'], help=argparse.SUPPRESS)
     parser.add_argument('--gui-mode', action='store_true', help=argparse.SUPPRESS)
     parser.add_argument('-r', '--recursive', action='store_true', help=argparse.SUPPRESS) # Keep for potential future use / 保留以备将来使用
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        metavar='N',
+        help="同时统计的文件数 (1 = 逐个统计, 0 = CPU核心数)。\nFiles counted in parallel (1 = one at a time, 0 = number of CPU cores)."
+    )
     args = parser.parse_args()
 
     # Select the language dictionary based on the --lang argument
@@ -245,33 +219,92 @@ def main():
                 return None
         return __import__(import_name)
 
-    # Redefine page counting functions to accept the text dictionary for printing errors
-    # 重新定义页数计算函数以接受文本字典来打印错误
-    def get_pdf_page_count(file_path, pypdf):
+    # Redefine page counting functions to accept the text dictionary for their messages.
+    # They run on worker threads, so messages are collected in *notes* and printed by the
+    # main thread together with the file's result.
+    # 重新定义页数计算函数以接受文本字典。它们在工作线程中运行，因此提示信息先收集到
+    # *notes* 中，再由主线程与该文件的结果一起输出。
+
+    # pypdf, python-pptx and python-docx are only needed for files the fast paths cannot
+    # read, so they are imported on first use (once, even with several workers).
+    # 仅当快速路径无法读取文件时才需要 pypdf、python-pptx 和 python-docx，因此在首次
+    # 使用时才导入（多个工作线程也只导入一次）。
+    import_lock = threading.Lock()
+    lazy_modules = {}
+
+    def load_module(package_name, import_name):
+        with import_lock:
+            if import_name not in lazy_modules:
+                lazy_modules[import_name] = install_and_import(package_name, import_name)
+            return lazy_modules[import_name]
+
+    def get_pdf_page_count(file_path, worker, notes):
+        # Fast path: trailer -> /Root -> /Pages -> /Count, without parsing the pages.
+        # 快速路径: trailer -> /Root -> /Pages -> /Count，无需解析各页面。
+        try:
+            return count_pages(file_path)
+        except (OSError, ValueError):
+            pass
+        # Shared page-text cache: any PDF tool that already parsed a file knows its page
+        # count.  It is only consulted here, since hashing a large file costs more than
+        # the fast path.
+        # 共享页面文本缓存：任何已解析过该文件的 PDF 工具都记录了其页数。仅在此处查询，
+        # 因为对大文件计算哈希比快速路径更耗时。
+        page_cache = worker.page_cache()
+        cached_pages = page_cache.page_count(file_path) if page_cache else None
+        if cached_pages is not None:
+            return cached_pages
+        pypdf = load_module('pypdf', 'pypdf')
+        if pypdf is None: return 0
         try:
-            with open(file_path, 'rb') as f: return len(pypdf.PdfReader(f).pages)
+            with open(file_path, 'rb') as f: pages = len(pypdf.PdfReader(f).pages)
         except Exception as e:
-            print(lang_texts['pdf_error'].format(e=e)); return 0
+            notes.append(lang_texts['pdf_error'].format(e=e)); return 0
+        if page_cache and pages > 0:
+            page_cache.put(file_path, PAGE_COUNT_NAMESPACE, pages)
+        return pages
 
-    def get_pptx_page_count(file_path, pptx):
+    def get_pptx_page_count(file_path, notes):
+        try:
+            return pptx_slide_count(file_path)
+        except (OSError, ValueError):
+            pass
+        pptx = load_module('python-pptx', 'pptx')
+        if pptx is None: return 0
         try:
             return len(pptx.Presentation(file_path).slides)
         except Exception as e:
-            print(lang_texts['pptx_error'].format(e=e)); return 0
+            notes.append(lang_texts['pptx_error'].format(e=e)); return 0
 
-    def get_docx_page_count_windows(file_path, win32com_client):
+    def get_docx_page_count_windows(file_path, worker, notes):
         try:
-            word = win32com_client.Dispatch("Word.Application")
-            word.Visible = False
-            doc = word.Documents.Open(os.path.abspath(file_path), ReadOnly=True)
-            page_count = doc.ComputeStatistics(2)
-            doc.Close(False); word.Quit()
-            return page_count
+            doc = worker.word().Documents.Open(os.path.abspath(file_path), ReadOnly=True)
+            try:
+                return doc.ComputeStatistics(2) # 2 corresponds to wdStatisticPages
+            finally:
+                doc.Close(False)
         except Exception as e:
-            print(lang_texts['com_error'].format(e=e))
-            return get_docx_page_count_approx(file_path, install_and_import('python-docx', 'docx'))
+            notes.append(lang_texts['com_error'].format(e=e))
+            return get_docx_page_count_approx(file_path, notes)
 
-    def get_docx_page_count_approx(file_path, python_docx):
+    def get_docx_page_count_approx(file_path, notes):
+        try:
+            # docProps/app.xml first; the document part is streamed only when
+            # its <Pages> cannot be confirmed from <Words> alone.
+            # 先读 docProps/app.xml；仅当无法凭 <Words> 确认 <Pages> 时才流式解析文档部件。
+            saved_pages = docx_saved_page_count(file_path)
+            if not saved_pages:
+                word_count = docx_word_count(file_path)
+                saved_pages = docx_saved_page_count(file_path, word_count)
+            if saved_pages:
+                notes.append(lang_texts['docprops_pages'])
+                return saved_pages
+            notes.append(lang_texts['approx_method'])
+            notes.append(lang_texts['approx_details'].format(word_count=word_count))
+            return estimate_pages(word_count)
+        except (OSError, ValueError):
+            pass
+        python_docx = load_module('python-docx', 'docx')
         if python_docx is None: return 0
         try:
             doc = python_docx.Document(file_path)
@@ -281,16 +314,13 @@ def main():
                     for cell in row.cells: word_count += len(cell.text.split())
             WORDS_PER_PAGE = 500
             page_count = (word_count + WORDS_PER_PAGE - 1) // WORDS_PER_PAGE
-            print(lang_texts['approx_details'].format(word_count=word_count))
+            notes.append(lang_texts['approx_details'].format(word_count=word_count))
             return max(1, page_count)
         except Exception as e:
-            print(lang_texts['approx_error'].format(e=e)); return 0
+            notes.append(lang_texts['approx_error'].format(e=e)); return 0
 
     # Main logic with bilingual output
     # 使用双语输出的主逻辑
-    pypdf = install_and_import('pypdf')
-    pptx = install_and_import('python-pptx', 'pptx')
-    python_docx = install_and_import('python-docx', 'docx')
     
     is_windows_office_ready = False
     if platform.system() == "Windows":
@@ -304,44 +334,152 @@ def main():
                 print(lang_texts['office_client_fail'])
         else:
             print(lang_texts['office_not_avail'])
-            
-    total_pages = 0
-    print(lang_texts['start_count'])
 
+    # Extensions counted through Word on Windows / Windows 上经由Word统计的扩展名
+    COM_EXTENSIONS = ('.docx', '.doc', '.ppt')
+    # Word instances started at most, whatever --workers is / 无论 --workers 为何值，最多启动的Word实例数
+    MAX_WORD_INSTANCES = 2
+
+    class CountWorker:
+        """
+        Per-thread resources, created on first use and released when the thread ends:
+        one Word instance (instead of one per file) and one page-cache connection.
+        每个线程的资源，首次使用时创建，线程结束时释放: 一个Word实例 (而非每个文件一个) 和一个页面缓存连接。
+        """
+        def __init__(self):
+            self._word = None
+            self._page_cache = None
+            self._cache_opened = False
+
+        def word(self):
+            if self._word is None:
+                # DispatchEx starts a private instance; Dispatch would share one across threads.
+                # DispatchEx 启动独立实例；Dispatch 会让各线程共用同一个实例。
+                self._word = __import__('win32com.client').client.DispatchEx("Word.Application")
+                self._word.Visible = False
+            return self._word
+
+        def page_cache(self):
+            if not self._cache_opened:
+                self._page_cache = open_page_cache()
+                self._cache_opened = True
+            return self._page_cache
+
+        def close_word(self):
+            if self._word is not None:
+                try: self._word.Quit()
+                except Exception: pass
+                self._word = None
+
+        def close(self):
+            self.close_word()
+            if self._page_cache is not None:
+                self._page_cache.close()
+
+        def count(self, file_path, ext, notes):
+            if ext == '.pdf':
+                return get_pdf_page_count(file_path, self, notes)
+            if ext == '.pptx':
+                return get_pptx_page_count(file_path, notes)
+            if ext in COM_EXTENSIONS:
+                if is_windows_office_ready:
+                    return get_docx_page_count_windows(file_path, self, notes)
+                if ext == '.docx':
+                    return get_docx_page_count_approx(file_path, notes)
+                notes.append(lang_texts['skip_ext'].format(ext=ext))
+                return 0
+            notes.append(lang_texts['unsupported_type'])
+            return 0
+
+    def count_worker(task_queues, results, use_com):
+        """
+        Thread body: drain each queue in turn. Only *use_com* threads take Word files; once
+        those are done their Word instance is closed and they help with the other files.
+        线程主体: 依次清空各队列。只有 *use_com* 线程处理 Word 文件；处理完后关闭其 Word 实例，
+        再协助统计其他文件。
+        """
+        if use_com:
+            __import__('pythoncom').CoInitialize()
+        worker = CountWorker()
+        try:
+            for tasks in task_queues:
+                while True:
+                    try:
+                        file_path = tasks.get_nowait()
+                    except queue.Empty:
+                        break
+                    ext = os.path.splitext(file_path)[1].lower()
+                    notes = []
+                    try:
+                        pages = worker.count(file_path, ext, notes)
+                    except Exception as e:
+                        notes.append(lang_texts['count_error'].format(e=e)); pages = 0
+                    results.put((file_path, ext, pages, notes))
+                worker.close_word()
+        finally:
+            worker.close()
+            if use_com:
+                __import__('pythoncom').CoUninitialize()
+
+    files_to_count = []
     for file_path in args.files:
-        if not os.path.exists(file_path):
-            print(lang_texts['skip_nonexistent'].format(file_path=file_path))
-            continue
-
-        print(lang_texts['processing'].format(filename=os.path.basename(file_path)))
-        ext = os.path.splitext(file_path)[1].lower()
-        pages = 0
-
-        if ext == '.pdf':
-            if pypdf: pages = get_pdf_page_count(file_path, pypdf)
-        elif ext == '.pptx':
-            if pptx: pages = get_pptx_page_count(file_path, pptx)
-        elif ext in ['.docx', '.doc', '.ppt']:
-            if is_windows_office_ready:
-                # Must re-import client here as it's scoped within the conditional import
-                # 必须在此处重新导入client，因为它作用域在条件导入内
-                win32_client = __import__('win32com.client').client
-                pages = get_docx_page_count_windows(file_path, win32_client)
-            elif ext == '.docx':
-                print(lang_texts['approx_method'])
-                pages = get_docx_page_count_approx(file_path, python_docx)
-            else:
-                print(lang_texts['skip_ext'].format(ext=ext))
+        if os.path.exists(file_path):
+            files_to_count.append(file_path)
         else:
-            print(lang_texts['unsupported_type'])
+            print(lang_texts['skip_nonexistent'].format(file_path=file_path))
+
+    total_files = len(files_to_count)
+    workers = max(1, min(args.workers if args.workers > 0 else (os.cpu_count() or 1), total_files))
+    print(lang_texts['start_count'])
+    print(lang_texts['workers'].format(workers=workers))
+
+    # Every Word instance costs a process and hundreds of MB, so files that go through COM
+    # get their own queue, served by at most MAX_WORD_INSTANCES of the threads.
+    # 每个Word实例都是一个占用数百MB内存的进程，因此经由COM统计的文件单独排队，最多由
+    # MAX_WORD_INSTANCES 个线程处理。
+    com_tasks = queue.Queue()
+    tasks = queue.Queue()
+    for file_path in files_to_count:
+        uses_com = is_windows_office_ready and os.path.splitext(file_path)[1].lower() in COM_EXTENSIONS
+        (com_tasks if uses_com else tasks).put(file_path)
+    com_workers = min(MAX_WORD_INSTANCES, workers, com_tasks.qsize())
+    results = queue.Queue()
+    threads = [
+        threading.Thread(target=count_worker, args=((com_tasks, tasks), results, True), daemon=True)
+        for _ in range(com_workers)
+    ] + [
+        threading.Thread(target=count_worker, args=((tasks,), results, False), daemon=True)
+        for _ in range(workers - com_workers)
+    ]
+    for thread in threads:
+        thread.start()
 
+    # Results are printed as they arrive, with a running total.
+    # 结果到达即输出，并附带累计总数。
+    total_pages = 0
+    subtotals = {}
+    for done in range(1, total_files + 1):
+        file_path, ext, pages, notes = results.get()
+        filename = os.path.basename(file_path)
+        print(lang_texts['processing'].format(filename=filename))
+        for note in notes:
+            print(note)
         if pages > 0:
-            print(lang_texts['pages_found'].format(pages=pages))
             total_pages += pages
+            subtotals[ext] = subtotals.get(ext, 0) + pages
+            print(lang_texts['pages_found'].format(pages=pages))
+        print(lang_texts['running_total'].format(done=done, total=total_files, total_pages=total_pages))
+        if args.gui_mode:
+            print(f"[PROGRESS] {done} / {total_files} | {filename}", flush=True)
+
+    for thread in threads:
+        thread.join()
 
     print(lang_texts['all_done'])
+    for ext in sorted(subtotals):
+        print(lang_texts['subtotal'].format(ext=ext, pages=subtotals[ext]))
     print(lang_texts['total_pages'].format(total_pages=total_pages))
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
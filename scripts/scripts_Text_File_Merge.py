@@ -16,6 +16,7 @@
   5. 上下文感知输出: 在源目录或工具箱目录旁创建“合并的文本_Merged_Text”文件夹存放结果。
   6. 可控的命名: 用户可以指定输出文件的前缀，脚本会自动附加批次编号。
   7. GUI深度集成: 专为“奥创王牌工具箱”设计，提供清晰的双语进度反馈和可视化参数。
+  8. 增量模式: 可勾选跳过输入文件与参数均未变化的分组 (记录在输出目录的 .toolkit_manifest.json 中)。
 ~~~
 Function:
   This script sorts and groups a large number of .txt files, then merges the content of each group into a new .txt file.
@@ -28,6 +29,7 @@ Core Features:
   5. Context-Aware Output: Creates a "合并的文本_Merged_Text" folder next to the source or toolkit to store results.
   6. Controllable Naming: The user can specify a prefix for the output files, and the script will automatically append a batch number.
   7. Deep GUI Integration: Designed for the "UltraAce Toolkit" with clear bilingual progress feedback and visual parameters.
+  8. Incremental Mode: A checkbox to skip groups whose input files and parameters are unchanged (recorded in .toolkit_manifest.json in the output folder).
 """
 
 import os
@@ -37,6 +39,8 @@ import subprocess
 import importlib.util
 from pathlib import Path
 
+from _shared.manifest import OutputManifest
+
 # --- Internationalization (i18n) Setup ---
 MESSAGES = {
     'zh': {
@@ -52,6 +56,8 @@ MESSAGES = {
         "processing": "\n[处理中] -> 正在合并第 {i}/{total} 组...",
         "success_save": "  [成功] -> 已合并 {num_files} 个文件到: {path}",
         "failure_merge": "  [失败] -> 合并第 {i} 组时出错: {e}",
+        "skip_unchanged": "  [跳过] -> 输入与参数未变化: {path}",
+        "incremental_summary": "\n增量模式: 跳过了 {skipped}/{total} 个未变化的分组。",
         "output_dir_creating": "创建输出目录: {path}",
         "output_dir_fail": "错误: 创建输出目录失败: {e}",
         "all_done": "\n--- 所有任务已完成 ---",
@@ -69,6 +75,8 @@ MESSAGES = {
         "processing": "\n[Processing] -> Merging group {i}/{total}...",
         "success_save": "  [SUCCESS] -> Merged {num_files} files to: {path}",
         "failure_merge": "  [FAILURE] -> Error merging group {i}: {e}",
+        "skip_unchanged": "  [SKIP] -> Inputs and parameters unchanged: {path}",
+        "incremental_summary": "\nIncremental: skipped {skipped} of {total} unchanged groups.",
         "output_dir_creating": "Creating output directory: {path}",
         "output_dir_fail": "Error: Failed to create output directory: {e}",
         "all_done": "\n--- All tasks completed ---",
@@ -119,6 +127,7 @@ def main():
     custom_args.add_argument('--sort-order', type=str, default="asc", choices=["asc", "desc"], help="排序顺序 [display: asc=升序,Ascending | desc=降序,Descending]")
     custom_args.add_argument('--group-size', type=int, default=3, help="每组包含的文件数量 (0 = 合并全部)\nNumber of files per group (0 = merge all).")
     custom_args.add_argument('--output-prefix', type=str, default="merged", help="输出文件的前缀名。\nPrefix for the output files.")
+    custom_args.add_argument('--incremental', action='store_true', help="跳过输入文件与参数均未变化的分组。\nSkip groups whose input files and parameters are unchanged.")
     
     gui_args = parser.add_argument_group('GUI Internal')
     gui_args.add_argument('files', nargs='*', help=argparse.SUPPRESS)
@@ -171,12 +180,20 @@ def main():
         except OSError as e:
             print(T("output_dir_fail", lang, e=e)); return
 
+    # Incremental mode: the sort settings and group size decide each group's
+    # members, so a group is skipped only if its ordered inputs are unchanged.
+    manifest = OutputManifest("text-file-merge", __file__) if args.incremental else None
+    params = {'sort_by': args.sort_by, 'sort_order': args.sort_order, 'group_size': group_size_arg}
+
     # Process each group
     for i, group in enumerate(file_groups):
         if not group: continue
         print(T("processing", lang, i=i+1, total=len(file_groups)))
         output_filename = f"{args.output_prefix}_{i+1}.txt"
         output_path = output_base_dir / output_filename
+        if manifest and manifest.is_up_to_date(output_path, group, params):
+            print(T("skip_unchanged", lang, path=output_path))
+            continue
         
         try:
             with open(output_path, 'w', encoding='utf-8') as outfile:
@@ -184,9 +201,13 @@ def main():
                     with open(file_path, 'r', encoding='utf-8', errors='ignore') as infile:
                         outfile.write(infile.read()); outfile.write('\n\n')
             print(T("success_save", lang, num_files=len(group), path=output_path))
+            if manifest: manifest.record(output_path, group, params)
         except Exception as e:
             print(T("failure_merge", lang, i=i+1, e=e))
 
+    if manifest:
+        manifest.save()
+        print(T("incremental_summary", lang, skipped=manifest.skipped, total=manifest.checked))
     print(T("all_done", lang))
 
 if __name__ == "__main__":
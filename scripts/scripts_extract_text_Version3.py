@@ -4,6 +4,7 @@
 """
 [display-name-zh] 通用文本提取器
 [display-name-en] Universal Text Extractor
+[parallel-shards]
 
 功能:
   批量提取文档、图片、音频和视频中的文本内容。音视频将通过 ffmpeg 转为音频后调用 Whisper 生成文本与字幕。
@@ -16,6 +17,12 @@
   - 音频/视频: .mp3, .wav, .m4a, .aac, .flac, .ogg, .mp4, .mkv, .mov, .avi, .webm
 - 平台: 跨平台（.doc 为 Windows 特性）
 ---
+可选参数:
+  --incremental: 跳过输入和参数自上次运行以来均未变化的文件（记录在输出目录的 .toolkit_manifest.json 中）。
+  --long-media: 长音视频在停顿处分块，由多个进程并行转写（仅 CPU；每个进程加载一份模型）。
+  --ocr-workers: CPU 上并行 OCR 的进程数（0 = 每 4 个核心一个）。图片会提前批量解码并识别，结束时报告每秒处理的图片数。
+  --doc-workers: 同时解析的文档数（默认 4；1 = 逐个解析，0 = CPU核心数）。文档、图片、音视频各有独立的处理队列并同时进行，由单独的写入线程按文件顺序保存结果。
+---
 更新日志:
   - v5.0 (2026-04-15): 修复 OCR CUDA 路径；集成音视频字幕提取（ffmpeg + faster-whisper）；重构提取分发逻辑。
 ~~~
@@ -30,6 +37,12 @@ Compatibility:
   - Audio/Video: .mp3, .wav, .m4a, .aac, .flac, .ogg, .mp4, .mkv, .mov, .avi, .webm
 - Platform: Cross-platform (.doc is Windows-only)
 ---
+Optional Parameters:
+  --incremental: Skip files whose input and parameters are unchanged since the last run (recorded in .toolkit_manifest.json in the output folder).
+  --long-media: Cut long audio/video into chunks at pauses and transcribe them in parallel processes (CPU only; each process loads its own model).
+  --ocr-workers: OCR processes on CPU (0 = one per 4 cores). Images are decoded and recognized ahead in batches; the throughput in images per second is reported at the end.
+  --doc-workers: Documents parsed in parallel (default 4; 1 = one at a time, 0 = number of CPU cores). Documents, images and audio/video each have their own queue and run at the same time; a separate writer thread saves the results in file order.
+---
 Changelog:
   - v5.0 (2026-04-15): Fixed OCR CUDA path; integrated media subtitle extraction (ffmpeg + faster-whisper); refactored extractor dispatch logic.
 """
@@ -40,10 +53,20 @@ import argparse
 import platform
 import subprocess
 import importlib.util
+import queue
 import shutil
 import tempfile
+import threading
+from concurrent.futures import Future
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from _shared.chunked_transcription import ChunkedTranscriber
+from _shared.manifest import MANIFEST_NAME, OutputManifest
+from _shared.ocr_pool import OcrPool
+from _shared.page_cache import open_page_cache, pymupdf_page_texts
+from _shared.shards import add_shard_argument, select_shard
+from _shared.subtitles import format_srt_time, merge_bilingual_segments
 
 # --- Internationalization (i18n) Setup ---
 MESSAGES = {
@@ -64,11 +87,16 @@ MESSAGES = {
         "ocr_init": "首次运行，正在初始化OCR引擎 (可能需要下载模型)...",
         "ocr_ready": "OCR引擎准备就绪。",
         "ocr_using": "OCR 当前运行设备: {device}",
+        "ocr_workers": "OCR 并行进程数: {workers}",
+        "doc_workers": "文档并行解析线程数: {workers}",
+        "ocr_throughput": "[OCR] 共识别 {count} 张图片，速度 {rate:.2f} 张/秒。",
         "ocr_cuda_unavailable": "检测到 CUDA 不可用，OCR 将自动回退 CPU。建议安装 GPU 版 PyTorch 并更新驱动。",
         "ffmpeg_missing": "错误: 未找到 ffmpeg。音视频字幕提取将被跳过。",
         "ffmpeg_guide": "安装建议: Windows(winget install ffmpeg) / macOS(brew install ffmpeg) / Ubuntu(sudo apt install ffmpeg)",
         "media_extracting": "  [媒体] 正在通过 ffmpeg 提取音频流...",
         "media_transcribing": "  [媒体] 正在调用 Whisper 转写...",
+        "media_long_mode": "  [媒体] 长音频模式: 在停顿处分块，由 {workers} 个进程并行转写。",
+        "media_long_gpu": "  [媒体] 长音频模式仅适用于 CPU，将在 GPU 上整段转写。",
         "media_srt_saved": "  [成功] -> 字幕已保存到: {path}",
         "media_fail": "  [失败] -> 音视频提取失败: {e}",
         "media_skip_no_engine": "  [跳过] -> 当前环境未就绪，无法处理音视频文件。",
@@ -81,6 +109,8 @@ MESSAGES = {
         "doc_only_windows": "错误: .doc文件仅在Windows系统且安装了Word后才能处理。",
         "output_dir_creating": "  创建输出目录: {path}",
         "output_dir_fail": "  错误: 创建输出目录失败: {e}",
+        "skip_unchanged": "[跳过] -> 输入与参数未变化: {filename}",
+        "incremental_summary": "\n增量模式: 跳过了 {skipped}/{total} 个未变化的文件。",
         "all_done": "\n--- 所有任务已完成 ---",
     },
     'en': {
@@ -100,11 +130,16 @@ MESSAGES = {
         "ocr_init": "First run, initializing OCR engine (may download models)...",
         "ocr_ready": "OCR engine is ready.",
         "ocr_using": "OCR runtime device: {device}",
+        "ocr_workers": "OCR processes: {workers}",
+        "doc_workers": "Document threads: {workers}",
+        "ocr_throughput": "[OCR] Recognized {count} images at {rate:.2f} images/s.",
         "ocr_cuda_unavailable": "CUDA is unavailable. OCR falls back to CPU. Recommendation: install a GPU-enabled PyTorch build and update your driver.",
         "ffmpeg_missing": "Error: ffmpeg not found. Audio/video subtitle extraction will be skipped.",
         "ffmpeg_guide": "Install guide: Windows(winget install ffmpeg) / macOS(brew install ffmpeg) / Ubuntu(sudo apt install ffmpeg)",
         "media_extracting": "  [MEDIA] Extracting audio stream via ffmpeg...",
         "media_transcribing": "  [MEDIA] Running Whisper transcription...",
+        "media_long_mode": "  [MEDIA] Long-media mode: chunks cut at pauses are transcribed by {workers} processes in parallel.",
+        "media_long_gpu": "  [MEDIA] Long-media mode is for CPU only; transcribing whole files on the GPU.",
         "media_srt_saved": "  [SUCCESS] -> Subtitle saved to: {path}",
         "media_fail": "  [FAILURE] -> Media extraction failed: {e}",
         "media_skip_no_engine": "  [SKIP] -> Runtime environment is not ready for media files.",
@@ -117,6 +152,8 @@ MESSAGES = {
         "doc_only_windows": "Error: .doc files can only be processed on Windows with MS Word installed.",
         "output_dir_creating": "  Creating output directory: {path}",
         "output_dir_fail": "  Error: Failed to create output directory: {e}",
+        "skip_unchanged": "[SKIP] -> Input and parameters unchanged: {filename}",
+        "incremental_summary": "\nIncremental: skipped {skipped} of {total} unchanged files.",
         "all_done": "\n--- All tasks completed ---",
     }
 }
@@ -176,17 +213,22 @@ def extract_text_from_pptx(file_path):
     prs = pptx.Presentation(file_path)
     return "\n".join([shape.text for slide in prs.slides for shape in slide.shapes if hasattr(shape, "text")])
 
-def extract_text_from_pdf(file_path):
+# PyMuPDF is not thread-safe, so document threads parse PDFs one at a time.
+# PyMuPDF 不是线程安全的，因此各文档线程逐个解析 PDF。
+_pymupdf_lock = threading.Lock()
+
+def extract_text_from_pdf(file_path, cache=None):
     import fitz
-    with fitz.open(file_path) as doc:
-        return "".join([page.get_text() for page in doc])
+    with _pymupdf_lock:
+        return "".join(pymupdf_page_texts(fitz, str(file_path), cache))
 
 def extract_text_from_doc(file_path, lang):
     if platform.system() != "Windows": return T("doc_only_windows", lang)
     try:
         import win32com.client, pythoncom
         pythoncom.CoInitialize()
-        word_app = win32com.client.Dispatch("Word.Application")
+        # DispatchEx starts a private instance; Dispatch would share one across threads.
+        word_app = win32com.client.DispatchEx("Word.Application")
         word_app.Visible = False
         doc = word_app.Documents.Open(os.path.abspath(file_path))
         text = doc.Content.Text
@@ -200,25 +242,6 @@ def extract_text_from_json(file_path):
     with open(file_path, 'r', encoding='utf-8') as f:
         return f.read()
 
-def extract_text_from_image(file_path, ocr_reader, lang):
-    import numpy as np
-    from PIL import Image
-    try:
-        ext = Path(file_path).suffix.lower()
-        if ext in ['.heic', '.heif']:
-            import pillow_heif
-            heif_file = pillow_heif.read_heif(file_path)
-            image = Image.frombytes(heif_file.mode, heif_file.size, heif_file.data, "raw")
-        elif ext in ['.raw', '.cr2', '.nef', '.arw', '.dng']:
-            import rawpy
-            with rawpy.imread(file_path) as raw: image = Image.fromarray(raw.postprocess())
-        else: image = Image.open(file_path)
-        image_np = np.array(image.convert('RGB'))
-        result = ocr_reader.readtext(image_np, detail=0, paragraph=True)
-        return "\n".join(result)
-    except Exception as e: raise IOError(T("failure_read_img", lang, e=e)) from e
-
-
 @dataclass
 class SegmentLite:
     start: float
@@ -247,15 +270,16 @@ def resolve_runtime_device(preferred, lang):
     return "cuda" if _torch_cuda_available() else "cpu"
 
 
-def get_ocr_reader(ui_lang, ocr_device):
+def open_ocr_pool(ui_lang, ocr_device, ocr_workers):
     try:
-        import easyocr
         resolved = resolve_runtime_device(ocr_device, ui_lang)
         print(T("ocr_init", ui_lang))
-        reader = easyocr.Reader(['ch_sim', 'en'], gpu=(resolved == "cuda"))
+        pool = OcrPool(gpu=(resolved == "cuda"), workers=ocr_workers)
         print(T("ocr_ready", ui_lang))
         print(T("ocr_using", ui_lang, device=resolved))
-        return reader
+        if pool.workers > 1:
+            print(T("ocr_workers", ui_lang, workers=pool.workers))
+        return pool
     except Exception:
         return None
 
@@ -268,13 +292,6 @@ def ensure_ffmpeg(lang):
     return False
 
 
-def format_srt_time(seconds):
-    m, s = divmod(seconds, 60)
-    h, m = divmod(m, 60)
-    milliseconds = int((seconds % 1) * 1000)
-    return f"{int(h):02d}:{int(m):02d}:{int(s):02d},{milliseconds:03d}"
-
-
 def segments_to_srt(segments):
     rows = []
     for i, seg in enumerate(segments, 1):
@@ -282,8 +299,8 @@ def segments_to_srt(segments):
     return "\n".join(rows).strip() + "\n"
 
 
-def _extract_audio_for_whisper(media_file, lang):
-    print(T("media_extracting", lang))
+def _extract_audio_for_whisper(media_file, lang, log=print):
+    log(T("media_extracting", lang))
     temp_dir = tempfile.mkdtemp(prefix="toolkit_media_")
     wav_path = Path(temp_dir) / f"{Path(media_file).stem}_extracted.wav"
     command = [
@@ -310,51 +327,29 @@ def _run_transcribe(model, audio_path, mode):
     ]
 
 
-def intelligent_merge(en_segments, zh_segments):
-    """Merge EN/ZH segment streams by overlap and no-speech probability.
-
-    Strategy:
-    - Find Chinese segments overlapping each English segment.
-    - If English no-speech probability is lower than average overlapping Chinese
-      no-speech probability, keep English; otherwise keep overlapping Chinese.
-    - Append remaining unmatched Chinese segments and sort by start time.
-    """
-    final_segments = []
-    zh_pool = list(zh_segments)
-    for en_seg in en_segments:
-        overlapping = [z for z in zh_pool if max(en_seg.start, z.start) < min(en_seg.end, z.end)]
-        if not overlapping:
-            final_segments.append(en_seg)
-            continue
-        avg_zh_prob = sum(seg.no_speech_prob for seg in overlapping) / len(overlapping)
-        if en_seg.no_speech_prob < avg_zh_prob:
-            final_segments.append(en_seg)
-        else:
-            final_segments.extend(overlapping)
-        for z in overlapping:
-            if z in zh_pool:
-                zh_pool.remove(z)
-    final_segments.extend(zh_pool)
-    final_segments.sort(key=lambda s: s.start)
-    return final_segments
-
-
-def create_whisper_model(whisper_model, whisper_device, lang):
+def create_whisper_model(whisper_model, whisper_device, lang, long_media=False):
     from faster_whisper import WhisperModel
     resolved_device = resolve_runtime_device(whisper_device, lang)
+    if long_media:
+        if resolved_device == "cpu":
+            # Used like a model: transcribe() runs chunks in a process pool.
+            transcriber = ChunkedTranscriber(whisper_model)
+            print(T("media_long_mode", lang, workers=transcriber.workers))
+            return transcriber
+        print(T("media_long_gpu", lang))
     # CUDA uses mixed int8/float16 for better throughput; CPU stays pure int8.
     compute_type = "int8_float16" if resolved_device == "cuda" else "int8"
     return WhisperModel(whisper_model, device=resolved_device, compute_type=compute_type)
 
 
-def extract_from_media(file_path, whisper_model_obj, subtitle_mode, lang):
-    audio_path = _extract_audio_for_whisper(file_path, lang)
-    print(T("media_transcribing", lang))
+def extract_from_media(file_path, whisper_model_obj, subtitle_mode, lang, log=print):
+    audio_path = _extract_audio_for_whisper(file_path, lang, log)
+    log(T("media_transcribing", lang))
     try:
         if subtitle_mode == "merge":
             en_segments = _run_transcribe(whisper_model_obj, audio_path, "en")
             zh_segments = _run_transcribe(whisper_model_obj, audio_path, "zh")
-            merged = intelligent_merge(en_segments, zh_segments)
+            merged = merge_bilingual_segments(en_segments, zh_segments)
             return "\n".join(seg.text for seg in merged), segments_to_srt(merged)
         segments = _run_transcribe(whisper_model_obj, audio_path, subtitle_mode)
         return "\n".join(seg.text for seg in segments), segments_to_srt(segments)
@@ -368,6 +363,149 @@ def extract_from_media(file_path, whisper_model_obj, subtitle_mode, lang):
         except Exception:
             pass
 
+# --- Extraction Pipeline ---
+# Files that are being extracted or waiting for the writer, at most.
+# 正在提取或等待写入的文件数上限。
+PIPELINE_WINDOW = 32
+
+
+@dataclass
+class Extraction:
+    """Outcome of one document or media file, handed to the writer / 单个文档或音视频文件的处理结果，交给写入线程"""
+    text: str = ""
+    srt: str = None
+    notes: list = field(default_factory=list)  # messages printed with the result / 随结果输出的消息
+    error: Exception = None
+
+
+def run_stage(inbox, extract):
+    """
+    Extract queued (future, path) items until None arrives; *extract(path, notes)* returns (text, srt).
+    提取队列中的 (future, 路径) 项直到收到 None；*extract(path, notes)* 返回 (文本, 字幕)。
+    """
+    while True:
+        item = inbox.get()
+        if item is None:
+            return
+        future, file_path = item
+        if not future.set_running_or_notify_cancel():
+            continue
+        notes = []
+        try:
+            text, srt = extract(file_path, notes)
+            future.set_result(Extraction(text, srt, notes))
+        except Exception as e:
+            future.set_result(Extraction(notes=notes, error=e))
+
+
+def extract_document(file_path, page_cache, lang):
+    ext = file_path.suffix.lower()
+    if ext == '.pdf': return extract_text_from_pdf(file_path, page_cache)
+    if ext == '.docx': return extract_text_from_docx(file_path)
+    if ext == '.pptx': return extract_text_from_pptx(file_path)
+    if ext == '.doc': return extract_text_from_doc(file_path, lang)
+    return extract_text_from_json(file_path)
+
+
+def document_stage(inbox, lang):
+    """Thread body of the document stage; sqlite connections are per thread, so each opens its own page cache."""
+    page_cache = open_page_cache()
+    try:
+        run_stage(inbox, lambda p, notes: (extract_document(p, page_cache, lang), None))
+    finally:
+        if page_cache:
+            page_cache.close()
+
+
+def media_stage(inbox, whisper_model_obj, subtitle_mode, lang):
+    """Thread body of the media stage: one file at a time, as every file shares the model."""
+    run_stage(inbox, lambda p, notes: extract_from_media(p, whisper_model_obj, subtitle_mode, lang, notes.append))
+
+
+class ResultWriter:
+    """
+    Writes the results in file order on its own thread, whatever order the stages finish in.
+    在独立线程中按文件顺序写出结果，与各阶段的完成顺序无关。
+    """
+    def __init__(self, total, output_base_dir, lang, args, manifest, window):
+        self.total = total
+        self.output_base_dir = output_base_dir
+        self.lang = lang
+        self.args = args
+        self.manifest = manifest
+        self.window = window
+        self.inbox = queue.Queue(maxsize=PIPELINE_WINDOW)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        for i, (p, pending) in enumerate(iter(self.inbox.get, None)):
+            try:
+                self.write(i, p, pending)
+            finally:
+                self.window.release()
+
+    def write(self, i, p, pending):
+        """*pending* is an OCR future for images, an Extraction future for documents and media, or None to skip."""
+        lang = self.lang
+        print(T("processing", lang, i=i+1, total=self.total, filename=p.name))
+
+        # Determine final output directory for this specific file
+        if self.output_base_dir:
+            output_dir = self.output_base_dir
+        else:
+            # Single file mode
+            output_dir = p.parent
+
+        # Create output directory if it doesn't exist
+        if not output_dir.exists():
+            try:
+                print(T("output_dir_creating", lang, path=output_dir))
+                output_dir.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                print(T("output_dir_fail", lang, e=e))
+                return # Skip this file if its output dir can't be created
+
+        output_path = output_dir / f"{p.stem}_extracted.txt"
+        subtitle_path = output_dir / f"{p.stem}_extracted.srt"
+        written = [output_path]
+
+        try:
+            ext = p.suffix.lower()
+            if ext in DOC_EXTS:
+                result = pending.result()
+                if result.error: raise result.error
+                text_content = result.text
+            elif ext in IMG_EXTS:
+                if not pending: return
+                try: text_content = pending.result()
+                except Exception as e: raise IOError(T("failure_read_img", lang, e=e)) from e
+            elif ext in MEDIA_EXTS:
+                if not pending:
+                    print(T("media_skip_no_engine", lang))
+                    return
+                result = pending.result()
+                for note in result.notes: print(note)
+                try:
+                    if result.error: raise result.error
+                    with open(subtitle_path, 'w', encoding='utf-8') as sf:
+                        sf.write(result.srt)
+                    print(T("media_srt_saved", lang, path=subtitle_path))
+                    written.append(subtitle_path)
+                except Exception as e:
+                    print(T("media_fail", lang, e=e))
+                    return
+                text_content = result.text
+            else:
+                print(T("unsupported", lang)); return
+
+            with open(output_path, 'w', encoding='utf-8') as f: f.write(text_content)
+            print(T("success_save", lang, path=output_path))
+            if self.manifest:
+                self.manifest.record(output_path, [p], output_params(p, self.args), written)
+        except Exception as e:
+            print(T("failure_process", lang, e=e))
+
+
 # --- Main Logic ---
 def get_all_supported_files(paths, sort_by):
     files_to_process = set()
@@ -377,7 +515,7 @@ def get_all_supported_files(paths, sort_by):
             files_to_process.add(str(p))
         elif p.is_dir():
             for ext in SUPPORTED_EXTS:
-                files_to_process.update(str(f) for f in p.rglob(f"*{ext}"))
+                files_to_process.update(str(f) for f in p.rglob(f"*{ext}") if f.name != MANIFEST_NAME)
     file_list = list(files_to_process)
     if sort_by == 'date': file_list.sort(key=os.path.getmtime)
     else:
@@ -388,6 +526,15 @@ def get_all_supported_files(paths, sort_by):
             file_list.sort()
     return file_list
 
+def output_params(file_path, args):
+    """Parameters that change the output of *file_path* (for --incremental)."""
+    if Path(file_path).suffix.lower() in MEDIA_EXTS:
+        params = {'whisper_model': args.whisper_model, 'subtitle_mode': args.subtitle_mode}
+        if args.long_media:
+            params['long_media'] = True
+        return params
+    return {}
+
 def main():
     parser = argparse.ArgumentParser(description="Universal Text Extractor for documents and images.")
     parser.add_argument('files', nargs='*', help="Paths to files or folders from the GUI.")
@@ -395,9 +542,14 @@ def main():
     parser.add_argument('--lang', type=str, default='en', choices=['zh', 'en'], help=argparse.SUPPRESS)
     parser.add_argument('--sort-by', type=str, default="name", choices=["name", "date"], help="Sort files by 'name' (natural) or 'date' (modification time).")
     parser.add_argument('--ocr-device', type=str, default='auto', choices=['auto', 'cpu', 'cuda'], help="OCR device: auto/cpu/cuda.")
+    parser.add_argument('--ocr-workers', type=int, default=0, help="OCR processes on CPU (0 = one per 4 cores).")
     parser.add_argument('--whisper-model', type=str, default='small', help="Whisper model name for media subtitle extraction.")
     parser.add_argument('--whisper-device', type=str, default='auto', choices=['auto', 'cpu', 'cuda'], help="Whisper runtime device: auto/cpu/cuda.")
     parser.add_argument('--subtitle-mode', type=str, default='auto', choices=['auto', 'merge', 'en', 'zh'], help="Subtitle extraction mode for media files.")
+    parser.add_argument('--incremental', action='store_true', help="Skip files whose input and parameters are unchanged since the last run.")
+    parser.add_argument('--long-media', action='store_true', help="Cut long media into chunks at pauses and transcribe them in parallel processes (CPU only).")
+    add_shard_argument(parser)
+    parser.add_argument('--doc-workers', type=int, default=4, help="Documents parsed in parallel (1 = one at a time, 0 = number of CPU cores).")
     args = parser.parse_args()
     lang = args.lang
 
@@ -413,14 +565,6 @@ def main():
         print(T("files_none", lang))
         return
 
-    need_docs = any(Path(f).suffix.lower() in DOC_EXTS for f in files_to_process)
-    need_images = any(Path(f).suffix.lower() in IMG_EXTS for f in files_to_process)
-    need_media = any(Path(f).suffix.lower() in MEDIA_EXTS for f in files_to_process)
-    setup_dependencies(lang, need_docs=need_docs, need_images=need_images, need_media=need_media)
-
-    print(T("files_found", lang, count=len(files_to_process)))
-    for f in files_to_process: print(f"- {f}")
-
     # ======================================================================
     # vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
     # (MODIFIED) Context-Aware Output Directory Logic
@@ -438,72 +582,115 @@ def main():
     # ======================================================================
     # ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
 
-    ocr_reader = get_ocr_reader(lang, args.ocr_device) if need_images else None
+    # Parallel shards: the output folder was chosen from all files above, so
+    # every shard writes to the same one; only this shard's share is processed.
+    files_to_process = select_shard(files_to_process, args.shard)
+    if not files_to_process:
+        print(T("all_done", lang))
+        return
+
+    # Incremental mode: drop unchanged files before any engine is loaded.
+    manifest = OutputManifest("extract-text", __file__) if args.incremental else None
+    if manifest:
+        pending = []
+        for f in files_to_process:
+            p = Path(f)
+            output_path = (output_base_dir or p.parent) / f"{p.stem}_extracted.txt"
+            if manifest.is_up_to_date(output_path, [p], output_params(p, args)):
+                print(T("skip_unchanged", lang, filename=p.name))
+            else:
+                pending.append(f)
+        files_to_process = pending
+        if not files_to_process:
+            print(T("incremental_summary", lang, skipped=manifest.skipped, total=manifest.checked))
+            print(T("all_done", lang))
+            return
+
+    need_docs = any(Path(f).suffix.lower() in DOC_EXTS for f in files_to_process)
+    need_images = any(Path(f).suffix.lower() in IMG_EXTS for f in files_to_process)
+    need_media = any(Path(f).suffix.lower() in MEDIA_EXTS for f in files_to_process)
+    setup_dependencies(lang, need_docs=need_docs, need_images=need_images, need_media=need_media)
+
+    print(T("files_found", lang, count=len(files_to_process)))
+    for f in files_to_process: print(f"- {f}")
+
+    ocr_pool = open_ocr_pool(lang, args.ocr_device, args.ocr_workers) if need_images else None
+    # Every image is queued now, so OCR runs ahead of the loop below.
+    ocr_results = {}
+    if ocr_pool:
+        image_files = [f for f in files_to_process if Path(f).suffix.lower() in IMG_EXTS]
+        ocr_results = dict(zip(image_files, ocr_pool.submit(image_files)))
     media_runtime_ok = ensure_ffmpeg(lang) if need_media else True
     whisper_model_obj = None
     if need_media and media_runtime_ok:
         try:
-            whisper_model_obj = create_whisper_model(args.whisper_model, args.whisper_device, lang)
+            whisper_model_obj = create_whisper_model(args.whisper_model, args.whisper_device, lang, args.long_media)
         except Exception as e:
             print(T("media_fail", lang, e=e))
             media_runtime_ok = False
 
-    for i, file_path in enumerate(files_to_process):
+    # Pipeline: documents go to a pool of threads, images to the OCR pool and
+    # media to one transcription thread, all at the same time; the writer
+    # thread saves the results in file order.  The window alone bounds how far
+    # the stages run ahead of the writer: the stage queues are unbounded, so
+    # the dispatch loop never waits on one modality while another is idle.
+    # 流水线: 文档交给线程池，图片交给 OCR 池，音视频交给一个转写线程，三者同时
+    # 进行；写入线程按文件顺序保存结果。仅由窗口限制各阶段领先写入线程的文件数:
+    # 各阶段队列不设上限，分发循环不会因某一类文件而让其他空闲的阶段等待。
+    window = threading.BoundedSemaphore(PIPELINE_WINDOW)
+    writer = ResultWriter(len(files_to_process), output_base_dir, lang, args, manifest, window)
+    writer.thread.start()
+    stages = []  # (queue, threads reading it) / (队列, 读取该队列的线程)
+    doc_queue = media_queue = None
+    if need_docs:
+        doc_count = sum(Path(f).suffix.lower() in DOC_EXTS for f in files_to_process)
+        doc_workers = max(1, min(args.doc_workers if args.doc_workers > 0 else (os.cpu_count() or 1), doc_count))
+        if doc_workers > 1:
+            print(T("doc_workers", lang, workers=doc_workers))
+        doc_queue = queue.Queue()
+        stages.append((doc_queue, [
+            threading.Thread(target=document_stage, args=(doc_queue, lang), daemon=True)
+            for _ in range(doc_workers)
+        ]))
+    if need_media and media_runtime_ok:
+        media_queue = queue.Queue()
+        stages.append((media_queue, [threading.Thread(
+            target=media_stage, args=(media_queue, whisper_model_obj, args.subtitle_mode, lang), daemon=True
+        )]))
+    for _, threads in stages:
+        for thread in threads: thread.start()
+
+    for file_path in files_to_process:
         p = Path(file_path)
-        print(T("processing", lang, i=i+1, total=len(files_to_process), filename=p.name))
-        
-        # Determine final output directory for this specific file
-        if output_base_dir:
-            output_dir = output_base_dir
-        else:
-            # Single file mode
-            output_dir = p.parent
-
-        # Create output directory if it doesn't exist
-        if not output_dir.exists():
-            try:
-                print(T("output_dir_creating", lang, path=output_dir))
-                output_dir.mkdir(parents=True)
-            except OSError as e:
-                print(T("output_dir_fail", lang, e=e))
-                continue # Skip this file if its output dir can't be created
-
-        output_path = output_dir / f"{p.stem}_extracted.txt"
-        subtitle_path = output_dir / f"{p.stem}_extracted.srt"
-        text_content = ""
-        
-        try:
-            ext = p.suffix.lower()
-            if ext in ['.pdf']: text_content = extract_text_from_pdf(p)
-            elif ext in ['.docx']: text_content = extract_text_from_docx(p)
-            elif ext in ['.pptx']: text_content = extract_text_from_pptx(p)
-            elif ext in ['.doc']: text_content = extract_text_from_doc(p, lang)
-            elif ext in ['.json']: text_content = extract_text_from_json(p)
-            elif ext in IMG_EXTS:
-                if ocr_reader: text_content = extract_text_from_image(p, ocr_reader, lang)
-                else: continue
-            elif ext in MEDIA_EXTS:
-                if not media_runtime_ok:
-                    print(T("media_skip_no_engine", lang))
-                    continue
-                try:
-                    text_content, srt_content = extract_from_media(
-                        p, whisper_model_obj, args.subtitle_mode, lang
-                    )
-                    with open(subtitle_path, 'w', encoding='utf-8') as sf:
-                        sf.write(srt_content)
-                    print(T("media_srt_saved", lang, path=subtitle_path))
-                except Exception as e:
-                    print(T("media_fail", lang, e=e))
-                    continue
-            else:
-                print(T("unsupported", lang)); continue
-
-            with open(output_path, 'w', encoding='utf-8') as f: f.write(text_content)
-            print(T("success_save", lang, path=output_path))
-        except Exception as e:
-            print(T("failure_process", lang, e=e))
-
+        ext = p.suffix.lower()
+        window.acquire()
+        pending = None
+        if ext in DOC_EXTS:
+            pending = Future()
+            doc_queue.put((pending, p))
+        elif ext in IMG_EXTS:
+            pending = ocr_results.get(file_path)
+        elif ext in MEDIA_EXTS and media_queue:
+            pending = Future()
+            media_queue.put((pending, p))
+        writer.inbox.put((p, pending))
+
+    writer.inbox.put(None)
+    for stage_queue, threads in stages:
+        for _ in threads: stage_queue.put(None)
+    for _, threads in stages:
+        for thread in threads: thread.join()
+    writer.thread.join()
+
+    if isinstance(whisper_model_obj, ChunkedTranscriber):
+        whisper_model_obj.close()
+    if ocr_pool:
+        if ocr_pool.completed:
+            print(T("ocr_throughput", lang, count=ocr_pool.completed, rate=ocr_pool.images_per_second))
+        ocr_pool.close()
+    if manifest:
+        manifest.save()
+        print(T("incremental_summary", lang, skipped=manifest.skipped, total=manifest.checked))
     print(T("all_done", lang))
 
 if __name__ == "__main__":
@@ -12,6 +12,10 @@
 2. **健壮的进度条**: 采用全新的、兼容性极强的进度条逻辑，确保在GUI中能精确地单行刷新。
 3. **模式选择与中间文件**: 保留了清晰的模式选项，并在合并模式下自动保存中间产物。
 4. **依赖引导**: 引导用户安装 `ffmpeg` 和所需的 Python 模块。
+5. **模型复用**: 模型每次运行只加载一次，供所有文件共用；勾选 `--warm-daemon` 后模型常驻后台进程，之后的运行无需重新加载。
+6. **单次解码**: 合并模式下音频只解码一次，英文和中文两次转写共用同一份数据；CPU 核心充足时两次转写并行执行。
+7. **流式写入**: 字幕条目在识别出来时即写入文件，中途出错也能保留已完成的部分。
+8. **长音频模式**: 勾选 `--long-media` 后，音频在停顿处切块，由多个进程并行转写，再拼接时间戳并去除重叠部分的重复片段。
 ~~~
 This is a fully automated script for mixed Chinese/English audio. It employs an intelligent merging algorithm to create a single, high-quality, mixed-language subtitle file.
 
@@ -20,6 +24,10 @@ Workflow (v1.6 - Stable Version):
 2. **Robust Progress Bar**: Implements a new, highly compatible progress bar logic that ensures precise, single-line refreshing within the GUI.
 3. **Mode Selection & Intermediates**: Retains clear mode selection and saves intermediate files in merge mode.
 4. **Dependency Guidance**: Guides the user to install `ffmpeg` and required Python modules.
+5. **Model Reuse**: The model is loaded once per run and shared by all files; with `--warm-daemon` it stays resident in a background process so later runs skip loading it.
+6. **Single Decode**: In merge mode the audio is decoded once and shared by the English and Chinese passes, which run in parallel when there are enough CPU cores.
+7. **Streaming Output**: Subtitle entries are written to disk as they are recognized, so a failed run keeps what was already transcribed.
+8. **Long-Media Mode**: With `--long-media` the audio is cut into chunks at pauses and transcribed by several processes in parallel; timestamps are stitched back together and segments duplicated by the chunk overlaps are dropped.
 """
 
 import os
@@ -29,8 +37,14 @@ import argparse
 import time
 import platform
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from _shared.chunked_transcription import ChunkedTranscriber
+from _shared.subtitles import SrtWriter, merge_bilingual_segments, to_simplified_chinese
+from _shared.whisper_models import RemoteWhisperModel, connect_whisper_daemon, load_whisper_model
+
 # --- (MODIFIED) Bilingual Reporting / (修改后) 双语报告 ---
 
 MESSAGES = {
@@ -48,8 +62,14 @@ MESSAGES = {
         "process_file": "\n--- 正在处理文件: {file} ---",
         "model_loading": "[信息] 正在加载 Whisper 模型 '{model}'... (首次使用可能需要较长时间)",
         "model_loaded": "[OK] 模型加载完毕。",
+        "daemon_connecting": "[信息] 正在连接常驻模型进程 '{model}'... (首次将在后台启动并加载模型)",
+        "daemon_ready": "[OK] 已连接常驻模型进程 (空闲 {minutes:g} 分钟后自动退出)。",
+        "daemon_unavailable": "[警告] 无法使用常驻模型进程，改为在本进程中加载模型。",
+        "long_media": "[信息] 长音频模式: 音频将在停顿处分块，由 {workers} 个进程并行转写 (每个进程加载一份模型 '{model}')。",
         "mode_merge": "--- 开始混合语言转写 (合并模式) ---",
         "mode_single": "--- 开始单语言转写 ({lang} 模式) ---",
+        "audio_decoding": "[信息] 正在解码音频 (供两种语言的转写共用)...",
+        "passes_parallel": "[信息] 英文和中文转写将并行执行。",
         "pass_start": "[信息] 正在执行 {lang} 语言转写...",
         "pass_progress": "转写进度 / Transcription Progress",
         "pass_complete": "[OK] {lang} 语言转写完成。",
@@ -76,8 +96,14 @@ MESSAGES = {
         "process_file": "\n--- Processing file: {file} ---",
         "model_loading": "[INFO] Loading Whisper model '{model}'... (This may take a while on first use)",
         "model_loaded": "[OK] Model loaded.",
+        "daemon_connecting": "[INFO] Connecting to the warm model daemon for '{model}'... (the first run starts it and loads the model)",
+        "daemon_ready": "[OK] Connected to the warm model daemon (it exits after {minutes:g} idle minutes).",
+        "daemon_unavailable": "[WARN] The warm model daemon is unavailable; loading the model in this process instead.",
+        "long_media": "[INFO] Long-media mode: audio is cut into chunks at pauses and transcribed by {workers} processes in parallel (each loads its own copy of '{model}').",
         "mode_merge": "--- Starting Mixed-Language Transcription (Merge Mode) ---",
         "mode_single": "--- Starting Single-Language Transcription ({lang} Only Mode) ---",
+        "audio_decoding": "[INFO] Decoding audio (shared by both language passes)...",
+        "passes_parallel": "[INFO] The English and Chinese passes will run in parallel.",
         "pass_start": "[INFO] Performing transcription pass for language: {lang}...",
         "pass_progress": "", # English part is integrated into the Chinese one
         "pass_complete": "[OK] {lang} language pass complete.",
@@ -142,104 +168,145 @@ REQUIRED_PYTHON_PACKAGES = {
 }
 
 # --- Core Functions ---
-def format_srt_time(seconds):
-    m, s = divmod(seconds, 60); h, m = divmod(m, 60)
-    return f"{int(h):02d}:{int(m):02d}:{int(s):02d},{int((seconds - int(s)) * 1000):03d}"
-
-def segments_to_srt(segments):
-    from opencc import OpenCC
-    cc = OpenCC('t2s'); srt_content = ""
-    for i, segment in enumerate(segments, 1):
-        start_time = format_srt_time(segment.start); end_time = format_srt_time(segment.end)
-        text = segment.text.strip()
-        if segment.lang == 'zh': text = cc.convert(text)
-        srt_content += f"{i}\n{start_time} --> {end_time}\n{text}\n\n"
-    return srt_content
-
-def transcribe_pass(model, file_path, lang):
-    lang_map = {'en': 'English', 'zh': '中文'}
-    print(T("pass_start", lang=lang_map.get(lang, lang)), flush=True)
-    
-    segments_generator, info = model.transcribe(str(file_path), language=lang, beam_size=5, no_speech_threshold=0.6)
-    
+def write_segment(writer, segment):
+    """Writes one SRT entry; Chinese text is converted to Simplified Chinese."""
+    text = segment.text.strip()
+    if segment.lang == 'zh': text = to_simplified_chinese(text)
+    writer.write(segment.start, segment.end, text)
+
+LANG_NAMES = {'en': 'English', 'zh': '中文'}
+
+class ProgressBar:
+    """Single-line progress bar; for parallel passes it shows their average progress."""
+    BAR_LEN = 40
+
+    def __init__(self, langs):
+        self.progress = dict.fromkeys(langs, 0.0)
+        self.lock = threading.Lock()
+
+    def update(self, lang, value):
+        with self.lock:
+            self.progress[lang] = value
+            progress = sum(self.progress.values()) / len(self.progress)
+            filled_len = int(self.BAR_LEN * progress / 100)
+            bar = '█' * filled_len + '-' * (self.BAR_LEN - filled_len)
+            sys.stdout.write(f"\r{T('pass_progress')}: [{bar}] {progress:.2f}%")
+            sys.stdout.flush()
+
+    def finish(self):
+        sys.stdout.write(f"\r{T('pass_progress')}: [{'█' * self.BAR_LEN}] 100.00%\n")
+        sys.stdout.flush()
+
+def load_audio(model, file_path):
+    """Decodes the media once into the 16 kHz mono PCM buffer both language passes share."""
+    if isinstance(model, (RemoteWhisperModel, ChunkedTranscriber)):
+        # The daemon decodes on its side, where sending it the PCM would cost more than decoding;
+        # the chunked transcriber decodes once per path and reuses it for the second pass.
+        # 常驻进程自行解码（传输 PCM 数据比解码更耗时）；分块转写器对同一路径只解码一次，供第二次转写复用。
+        return str(file_path)
+    from faster_whisper import decode_audio
+    print(T("audio_decoding"), flush=True)
+    return decode_audio(str(file_path), sampling_rate=model.feature_extractor.sampling_rate)
+
+def collect_segments(model, audio, lang, on_progress, writer, keep=True):
+    """Streams the pass into *writer* as segments arrive; returns them only if *keep*."""
+    segments_generator, info = model.transcribe(audio, language=lang, beam_size=5, no_speech_threshold=0.6)
     total_duration = round(info.duration, 2)
     segment_list = []
-    
-    bar_len = 40
     for segment in segments_generator:
-        segment_list.append(segment)
-        progress = min(100, (segment.end / total_duration) * 100)
-        filled_len = int(bar_len * progress / 100)
-        bar = '█' * filled_len + '-' * (bar_len - filled_len)
-        progress_string = f"\r{T('pass_progress')}: [{bar}] {progress:.2f}%"
-        sys.stdout.write(progress_string)
-        sys.stdout.flush()
-    
-    final_bar = f"\r{T('pass_progress')}: [{'█' * bar_len}] 100.00%\n"
-    sys.stdout.write(final_bar)
-    sys.stdout.flush()
+        segment.lang = lang
+        write_segment(writer, segment)
+        if keep: segment_list.append(segment)
+        on_progress(lang, min(100, (segment.end / total_duration) * 100))
+    return segment_list
 
-    print(T("pass_complete", lang=lang_map.get(lang, lang)), flush=True)
-    
-    for s in segment_list: s.lang = lang
+def transcribe_pass(model, audio, lang, writer, keep=True):
+    print(T("pass_start", lang=LANG_NAMES.get(lang, lang)), flush=True)
+    progress_bar = ProgressBar([lang])
+    segment_list = collect_segments(model, audio, lang, progress_bar.update, writer, keep)
+    progress_bar.finish()
+    print(T("pass_complete", lang=LANG_NAMES.get(lang, lang)), flush=True)
     return segment_list
 
+def transcribe_passes_parallel(model, audio, writers):
+    """Runs one pass per language of *writers* at the same time; the model needs a worker per pass."""
+    langs = list(writers)
+    for lang in langs: print(T("pass_start", lang=LANG_NAMES.get(lang, lang)), flush=True)
+    progress_bar = ProgressBar(langs)
+    with ThreadPoolExecutor(max_workers=len(langs)) as pool:
+        futures = [pool.submit(collect_segments, model, audio, lang, progress_bar.update, writers[lang]) for lang in langs]
+        results = [future.result() for future in futures]
+    progress_bar.finish()
+    for lang in langs: print(T("pass_complete", lang=LANG_NAMES.get(lang, lang)), flush=True)
+    return results
+
 def intelligent_merge(en_segments, zh_segments):
     print(T("merge_start"), flush=True)
-    final_segments = []; zh_segments_pool = list(zh_segments)
-    for en_seg in en_segments:
-        overlapping_zh = [zh_seg for zh_seg in zh_segments_pool if max(en_seg.start, zh_seg.start) < min(en_seg.end, zh_seg.end)]
-        if not overlapping_zh: final_segments.append(en_seg); continue
-        avg_zh_confidence = sum(s.no_speech_prob for s in overlapping_zh) / len(overlapping_zh)
-        if en_seg.no_speech_prob < avg_zh_confidence: final_segments.append(en_seg)
-        else: final_segments.extend(overlapping_zh)
-        for zh_seg in overlapping_zh:
-            if zh_seg in zh_segments_pool: zh_segments_pool.remove(zh_seg)
-    final_segments.extend(zh_segments_pool)
-    final_segments.sort(key=lambda s: s.start)
+    final_segments = merge_bilingual_segments(en_segments, zh_segments)
     print(T("merge_complete", count=len(final_segments)), flush=True)
     return final_segments
 
-def to_srt_single_pass(segments, is_chinese):
-    from opencc import OpenCC
-    cc = OpenCC('t2s') if is_chinese else None; srt_content = ""
-    for i, segment in enumerate(segments, 1):
-        text = segment.text.strip();
-        if is_chinese and cc: text = cc.convert(text)
-        srt_content += f"{i}\n{format_srt_time(segment.start)} --> {format_srt_time(segment.end)}\n{text}\n\n"
-    return srt_content
-
-def transcribe_audio(file_path, model_name, mode):
-    from faster_whisper import WhisperModel
-    print(T("process_file", file=file_path.name), flush=True)
+def merge_pass_workers(mode):
+    """Parallel transcribe workers: one per language pass in merge mode when CPU allows."""
+    return 2 if mode == 'merge' and (os.cpu_count() or 1) >= 4 else 1
+
+def open_model(model_name, warm_daemon, num_workers=1):
+    """Loads the model once for the whole run, or attaches to the warm-model daemon."""
+    if warm_daemon:
+        print(T("daemon_connecting", model=model_name), flush=True)
+        model = connect_whisper_daemon(model_name)
+        if model is not None:
+            print(T("daemon_ready", minutes=model.idle_minutes), flush=True)
+            return model
+        print(T("daemon_unavailable"), file=sys.stderr, flush=True)
     print(T("model_loading", model=model_name), flush=True)
-    model = WhisperModel(model_name, device="cpu", compute_type="int8")
+    model = load_whisper_model(model_name, num_workers=num_workers)
     print(T("model_loaded"), flush=True)
+    return model
+
+def open_chunked_transcriber(model_name, workers):
+    """Starts the worker processes of long-media mode; each loads the model itself."""
+    transcriber = ChunkedTranscriber(model_name, workers)
+    print(T("long_media", workers=transcriber.workers, model=model_name), flush=True)
+    return transcriber
+
+def transcribe_audio(file_path, model, mode, parallel_passes=False):
+    print(T("process_file", file=file_path.name), flush=True)
     p = Path(file_path); start_time = time.time()
     
     if mode == 'merge':
         print(T("mode_merge"), flush=True)
-        en_segments = transcribe_pass(model, file_path, 'en')
+        audio = load_audio(model, file_path)
         en_srt_filename = p.with_name(f"{p.stem}_en.srt")
-        with open(en_srt_filename, "w", encoding="utf-8") as f: f.write(to_srt_single_pass(en_segments, is_chinese=False))
+        zh_srt_filename = p.with_name(f"{p.stem}_zh.srt")
+        # The intermediate files are written while the passes run.
+        # 中间文件在转写过程中即逐条写入。
+        if parallel_passes:
+            print(T("passes_parallel"), flush=True)
+            with SrtWriter(en_srt_filename) as en_writer, SrtWriter(zh_srt_filename) as zh_writer:
+                en_segments, zh_segments = transcribe_passes_parallel(model, audio, {'en': en_writer, 'zh': zh_writer})
+        else:
+            with SrtWriter(en_srt_filename) as en_writer:
+                en_segments = transcribe_pass(model, audio, 'en', en_writer)
         print(T("file_saved_intermediate", path=en_srt_filename), flush=True)
         
-        zh_segments = transcribe_pass(model, file_path, 'zh')
-        zh_srt_filename = p.with_name(f"{p.stem}_zh.srt")
-        with open(zh_srt_filename, "w", encoding="utf-8") as f: f.write(to_srt_single_pass(zh_segments, is_chinese=True))
+        if not parallel_passes:
+            with SrtWriter(zh_srt_filename) as zh_writer:
+                zh_segments = transcribe_pass(model, audio, 'zh', zh_writer)
         print(T("file_saved_intermediate", path=zh_srt_filename), flush=True)
 
         merged_segments = intelligent_merge(en_segments, zh_segments)
-        srt_output = segments_to_srt(merged_segments)
         srt_filename = p.with_name(f"{p.stem}_merged.srt")
+        with SrtWriter(srt_filename) as writer:
+            for segment in merged_segments: write_segment(writer, segment)
     else:
         print(T("mode_single", lang=mode.upper()), flush=True)
-        segments = transcribe_pass(model, file_path, mode)
-        is_chinese = mode == 'zh'
-        srt_output = to_srt_single_pass(segments, is_chinese)
         srt_filename = p.with_name(f"{p.stem}_{mode}.srt")
+        # Nothing else needs the segments, so none are kept in memory.
+        # 其他步骤不需要这些片段，因此不保留在内存中。
+        with SrtWriter(srt_filename) as writer:
+            transcribe_pass(model, str(file_path), mode, writer, keep=False)
 
-    with open(srt_filename, "w", encoding="utf-8") as f: f.write(srt_output)
     duration = time.time() - start_time
     print(T("file_saved_final", path=srt_filename), flush=True)
     print(T("total_time", time=duration), flush=True)
@@ -256,6 +323,12 @@ def main():
     parser.add_argument('--model', type=str, default='large-v3', help="Whisper model to use. (default: large-v3)")
     parser.add_argument('--mode', type=str, default='merge', choices=['merge', 'en', 'zh'], 
                         help="Transcription mode:\n'merge': (Default) For mixed Chinese/English audio.\n'en': English only.\n'zh': Chinese only.")
+    parser.add_argument('--warm-daemon', action='store_true',
+                        help="Keep the model loaded in a background process so later runs skip loading it.\nThe process exits after 30 idle minutes.")
+    parser.add_argument('--long-media', action='store_true',
+                        help="Cut long recordings into chunks at pauses and transcribe them in parallel processes.\nEach process loads its own copy of the model.")
+    parser.add_argument('--chunk-workers', type=int, default=0,
+                        help="Processes used by --long-media (0 = one per 4 CPU cores).")
     
     args = parser.parse_args()
 
@@ -274,8 +347,23 @@ def main():
     if not files_to_process:
         print(T("no_files"), file=sys.stderr, flush=True); sys.exit(0)
 
-    for file_path in files_to_process:
-        transcribe_audio(file_path, args.model, args.mode)
+    if args.long_media:
+        model = open_chunked_transcriber(args.model, args.chunk_workers)
+        # Both passes feed their chunks into the same process pool.
+        # 两次转写的块进入同一个进程池。
+        parallel_passes = args.mode == 'merge'
+    else:
+        num_workers = merge_pass_workers(args.mode)
+        model = open_model(args.model, args.warm_daemon, num_workers)
+        # The daemon loads its model with num_workers=1, so concurrent requests
+        # would only queue inside it; its passes stay sequential.
+        # 常驻进程加载模型时 num_workers=1，并发请求只会在其中排队，因此其转写仍按顺序执行。
+        parallel_passes = num_workers > 1 and not isinstance(model, RemoteWhisperModel)
+    try:
+        for file_path in files_to_process:
+            transcribe_audio(file_path, model, args.mode, parallel_passes)
+    finally:
+        if isinstance(model, ChunkedTranscriber): model.close()
 
     print(T("all_done"), flush=True)
 
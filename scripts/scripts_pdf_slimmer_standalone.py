@@ -3,6 +3,7 @@
 """
 [display-name-zh] PDF重复页瘦身器（独立版）
 [display-name-en] PDF Duplicate Page Slimmer (Standalone)
+[parallel-shards]
 
 独立版 PDF 瘦身脚本：无需 PyMuPDF / python-pptx，直接基于 PDF 原始对象结构
 分析相邻页面的文本内容，若后一页完整包含前一页，则删除前一页。
@@ -20,21 +21,47 @@
   3. 若发现“后页包含前页”的冗余页面，则会输出已瘦身版本。
 ---
 Optional Parameters:
-This script has no visual or manual optional parameters.
+  --workers N   用于解码页面内容并提取文本的进程数（默认 1，即串行；0 表示使用全部 CPU 核心）。
+                Processes used to decode page contents and extract their text
+                (default 1 = serial; 0 = all CPU cores).
+  --incremental 跳过自上次运行以来输入未变化、且输出仍完好的文件（记录在 .toolkit_manifest.json 中）。
+                Skip files whose input is unchanged and whose output is intact
+                since the last run (recorded in .toolkit_manifest.json).
 ---
 """
 
 from __future__ import annotations
 
 import argparse
-import base64
+import hashlib
+import mmap
 import os
 import re
 import shutil
 import sys
 import zlib
-from dataclasses import dataclass, field
-from difflib import SequenceMatcher
+from collections.abc import Iterable, Iterator, Mapping
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import NamedTuple
+
+from _shared.containment import ContainmentIndex
+from _shared.manifest import OutputManifest
+from _shared.page_cache import PageCache, open_page_cache
+from _shared.shards import add_shard_argument, select_shard
+from _shared.pdf_objects import (
+    Buffer,
+    PdfObject,
+    XrefObjects,
+    extract_ref,
+    extract_refs_from_kids,
+    extract_stream_bytes,
+    is_page_node,
+    is_pages_node,
+    literal_end,
+    load_objects,
+    raw_stream,
+    ref_text,
+)
 
 
 SCRIPT_TEXTS = {
@@ -50,6 +77,8 @@ SCRIPT_TEXTS = {
         "no_redundancy": "   - 未发现可移除的冗余页面，已原样复制输出。",
         "process_success": "   => 完成! 原始数量: {original}, 瘦身后: {final}。已保存至: {output_path}",
         "process_fail": "   - 处理失败: {error}",
+        "skip_unchanged": "   - 跳过: 输入未变化，输出已是最新。",
+        "incremental_summary": "\n增量模式: 跳过了 {skipped}/{total} 个未变化的文件。",
         "all_done": "\n--- 所有任务已完成。 ---",
     },
     "en": {
@@ -64,6 +93,8 @@ SCRIPT_TEXTS = {
         "no_redundancy": "   - No removable redundant pages found; copied as-is.",
         "process_success": "   => Done! Original: {original}, Slimmed: {final}. Saved to: {output_path}",
         "process_fail": "   - Failed: {error}",
+        "skip_unchanged": "   - Skipped: input unchanged, output is up to date.",
+        "incremental_summary": "\nIncremental: skipped {skipped} of {total} unchanged files.",
         "all_done": "\n--- All tasks completed. ---",
     },
 }
@@ -72,26 +103,8 @@ SCRIPT_TEXTS = {
 SCRIPT_TEXTS["en"] = {**SCRIPT_TEXTS["zh"], **SCRIPT_TEXTS["en"]}
 
 
-@dataclass
-class PdfObject:
-    number: int
-    generation: int
-    raw: bytes
-    start: int
-    end: int
-    body: bytes = field(init=False)
-
-    def __post_init__(self) -> None:
-        self.body = self.raw[self.raw.find(b"obj") + 3 : self.raw.rfind(b"endobj")]
-
-    @property
-    def dict_part(self) -> bytes:
-        if b"stream" not in self.body:
-            return self.body
-        return self.body[: self.body.find(b"stream")]
-
-    def is_stream(self) -> bool:
-        return b"stream" in self.body
+# Page-text cache namespace; bump the version whenever extraction changes.
+CACHE_NAMESPACE = "pdf-slimmer-standalone/1"
 
 
 def install_and_import(*_args, **_kwargs):  # kept for script-registry parity
@@ -104,250 +117,256 @@ def install_and_import(*_args, **_kwargs):  # kept for script-registry parity
     return None
 
 
+_WHITESPACE_RUN_RE = re.compile(r"\s+")
+
+
 def normalize_text_lines(text: str) -> list[str]:
     if not text:
         return []
     lines = text.strip().splitlines()
-    normalized = [re.sub(r"\s+", " ", line).strip() for line in lines]
+    normalized = [_WHITESPACE_RUN_RE.sub(" ", line).strip() for line in lines]
     return [line for line in normalized if line]
 
 
 def is_line_contained_fuzzy(line_a: str, lines_b: list[str], sim_threshold: float = 0.9) -> bool:
-    matcher = SequenceMatcher()
-    matcher.set_seq1(line_a)
-    for line_b in lines_b:
-        matcher.set_seq2(line_b)
-        if matcher.ratio() >= sim_threshold:
-            return True
-        if len(line_b) > len(line_a) and line_b.startswith(line_a):
-            return True
-    return False
+    return ContainmentIndex(lines_b, sim_threshold).contains(line_a)
 
 
 def is_subset_fuzzy(lines_a: list[str], lines_b: list[str]) -> bool:
-    if not lines_a:
-        return True
-    if not lines_b:
-        return False
-    return all(is_line_contained_fuzzy(line_a, lines_b) for line_a in lines_a)
+    return ContainmentIndex(lines_b).contains_all(lines_a)
+
+
+# Escape sequences of literal strings (PDF 32000-1, 7.3.4.2).  Octal escapes
+# are handled separately; a backslash before an end-of-line continues the
+# string on the next line and yields nothing.
+_LITERAL_ESCAPES = {
+    b"n": b"\n",
+    b"r": b"\r",
+    b"t": b"\t",
+    b"b": b"\b",
+    b"f": b"\f",
+    b"\r\n": b"",
+    b"\r": b"",
+    b"\n": b"",
+    b"": b"",  # lone backslash at the very end
+}
+_LITERAL_ESCAPE_RE = re.compile(rb"\\([0-7]{1,3}|\r\n|[\s\S]|\Z)")
 
 
-def decode_pdf_literal(data: bytes) -> str:
-    out = bytearray()
-    i = 0
-    while i < len(data):
-        c = data[i]
-        if c == 0x5C:  # backslash
-            i += 1
-            if i >= len(data):
-                break
-            nxt = data[i]
-            if nxt == ord("n"):
-                out += b"\n"
-            elif nxt == ord("r"):
-                out += b"\r"
-            elif nxt == ord("t"):
-                out += b"\t"
-            elif nxt == ord("b"):
-                out += b"\b"
-            elif nxt == ord("f"):
-                out += b"\f"
-            elif nxt in b"()\\":
-                out.append(nxt)
-            elif 48 <= nxt <= 55:
-                oct_digits = bytes([nxt])
-                for _ in range(2):
-                    if i + 1 < len(data) and 48 <= data[i + 1] <= 55:
-                        i += 1
-                        oct_digits += bytes([data[i]])
-                    else:
-                        break
-                out.append(int(oct_digits, 8) & 0xFF)
-            elif nxt in b"\n\r":
-                if nxt == 0x0D and i + 1 < len(data) and data[i + 1] == 0x0A:
-                    i += 1
-            else:
-                out.append(nxt)
-        else:
-            out.append(c)
-        i += 1
-    return out.decode("latin1", errors="replace")
-
-
-def _apply_filters(stream: bytes, filters: list[str]) -> bytes:
-    data = stream
-    for flt in filters:
-        if flt == "ASCIIHexDecode":
-            hex_data = re.sub(rb"\s+", b"", data)
-            hex_data = hex_data.rstrip(b">")
-            if len(hex_data) % 2 == 1:
-                hex_data += b"0"
-            data = bytes.fromhex(hex_data.decode("ascii"))
-        elif flt == "ASCII85Decode":
-            try:
-                data = base64.a85decode(data, adobe=True)
-            except Exception as exc:  # pragma: no cover - defensive wrapper
-                raise ValueError(f"Invalid ASCII85 stream: {exc}") from exc
-        elif flt == "FlateDecode":
-            data = zlib.decompress(data)
-    return data
-
-
-def _parse_filters(dict_part: bytes) -> list[str]:
-    filters: list[str] = []
-    match = re.search(rb"/Filter\s+(\[.*?\]|/[A-Za-z0-9]+)", dict_part, re.S)
-    if not match:
-        return filters
+def _literal_escape(match: re.Match) -> bytes:
     token = match.group(1)
-    filters = re.findall(rb"/([A-Za-z0-9]+)", token)
-    return [f.decode("ascii", errors="ignore") for f in filters]
-
-
-def extract_stream_bytes(obj: PdfObject) -> bytes | None:
-    if b"stream" not in obj.body:
-        return None
-    match = re.search(rb"stream\r?\n", obj.body)
-    if not match:
-        return None
-    start = match.end()
-    end = obj.body.rfind(b"endstream")
-    if end < 0:
-        return None
-    stream = obj.body[start:end]
-    if stream.endswith(b"\r\n"):
-        stream = stream[:-2]
-    elif stream.endswith(b"\n") or stream.endswith(b"\r"):
-        stream = stream[:-1]
-    filters = _parse_filters(obj.dict_part)
-    try:
-        return _apply_filters(stream, filters) if filters else stream
-    except Exception:
-        return stream
+    if b"0" <= token[:1] <= b"7":
+        return bytes((int(token, 8) & 0xFF,))
+    return _LITERAL_ESCAPES.get(token, token)
 
 
-def extract_text_from_stream(raw: bytes) -> list[str]:
-    if not raw:
-        return []
-    texts: list[str] = []
-    # Match PDF text-showing operators:
-    #   - TJ: array form containing literal strings, hex strings, and spacing
-    #   - Tj: single literal or hex string
-    # The nested array pattern handles the token shapes emitted by the PDFs
-    # processed by Toolkit.
-    pattern = re.compile(
-        rb"(\[(?:[^\[\]]|\[(?:[^\[\]]|\[[^\]]*\])*\])*\]|\((?:[^\\()]|\\.)*\)|<[^>]+>)\s*T[Jj]",
-        re.S,
-    )
-    for match in pattern.finditer(raw):
-        token = match.group(1)
-        if token.startswith(b"["):
-            parts: list[str] = []
-            for piece in re.finditer(rb"\((?:[^\\()]|\\.)*\)|<[^>]+>", token):
-                part = piece.group(0)
-                if part.startswith(b"("):
-                    parts.append(decode_pdf_literal(part[1:-1]))
-                else:
-                    hexs = re.sub(rb"\s+", b"", part[1:-1])
-                    if len(hexs) % 2 == 1:
-                        hexs += b"0"
-                    parts.append(
-                        bytes.fromhex(hexs.decode("ascii")).decode("latin1", errors="replace")
-                    )
-            texts.append("".join(parts))
-        elif token.startswith(b"("):
-            texts.append(decode_pdf_literal(token[1:-1]))
-        else:
-            hexs = re.sub(rb"\s+", b"", token[1:-1])
-            if len(hexs) % 2 == 1:
-                hexs += b"0"
-            texts.append(bytes.fromhex(hexs.decode("ascii")).decode("latin1", errors="replace"))
-    return normalize_text_lines("\n".join(texts))
-
-
-def parse_objects(data: bytes) -> dict[tuple[int, int], PdfObject]:
-    objects: dict[tuple[int, int], PdfObject] = {}
-    for match in re.finditer(rb"(?m)^(\d+)\s+(\d+)\s+obj\b", data):
-        start = match.start()
-        end = data.find(b"endobj", match.end())
-        if end < 0:
-            continue
-        obj = PdfObject(
-            number=int(match.group(1)),
-            generation=int(match.group(2)),
-            raw=data[start : end + 6],
-            start=start,
-            end=end + 6,
-        )
-        objects[(obj.number, obj.generation)] = obj
-    return objects
+def decode_pdf_literal(data: bytes) -> str:
+    if b"\\" in data:
+        data = _LITERAL_ESCAPE_RE.sub(_literal_escape, data)
+    return data.decode("latin1")
 
 
-def _ref_text(ref: tuple[int, int]) -> str:
-    return f"{ref[0]} {ref[1]} R"
+def _decode_hex_string(hex_digits: bytes) -> str:
+    hex_digits = hex_digits.translate(None, b" \t\r\n\f\v")
+    if len(hex_digits) % 2 == 1:
+        hex_digits += b"0"
+    return bytes.fromhex(hex_digits.decode("ascii")).decode("latin1")
 
 
-def _find_catalog(objects: dict[tuple[int, int], PdfObject]) -> tuple[int, int]:
-    for key, obj in objects.items():
-        if b"/Type /Catalog" in obj.body or b"/Type/Catalog" in obj.body:
-            return key
-    raise ValueError("Catalog object not found")
+# ---------------------------------------------------------------------------
+# Content stream lexer
+# ---------------------------------------------------------------------------
 
+class TextShow(NamedTuple):
+    """One text-showing operation (``Tj``, ``TJ``, ``'`` or ``"``).
 
-def _extract_ref(obj_body: bytes, field_name: bytes) -> tuple[int, int] | None:
-    match = re.search(field_name + rb"\s+(\d+)\s+(\d+)\s+R", obj_body)
-    if not match:
-        return None
-    return int(match.group(1)), int(match.group(2))
+    ``new_line`` is True when a line-positioning operator (``BT``/``ET``,
+    ``Td``, ``TD``, ``T*``, ``Tm``, or the implicit ``T*`` of ``'``/``"``)
+    came between the previous text-showing operation and this one.
+    """
 
+    operator: bytes
+    text: str
+    new_line: bool
+
+
+_REGULAR = rb"[^\s\[\]()<>/%{}]"
+_LITERAL_BODY = rb"[^\\()]*+(?:\\[\s\S][^\\()]*+)*+"  # no nested parentheses
+_HEX_BODY = rb"[0-9A-Fa-f\s]*+"
+# Tokens that matter inside a text object (``BT`` ... ``ET``).  The leading
+# look-ahead lets the regex engine skip numbers and all other operators in C.
+# Operators must follow a delimiter, so a name such as ``/TT0`` never matches.
+# A string or an array of plain strings is taken together with a directly
+# following ``Tj``/``TJ``; anything else is handled token by token.
+_CONTENT_TOKEN_RE = re.compile(
+    rb"(?=[(<\[\]%TBE'\"])(?:"
+    rb"\((?P<literal>" + _LITERAL_BODY + rb")\)(?:\s*+(?P<literal_show>Tj)(?!" + _REGULAR + rb"))?"
+    rb"|(?P<nested>\()"  # literal with nested parentheses, or unterminated
+    rb"|<(?P<hex>" + _HEX_BODY + rb")>"
+    rb"|\[(?P<array>[^\[\]()<>%]*+(?:(?:\(" + _LITERAL_BODY + rb"\)|<" + _HEX_BODY + rb">)[^\[\]()<>%]*+)*+)\]"
+    rb"(?:\s*+(?P<array_show>TJ)(?!" + _REGULAR + rb"))?"
+    rb"|(?P<open>\[)|(?P<close>\])"
+    rb"|%[^\r\n]*+"
+    rb"|(?<!" + _REGULAR + rb")"
+    rb"(?:(?P<show>T[Jj]|['\"])|(?P<move>T[dDm*]|BT)|(?P<end>ET)|(?P<inline>BI))"
+    rb"(?!" + _REGULAR + rb")"
+    rb")"
+)
+_ARRAY_STRING_RE = re.compile(rb"\((" + _LITERAL_BODY + rb")\)|<(" + _HEX_BODY + rb")>")
+_ARRAY_LITERAL_RE = re.compile(rb"\(([^\\()]*)\)")
+# The delimiter check comes after the literal so the engine can scan for it fast.
+_OBJECT_START_RE = re.compile(rb"B[TI](?<!" + _REGULAR + rb"..)(?!" + _REGULAR + rb")")
+_INLINE_IMAGE_END_RE = re.compile(rb"EI(?<!" + _REGULAR + rb"..)(?!" + _REGULAR + rb")")
+
+
+def _decode_array(body: bytes) -> str:
+    if b"<" not in body and b"\\" not in body:
+        # Plain literals only: one join and one decode for the whole array.
+        return b"".join(_ARRAY_LITERAL_RE.findall(body)).decode("latin1")
+    return "".join(
+        decode_pdf_literal(literal) if not hex_digits else _decode_hex_string(hex_digits)
+        for literal, hex_digits in _ARRAY_STRING_RE.findall(body)
+    )
 
-def _extract_refs_from_kids(obj_body: bytes) -> list[tuple[int, int]]:
-    match = re.search(rb"/Kids\s*\[(.*?)\]", obj_body, re.S)
-    if not match:
-        return []
-    return [(int(a), int(b)) for a, b in re.findall(rb"(\d+)\s+(\d+)\s+R", match.group(1))]
 
+def _next_text_object(raw: bytes, pos: int) -> int:
+    """Offset just past the next ``BT`` operator at or after *pos*, or -1.
 
-def _extract_count(obj_body: bytes) -> int:
-    match = re.search(rb"/Count\s+(\d+)", obj_body)
-    if not match:
-        return 0
-    return int(match.group(1))
+    Inline images on the way are skipped, their binary data may hold ``BT``.
+    """
+    while True:
+        match = _OBJECT_START_RE.search(raw, pos)
+        if not match:
+            return -1
+        pos = match.end()
+        if match.group() == b"BT":
+            return pos
+        end = _INLINE_IMAGE_END_RE.search(raw, pos)
+        if not end:
+            return -1
+        pos = end.end()
+
+
+def iter_text_shows(raw: bytes) -> Iterator[TextShow]:
+    """Tokenize a content stream once, yielding its text-showing operations.
+
+    Text can only be shown inside a text object, so the stretches between
+    ``ET`` and the next ``BT`` are skipped with a single search.  The most
+    recent string (or array of strings) is the operand of the next
+    text-showing operator; ``TJ`` kerning numbers are ignored.
+    """
+    operand: str | None = None
+    array: list[str] | None = None
+    new_line = True
+    pos = _next_text_object(raw, 0)
+    while pos >= 0:
+        match = _CONTENT_TOKEN_RE.search(raw, pos)
+        if not match:
+            return
+        pos = match.end()
+        kind = match.lastgroup
+        if kind == "array_show" or kind == "literal_show":
+            # The operand and its operator in one token: the common case.
+            if kind == "array_show":
+                text = _decode_array(match.group("array"))
+            else:
+                text = decode_pdf_literal(match.group("literal"))
+            yield TextShow(match.group(kind), text, new_line)
+            new_line = False
+            operand = array = None
+            continue
+        if kind == "move":
+            new_line = True
+            operand = array = None
+            continue
+        if kind == "show":
+            operator = match.group("show")
+            if operator in (b"'", b'"'):
+                new_line = True
+            if operand is not None:
+                yield TextShow(operator, operand, new_line)
+                new_line = False
+            operand = array = None
+            continue
+        if kind == "array":
+            operand = _decode_array(match.group("array"))
+            continue
+        if kind == "open":
+            array = []
+            continue
+        if kind == "close":
+            if array is not None:
+                operand = "".join(array)
+                array = None
+            continue
+        if kind == "end":
+            new_line = True
+            operand = array = None
+            pos = _next_text_object(raw, pos)
+            continue
+        if kind == "inline":
+            end = _INLINE_IMAGE_END_RE.search(raw, pos)
+            pos = end.end() if end else len(raw)
+            operand = array = None
+            continue
+        if kind is None:  # comment
+            continue
 
+        if kind == "literal":
+            text = decode_pdf_literal(match.group("literal"))
+        elif kind == "hex":
+            text = _decode_hex_string(match.group("hex"))
+        else:  # nested
+            try:
+                pos = literal_end(raw, match.start())
+            except ValueError:
+                return
+            text = decode_pdf_literal(raw[match.end() : pos - 1])
+        if array is not None:
+            array.append(text)
+        else:
+            operand = text
 
-def _is_pages_node(obj: PdfObject) -> bool:
-    return b"/Type /Pages" in obj.body or b"/Type/Pages" in obj.body
 
+def extract_text_from_stream(raw: bytes) -> list[str]:
+    """Return the text lines of a content stream.
 
-def _is_page_node(obj: PdfObject) -> bool:
-    return (
-        (b"/Type /Page" in obj.body or b"/Type/Page" in obj.body)
-        and b"/Type /Pages" not in obj.body
-        and b"/Type/Pages" not in obj.body
-    )
+    Consecutive text-showing operations are joined into one line until a
+    line-positioning operator starts the next one.
+    """
+    if not raw:
+        return []
+    lines: list[str] = []
+    for show in iter_text_shows(raw):
+        if show.new_line or not lines:
+            lines.append(show.text)
+        else:
+            lines[-1] += show.text
+    return normalize_text_lines("\n".join(lines))
 
 
 def build_page_tree(
-    objects: dict[tuple[int, int], PdfObject], root_pages_ref: tuple[int, int]
+    objects: Mapping[tuple[int, int], PdfObject], root_pages_ref: tuple[int, int]
 ) -> tuple[list[dict], dict[tuple[int, int], dict], list[tuple[int, int]]]:
     pages_order: list[dict] = []
     tree_info: dict[tuple[int, int], dict] = {}
 
     def walk_pages_node(ref: tuple[int, int], ancestors: list[tuple[int, int]]) -> int:
         obj = objects[ref]
-        kids = _extract_refs_from_kids(obj.body)
+        kids = extract_refs_from_kids(obj.body)
         child_refs: list[tuple[int, int]] = []
         total = 0
         for kid in kids:
             kid_obj = objects.get(kid)
             if kid_obj is None:
                 continue
-            if _is_pages_node(kid_obj):
+            if is_pages_node(kid_obj):
                 count = walk_pages_node(kid, ancestors + [ref])
                 if count > 0:
                     child_refs.append(kid)
                 total += count
-            elif _is_page_node(kid_obj):
-                contents_ref = _extract_ref(kid_obj.body, rb"/Contents")
+            elif is_page_node(kid_obj):
+                contents_ref = extract_ref(kid_obj.body, rb"/Contents")
                 contents_refs: list[tuple[int, int]] = []
                 if contents_ref is not None:
                     contents_refs = [contents_ref]
@@ -379,10 +398,13 @@ def build_page_tree(
     return pages_order, tree_info, [root_pages_ref]
 
 
-def extract_page_lines(objects: dict[tuple[int, int], PdfObject], page_info: dict) -> list[str]:
+def extract_page_lines(objects: Mapping[tuple[int, int], PdfObject], page_info: dict) -> list[str]:
+    return _lines_from_contents(objects.get(ref) for ref in page_info["contents"])
+
+
+def _lines_from_contents(contents: Iterable[PdfObject | None]) -> list[str]:
     lines: list[str] = []
-    for ref in page_info["contents"]:
-        obj = objects.get(ref)
+    for obj in contents:
         if not obj:
             continue
         raw = extract_stream_bytes(obj)
@@ -391,6 +413,136 @@ def extract_page_lines(objects: dict[tuple[int, int], PdfObject], page_info: dic
     return normalize_text_lines("\n".join(lines))
 
 
+# ---------------------------------------------------------------------------
+# Parallel text extraction
+# ---------------------------------------------------------------------------
+
+# A content stream as ``(number, generation, start, end)`` offsets into the
+# input file.  Workers map the file themselves, so only these small tuples
+# cross the process boundary – never the stream bytes.
+ContentSpan = tuple[int, int, int, int]
+
+# Pages sent to a worker per round trip: enough to amortise the IPC, small
+# enough that a 500-page deck still spreads evenly over the pool.
+_PAGES_PER_TASK = 8
+
+# Per-worker-process map of the file currently being processed.
+_worker_file: tuple[str, mmap.mmap] | None = None
+
+
+def _worker_buffer(path: str) -> mmap.mmap:
+    global _worker_file
+    if _worker_file is None or _worker_file[0] != path:
+        if _worker_file is not None:
+            _worker_file[1].close()
+        with open(path, "rb") as fh:
+            _worker_file = (path, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ))
+    return _worker_file[1]
+
+
+def _worker_page_lines(path: str, spans: list[ContentSpan]) -> list[str]:
+    data = _worker_buffer(path)
+    return _lines_from_contents(
+        PdfObject(number, generation, data, start, end)
+        for number, generation, start, end in spans
+    )
+
+
+def _content_spans(
+    objects: Mapping[tuple[int, int], PdfObject], page_info: dict, source: Buffer
+) -> list[ContentSpan] | None:
+    """Offsets of the page's content streams, or None if one is not file-backed."""
+    spans: list[ContentSpan] = []
+    for ref in page_info["contents"]:
+        obj = objects.get(ref)
+        if not obj:
+            continue
+        if obj.source is not source:
+            return None
+        spans.append((obj.number, obj.generation, obj.start, obj.end))
+    return spans
+
+
+def collect_page_lines(
+    objects: Mapping[tuple[int, int], PdfObject],
+    pages_order: list[dict],
+    source: Buffer,
+    input_path: str,
+    pool: Executor | None = None,
+) -> list[list[str]]:
+    """Extract the text lines of every page, in page order.
+
+    With a *pool*, pages are decoded by its worker processes.  The page tree
+    and the content stream offsets are still resolved here; each task carries
+    only the input path and the offsets of one page's content streams.
+    """
+    if pool is None:
+        return [extract_page_lines(objects, page_info) for page_info in pages_order]
+
+    page_lines: list[list[str] | None] = [None] * len(pages_order)
+    indices: list[int] = []
+    tasks: list[list[ContentSpan]] = []
+    for i, page_info in enumerate(pages_order):
+        spans = _content_spans(objects, page_info, source)
+        if spans is None:
+            page_lines[i] = extract_page_lines(objects, page_info)
+        elif not spans:
+            page_lines[i] = []
+        else:
+            indices.append(i)
+            tasks.append(spans)
+
+    # ``map`` yields results in submission order, so pages stay in order.
+    results = pool.map(
+        _worker_page_lines, [input_path] * len(tasks), tasks, chunksize=_PAGES_PER_TASK
+    )
+    for i, lines in zip(indices, results):
+        page_lines[i] = lines
+    return page_lines  # type: ignore[return-value]
+
+
+def _page_stream_digest(objects: Mapping[tuple[int, int], PdfObject], page_info: dict) -> str:
+    """Digest of a page's (still encoded) content streams."""
+    sha = hashlib.sha1()
+    for ref in page_info["contents"]:
+        obj = objects.get(ref)
+        if obj:
+            sha.update(obj.dict_part)
+            sha.update(raw_stream(obj) or b"")
+        sha.update(b"\0")
+    return sha.hexdigest()
+
+
+def _collect_page_lines_cached(
+    objects: Mapping[tuple[int, int], PdfObject],
+    pages_order: list[dict],
+    source: Buffer,
+    input_path: str,
+    pool: Executor | None,
+    cache: PageCache,
+) -> list[list[str]]:
+    """``collect_page_lines`` that reuses and refreshes the page-text cache.
+
+    Pages whose content streams are unchanged since the cached version of the
+    same path are not extracted again.
+    """
+    digests = [_page_stream_digest(objects, page_info) for page_info in pages_order]
+    known: dict[str, list[str]] = {}
+    previous = cache.get_previous(input_path, CACHE_NAMESPACE)
+    if previous is not None and previous.page_lines and previous.stream_digests:
+        known = dict(zip(previous.stream_digests, previous.page_lines))
+
+    missing = [i for i, digest in enumerate(digests) if digest not in known]
+    fresh = collect_page_lines(
+        objects, [pages_order[i] for i in missing], source, input_path, pool
+    )
+    page_lines = [known.get(digest, []) for digest in digests]
+    for i, lines in zip(missing, fresh):
+        page_lines[i] = lines
+    cache.put(input_path, CACHE_NAMESPACE, len(pages_order), page_lines, digests)
+    return page_lines
+
+
 def detect_pages_to_delete(page_lines: list[list[str]]) -> list[int]:
     to_delete: list[int] = []
     for i in range(len(page_lines) - 1):
@@ -416,7 +568,7 @@ def _next_page_has_more_content(current_lines: list[str], next_lines: list[str])
 
 def _replace_count_and_kids(obj_body: bytes, count: int, kids: list[tuple[int, int]]) -> bytes:
     updated = re.sub(rb"/Count\s+\d+", f"/Count {count}".encode("ascii"), obj_body, count=1)
-    kids_text = " ".join(_ref_text(ref) for ref in kids)
+    kids_text = " ".join(ref_text(ref) for ref in kids)
     if re.search(rb"/Kids\s*\[.*?\]", updated, re.S):
         updated = re.sub(rb"/Kids\s*\[.*?\]", f"/Kids [{kids_text}]".encode("ascii"), updated, count=1)
     return updated
@@ -455,7 +607,7 @@ def _format_obj_bytes(ref: tuple[int, int], body: bytes) -> bytes:
     return f"{ref[0]} {ref[1]} obj\n".encode("ascii") + body.strip(b"\r\n") + b"\nendobj\n"
 
 
-def _parse_trailer(data: bytes) -> tuple[int, bytes, bytes]:
+def _parse_trailer(data: Buffer) -> tuple[int, bytes, bytes]:
     startxref_matches = list(re.finditer(rb"startxref\s+(\d+)\s*%%EOF", data, re.S))
     if not startxref_matches:
         raise ValueError("Could not locate startxref")
@@ -469,76 +621,192 @@ def _parse_trailer(data: bytes) -> tuple[int, bytes, bytes]:
     return prev_xref, trailer_body, data[startxref_match.start() :]
 
 
+def _scanned_trailer(
+    original: Buffer, objects: Mapping[tuple[int, int], PdfObject]
+) -> tuple[int, bytes, bool]:
+    """Find the newest trailer in a regex-scanned file: a classic ``trailer``
+    dictionary, or else the last cross-reference stream's dictionary."""
+    try:
+        prev_xref, trailer_body, _ = _parse_trailer(original)
+        return prev_xref, trailer_body, False
+    except ValueError:
+        xref_streams = [
+            obj
+            for obj in objects.values()
+            if obj.source is original and re.search(rb"/Type\s*/XRef\b", obj.dict_part)
+        ]
+        if not xref_streams:
+            raise
+        newest = max(xref_streams, key=lambda obj: obj.start)
+        return newest.start, newest.dict_part, True
+
+
+def _trailer_passthrough(trailer_body: bytes) -> list[str]:
+    """Trailer entries that must survive into the update's trailer."""
+    parts: list[str] = []
+    for key in (rb"/Info", rb"/Encrypt"):
+        ref = extract_ref(trailer_body, key)
+        if ref is not None:
+            parts.append(f"{key.decode('ascii')} {ref_text(ref)}")
+    id_match = re.search(rb"/ID\s*(\[[^\]]*\])", trailer_body)
+    if id_match:
+        parts.append("/ID " + id_match.group(1).decode("latin1"))
+    return parts
+
+
+def _xref_stream_section(
+    stream_number: int, entries: list[tuple[int, int, int]], dict_entries: list[str]
+) -> bytes:
+    """Build a cross-reference stream object for ``(number, generation, offset)`` entries."""
+    entries = sorted(entries)
+    offset_width = max(1, (max(offset for _, _, offset in entries).bit_length() + 7) // 8)
+    rows = b"".join(
+        b"\x01" + offset.to_bytes(offset_width, "big") + generation.to_bytes(2, "big")
+        for _, generation, offset in entries
+    )
+    payload = zlib.compress(rows)
+    index = " ".join(f"{number} 1" for number, _, _ in entries)
+    header = (
+        f"{stream_number} 0 obj\n<</Type /XRef /W [1 {offset_width} 2] /Index [{index}]"
+        f" {' '.join(dict_entries)} /Filter /FlateDecode /Length {len(payload)}>>\nstream\n"
+    )
+    return header.encode("latin1") + payload + b"\nendstream\nendobj\n"
+
+
 def _build_incremental_update(
-    original: bytes,
-    objects: dict[tuple[int, int], PdfObject],
+    original: Buffer,
+    objects: Mapping[tuple[int, int], PdfObject],
     catalog_ref: tuple[int, int],
     updated_nodes: dict[tuple[int, int], bytes],
 ) -> bytes:
+    """Return the incremental-update section to append after *original*.
+
+    Only the new objects, xref section and trailer are built in memory; the
+    caller copies the original bytes to the output separately.
+    """
     if not updated_nodes:
-        return original
+        return b""
 
-    prev_xref, trailer_body, _ = _parse_trailer(original)
+    if isinstance(objects, XrefObjects):
+        prev_xref, trailer_body = objects.startxref, objects.trailer
+        use_xref_stream = objects.xref_is_stream
+    else:
+        prev_xref, trailer_body, use_xref_stream = _scanned_trailer(original, objects)
     trailer_text = trailer_body.decode("latin1", errors="replace")
     size_match = re.search(r"/Size\s+(\d+)", trailer_text)
     size = int(size_match.group(1)) if size_match else (max(num for num, _ in objects) + 1)
 
     patch = bytearray()
-    offsets: list[tuple[int, int]] = []
+    offsets: list[tuple[int, int, int]] = []
     for ref, body in sorted(updated_nodes.items()):
-        offsets.append((ref[0], len(original) + len(patch)))
+        offsets.append((ref[0], ref[1], len(original) + len(patch)))
         patch.extend(_format_obj_bytes(ref, body))
 
     xref_offset = len(original) + len(patch)
+    trailer_parts = [f"/Root {ref_text(catalog_ref)}"] + _trailer_passthrough(trailer_body)
+    trailer_parts.append(f"/Prev {prev_xref}")
+
+    if use_xref_stream:
+        # A file indexed by cross-reference streams gets a stream section too;
+        # the stream takes the next free object number and indexes itself.
+        offsets.append((size, 0, xref_offset))
+        xref = _xref_stream_section(size, offsets, [f"/Size {size + 1}"] + trailer_parts)
+        tail = f"startxref\n{xref_offset}\n%%EOF\n".encode("latin1")
+        return bytes(patch) + xref + tail
+
     xref = bytearray()
     xref.extend(b"xref\n")
-    for obj_num, offset in offsets:
-        xref.extend(f"{obj_num} 1\n{offset:010d} 00000 n \n".encode("ascii"))
+    for obj_num, generation, offset in offsets:
+        xref.extend(f"{obj_num} 1\n{offset:010d} {generation:05d} n \n".encode("ascii"))
 
-    trailer_parts = [f"/Size {size}", f"/Root {_ref_text(catalog_ref)}"]
-    trailer_parts.append(f"/Prev {prev_xref}")
+    trailer_parts.insert(0, f"/Size {size}")
     trailer = f"trailer\n<<{' '.join(trailer_parts)}>>\nstartxref\n{xref_offset}\n%%EOF\n".encode("latin1")
-    return original + patch + xref + trailer
+    return bytes(patch + xref) + trailer
 
 
-def slim_pdf(input_path: str, output_path: str, texts: dict[str, str]) -> None:
+def slim_pdf(
+    input_path: str,
+    output_path: str,
+    texts: dict[str, str],
+    pool: Executor | None = None,
+    cache: PageCache | None = None,
+) -> None:
     with open(input_path, "rb") as fh:
-        original = fh.read()
+        if os.fstat(fh.fileno()).st_size == 0:
+            raise ValueError("Empty file")
+        # The map is paged in on demand; only the xref data, the page tree and
+        # each content stream (while its text is extracted) are ever touched.
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as original:
+            pages_count, removed_count, update = _analyze_and_patch(
+                original, input_path, texts, pool, cache
+            )
+
+    if update is None:
+        shutil.copyfile(input_path, output_path)
+        return
+
+    # Stream the untouched original, then append the incremental update.
+    shutil.copyfile(input_path, output_path)
+    with open(output_path, "ab") as fh:
+        fh.write(update)
 
-    objects = parse_objects(original)
-    catalog_ref = _find_catalog(objects)
-    root_pages_ref = _extract_ref(objects[catalog_ref].body, rb"/Pages")
+    print(
+        texts["process_success"].format(
+            original=pages_count,
+            final=pages_count - removed_count,
+            output_path=os.path.basename(output_path),
+        )
+    )
+
+
+def _analyze_and_patch(
+    original: Buffer,
+    input_path: str,
+    texts: dict[str, str],
+    pool: Executor | None = None,
+    cache: PageCache | None = None,
+) -> tuple[int, int, bytes | None]:
+    """Return ``(page count, removed pages, update bytes or None when unchanged)``."""
+    # A cache hit that needs no update skips parsing altogether.
+    cached = cache.get(input_path, CACHE_NAMESPACE) if cache is not None else None
+    if cached is not None:
+        if cached.page_count <= 1:
+            print(texts["single_page"])
+            return cached.page_count, 0, None
+        if cached.page_lines is not None and not detect_pages_to_delete(cached.page_lines):
+            print(texts["no_redundancy"])
+            return cached.page_count, 0, None
+
+    objects, catalog_ref = load_objects(original)
+    root_pages_ref = extract_ref(objects[catalog_ref].body, rb"/Pages")
     if root_pages_ref is None:
         raise ValueError("Root pages tree not found")
 
     pages_order, tree_info, _ = build_page_tree(objects, root_pages_ref)
     if len(pages_order) <= 1:
+        if cache is not None:
+            cache.put(input_path, CACHE_NAMESPACE, len(pages_order))
         print(texts["single_page"])
-        shutil.copyfile(input_path, output_path)
-        return
+        return len(pages_order), 0, None
 
-    page_lines = [extract_page_lines(objects, page_info) for page_info in pages_order]
+    if cached is not None and cached.page_lines is not None and len(cached.page_lines) == len(pages_order):
+        page_lines = cached.page_lines
+    elif cache is not None:
+        page_lines = _collect_page_lines_cached(
+            objects, pages_order, original, input_path, pool, cache
+        )
+    else:
+        page_lines = collect_page_lines(objects, pages_order, original, input_path, pool)
     pages_to_delete = detect_pages_to_delete(page_lines)
     removed_refs = {pages_order[i]["ref"] for i in pages_to_delete}
 
     if not removed_refs:
         print(texts["no_redundancy"])
-        shutil.copyfile(input_path, output_path)
-        return
+        return len(pages_order), 0, None
 
     updated_nodes = _collect_updated_nodes(root_pages_ref, tree_info, removed_refs)
-    slimmed = _build_incremental_update(original, objects, catalog_ref, updated_nodes)
-    with open(output_path, "wb") as fh:
-        fh.write(slimmed)
-
-    final_pages = len(pages_order) - len(removed_refs)
-    print(
-        texts["process_success"].format(
-            original=len(pages_order),
-            final=final_pages,
-            output_path=os.path.basename(output_path),
-        )
-    )
+    update = _build_incremental_update(original, objects, catalog_ref, updated_nodes)
+    return len(pages_order), len(removed_refs), update
 
 
 def main() -> int:
@@ -546,6 +814,18 @@ def main() -> int:
     parser.add_argument("files", nargs="*", help="Paths to PDF files.")
     parser.add_argument("--lang", type=str, default="en", choices=["zh", "en"], help=argparse.SUPPRESS)  # GUI-only
     parser.add_argument("--gui-mode", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used for page text extraction (1 = serial, 0 = all CPU cores).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip files whose input is unchanged since the last run.",
+    )
+    add_shard_argument(parser)
     args = parser.parse_args()
 
     texts = SCRIPT_TEXTS.get(args.lang, SCRIPT_TEXTS["en"])
@@ -555,8 +835,40 @@ def main() -> int:
         print(texts["no_files"])
         return 1
 
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    cache = open_page_cache()
+    manifest = OutputManifest("pdf-slimmer-standalone", __file__) if args.incremental else None
+    try:
+        _process_files(select_shard(args.files, args.shard), texts, pool, cache, manifest)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if cache is not None:
+            cache.close()
+        if manifest is not None:
+            manifest.save()
+
+    if manifest is not None:
+        print(
+            texts["incremental_summary"].format(
+                skipped=manifest.skipped, total=manifest.checked
+            )
+        )
+
+    print(texts["all_done"])
+    return 0
+
+
+def _process_files(
+    files: list[str],
+    texts: dict[str, str],
+    pool: Executor | None,
+    cache: PageCache | None,
+    manifest: OutputManifest | None = None,
+) -> None:
     print(texts["start_processing"])
-    for file_path in args.files:
+    for file_path in files:
         if not os.path.exists(file_path):
             print(texts["missing_file"].format(path=file_path))
             continue
@@ -570,15 +882,17 @@ def main() -> int:
             directory, filename = os.path.split(file_path)
             stem, _ = os.path.splitext(filename)
             output_path = os.path.join(directory, f"{stem}_slimmer.pdf")
+            if manifest is not None and manifest.is_up_to_date(output_path, [file_path], {}):
+                print(texts["skip_unchanged"])
+                continue
 
             print(texts["analyzing"])
-            slim_pdf(file_path, output_path, texts)
-        except (OSError, ValueError, zlib.error) as exc:
+            slim_pdf(file_path, output_path, texts, pool, cache)
+            if manifest is not None:
+                manifest.record(output_path, [file_path], {})
+        except Exception as exc:  # one unreadable PDF must not abort the batch
             print(texts["process_fail"].format(error=f"{type(exc).__name__}: {exc}"))
 
-    print(texts["all_done"])
-    return 0
-
 
 if __name__ == "__main__":
     sys.exit(main())
@@ -22,7 +22,7 @@
   4. 处理完成后，会在原文件相同目录下生成一个带有 "_slimmer" 后缀的新文件。
 ---
 可选参数:
-本脚本暂无任何可视化或手动可选参数。
+  --incremental: 跳过自上次运行以来输入未变化、且输出仍完好的文件（记录在 .toolkit_manifest.json 中）。
 ---
 更新日志:
   - v2.1 (2025-10-20): 最终稳定版。根据用户最终反馈，固化了最成功的v1.5/v1.6双重模糊匹配算法。并新增对.pptx文件的原生支持，使其成为一个真正的PPT/PDF瘦身器。
@@ -47,7 +47,7 @@ Usage:
   4. After processing, a new file with a "_slimmer" suffix will be created in the same directory as the original file.
 ---
 Optional Parameters:
-This script currently has no visual or manual optional parameters.
+  --incremental: Skip files whose input is unchanged and whose output is intact since the last run (recorded in .toolkit_manifest.json).
 ---
 Changelog:
   - v2.1 (2025-10-20): Final stable version. Based on final user feedback, the most successful v1.5/v1.6 dual fuzzy matching algorithm is now solidified. Added native support for .pptx files, making it a true PPT/PDF slimmer.
@@ -61,7 +61,10 @@ import os
 import re
 import subprocess
 import argparse
-from difflib import SequenceMatcher
+
+from _shared.containment import ContainmentIndex
+from _shared.manifest import OutputManifest
+from _shared.page_cache import open_page_cache, pymupdf_page_texts
 
 # --- 文本字典 (用于国际化) / Text Dictionary (for i18n) ---
 SCRIPT_TEXTS = {
@@ -82,9 +85,15 @@ SCRIPT_TEXTS = {
         'no_redundancy': "   - 未发现可移除的冗余页面/幻灯片。",
         'process_success': "   => 成功! 原始数量: {original}, 瘦身后: {final}。已保存至: {output_path}",
         'process_fail': "   - 处理失败: {error}",
+        'skip_unchanged': "   - 跳过: 输入未变化，输出已是最新。",
+        'incremental_summary': "\n增量模式: 跳过了 {skipped}/{total} 个未变化的文件。",
         'all_done': "\n--- 所有任务已完成。 ---"
     },
-    'en': { 'init': "--- PPT/PDF Slimmer v2.1 Initialized ---", }
+    'en': {
+        'init': "--- PPT/PDF Slimmer v2.1 Initialized ---",
+        'skip_unchanged': "   - Skipped: input unchanged, output is up to date.",
+        'incremental_summary': "\nIncremental: skipped {skipped} of {total} unchanged files.",
+    }
 }
 SCRIPT_TEXTS['en'] = {**SCRIPT_TEXTS['zh'], **SCRIPT_TEXTS['en']} # Merge dicts
 
@@ -114,28 +123,22 @@ def normalize_text_lines(text):
     return [line for line in normalized_lines if line]
 
 def is_line_contained_fuzzy(line_a, lines_b, sim_threshold=0.9):
-    for line_b in lines_b:
-        if SequenceMatcher(None, line_a, line_b).ratio() >= sim_threshold:
-            return True
-        if len(line_b) > len(line_a) and line_b.startswith(line_a):
-            return True
-    return False
+    return ContainmentIndex(lines_b, sim_threshold).contains(line_a)
 
 def is_subset_fuzzy(lines_a, lines_b):
-    if not lines_a: return True
-    if not lines_b: return False
-    return all(is_line_contained_fuzzy(line_a, lines_b) for line_a in lines_a)
+    return ContainmentIndex(lines_b).contains_all(lines_a)
 
-def slim_pdf(input_path, output_path, fitz, texts):
-    doc = fitz.open(input_path)
-    if doc.page_count <= 1:
+def slim_pdf(input_path, output_path, fitz, texts, cache=None):
+    # Page texts come from the shared page-text cache on a re-run.
+    page_texts = pymupdf_page_texts(fitz, input_path, cache)
+    if len(page_texts) <= 1:
         print(texts['single_page'])
-        return
+        return False
     
-    page_contents = [normalize_text_lines(page.get_text("text")) for page in doc]
+    page_contents = [normalize_text_lines(text) for text in page_texts]
     
     pages_to_delete = []
-    for i in range(doc.page_count - 1):
+    for i in range(len(page_contents) - 1):
         current_lines = page_contents[i]
         next_lines = page_contents[i+1]
         if current_lines:
@@ -146,9 +149,9 @@ def slim_pdf(input_path, output_path, fitz, texts):
 
     if not pages_to_delete:
         print(texts['no_redundancy'])
-        doc.close()
-        return
+        return False
 
+    doc = fitz.open(input_path)
     final_pages_to_keep = [p for p in range(doc.page_count) if p not in pages_to_delete]
     new_doc = fitz.open()
     for page_num in final_pages_to_keep:
@@ -157,12 +160,13 @@ def slim_pdf(input_path, output_path, fitz, texts):
     new_doc.close()
     doc.close()
     print(texts['process_success'].format(original=len(page_contents), final=len(final_pages_to_keep), output_path=os.path.basename(output_path)))
+    return True
 
 def slim_pptx(input_path, output_path, pptx, texts):
     prs = pptx.Presentation(input_path)
     if len(prs.slides) <= 1:
         print(texts['single_page'])
-        return
+        return False
 
     slide_contents = []
     for slide in prs.slides:
@@ -181,7 +185,7 @@ def slim_pptx(input_path, output_path, pptx, texts):
 
     if not slides_to_delete_indices:
         print(texts['no_redundancy'])
-        return
+        return False
 
     # 从后往前删除幻灯片以避免索引错误
     for index in sorted(slides_to_delete_indices, reverse=True):
@@ -191,6 +195,7 @@ def slim_pptx(input_path, output_path, pptx, texts):
 
     prs.save(output_path)
     print(texts['process_success'].format(original=len(slide_contents), final=len(prs.slides), output_path=os.path.basename(output_path)))
+    return True
 
 def main():
     parser = argparse.ArgumentParser(description="Slims PPTX/PDF files.")
@@ -198,6 +203,7 @@ def main():
     parser.add_argument('--lang', type=str, default='en', choices=['zh', 'en'], help=argparse.SUPPRESS)
     parser.add_argument('--gui-mode', action='store_true', help=argparse.SUPPRESS)
     parser.add_argument('-r', '--recursive', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--incremental', action='store_true', help="Skip files whose input is unchanged since the last run.")
     args = parser.parse_args()
     
     main.lang = args.lang
@@ -216,6 +222,8 @@ def main():
         print(texts['no_files'])
         sys.exit(1)
 
+    cache = open_page_cache()
+    manifest = OutputManifest('slim-ppt-pdf', __file__) if args.incremental else None
     print(texts['start_processing'])
     for file_path in args.files:
         if not os.path.exists(file_path): continue
@@ -226,17 +234,30 @@ def main():
             directory, filename = os.path.split(file_path)
             name, ext = os.path.splitext(filename)
             output_filepath = os.path.join(directory, f"{name}_slimmer{ext}")
+            if not file_path.lower().endswith(('.pdf', '.pptx')):
+                print(texts['skip_unsupported'])
+                continue
+            if manifest and manifest.is_up_to_date(output_filepath, [file_path], {}):
+                print(texts['skip_unchanged'])
+                continue
             
             print(texts['is_processing'])
             if file_path.lower().endswith('.pdf'):
-                slim_pdf(file_path, output_filepath, fitz, texts)
-            elif file_path.lower().endswith('.pptx'):
-                slim_pptx(file_path, output_filepath, pptx, texts)
+                written = slim_pdf(file_path, output_filepath, fitz, texts, cache)
             else:
-                print(texts['skip_unsupported'])
+                written = slim_pptx(file_path, output_filepath, pptx, texts)
+            # Nothing is written when no page is redundant; that result is
+            # just as reusable.
+            if manifest:
+                manifest.record(output_filepath, [file_path], {}, [output_filepath] if written else [])
         except Exception as e:
             print(texts['process_fail'].format(error=e))
 
+    if cache:
+        cache.close()
+    if manifest:
+        manifest.save()
+        print(texts['incremental_summary'].format(skipped=manifest.skipped, total=manifest.checked))
     print(texts['all_done'])
 
 if __name__ == '__main__':
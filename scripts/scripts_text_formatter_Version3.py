@@ -1,6 +1,7 @@
 """
 [display-name-zh] 通用文本格式化器
 [display-name-en] Universal Text Formatter
+[parallel-shards]
 
 功能:
   这是一个强大的文本批量处理工具，提供了多种格式化选项，并能智能处理文件和文件夹。
@@ -13,6 +14,7 @@
     - 多文件 (跨目录): 在程序主目录创建 "格式化文本_Formatted_Text" 文件夹。
   - Tab转空格: 可将所有制表符 (Tab) 转换成指定数量的空格。
   - 行首/行尾加空格: 可在每行开头或结尾添加空格，用于Markdown换行或代码缩进。
+  - 增量模式: 勾选后跳过输入和参数自上次运行以来均未变化的文件 (记录在输出目录的 .toolkit_manifest.json 中)。
 ~~~
 Function:
   A powerful tool for batch text processing, offering various formatting options and smart handling of files and folders.
@@ -25,6 +27,7 @@ Core Features:
     - Multiple Files (Cross-Dir): Creates a "Formatted_Text" folder in the main program directory.
   - Tabs to Spaces: Can convert all Tab characters into a specified number of spaces.
   - Add Spaces to Lines: Can add spaces to the beginning or end of each line, useful for Markdown line breaks or code indentation.
+  - Incremental Mode: When checked, skips files whose input and parameters are unchanged since the last run (recorded in .toolkit_manifest.json in the output folder).
 """
 
 import sys
@@ -33,6 +36,9 @@ import argparse
 import subprocess
 from pathlib import Path
 
+from _shared.manifest import MANIFEST_NAME, OutputManifest
+from _shared.shards import add_shard_argument, select_shard
+
 def process_text(input_text, add_spaces_pos=None, add_spaces_num=0, tab_size=None):
     """
     Processes text with multiple formatting options.
@@ -67,9 +73,9 @@ def find_all_text_files(paths):
             # 如果是文件，直接添加
             files_to_process.add(p)
         elif p.is_dir():
-            # 如果是文件夹，递归搜索所有文本文件
+            # 如果是文件夹，递归搜索所有文本文件 (增量模式的清单文件除外)
             for ext in text_exts:
-                files_to_process.update(p.rglob(f'*{ext}'))
+                files_to_process.update(f for f in p.rglob(f'*{ext}') if f.name != MANIFEST_NAME)
     return [str(f) for f in sorted(list(files_to_process))]
 
 
@@ -100,6 +106,13 @@ def main():
         metavar='NUM',
         help="要添加的空格数量。\nNumber of spaces to add."
     )
+    # 增量模式: 跳过输入与参数均未变化的文件
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help="跳过输入和参数自上次运行以来均未变化的文件。\nSkip files whose input and parameters are unchanged since the last run."
+    )
+    add_shard_argument(parser)
     args = parser.parse_args()
 
     # --- 查找文件 ---
@@ -118,7 +131,21 @@ def main():
             output_base_dir = Path.cwd() / "格式化文本_Formatted_Text"
     
     if output_base_dir and not output_base_dir.exists():
-        output_base_dir.mkdir(parents=True)
+        output_base_dir.mkdir(parents=True, exist_ok=True)
+
+    # --- 并行分片: 输出目录已按全部文件确定，本分片只处理属于自己的文件 ---
+    files_to_process = select_shard(files_to_process, args.shard)
+    if not files_to_process:
+        print("\n处理完成！")
+        return
+
+    # --- 增量模式清单 ---
+    manifest = OutputManifest("text-formatter", __file__) if args.incremental else None
+    params = {
+        'tabs_to_spaces': args.tabs_to_spaces,
+        'add_spaces_pos': args.add_spaces_pos,
+        'add_spaces_num': args.add_spaces_num or 0,
+    }
 
     # --- 主处理循环 ---
     total_files = len(files_to_process)
@@ -137,6 +164,10 @@ def main():
                 # 单文件模式，使用 _formatted 后缀
                 output_path = p.parent / f"{p.stem}_formatted{p.suffix}"
 
+            if manifest and manifest.is_up_to_date(output_path, [p], params):
+                print(f"  ⏭️ 未变化，已跳过 (Unchanged, skipped): {output_path.name}")
+                continue
+
             with open(p, 'r', encoding='utf-8', errors='ignore') as f:
                 content = f.read()
             
@@ -149,6 +180,8 @@ def main():
             
             with open(output_path, 'w', encoding='utf-8') as f:
                 f.write(processed_content)
+            if manifest:
+                manifest.record(output_path, [p], params)
             
             if not output_base_dir:
                  print(f"  ✅ 已保存到: {output_path}")
@@ -156,6 +189,11 @@ def main():
         except Exception as e:
             print(f"  ❌ 处理文件 '{p.name}' 时出错: {e}")
 
+    if manifest:
+        manifest.save()
+        print(f"\n增量模式: 跳过了 {manifest.skipped}/{manifest.checked} 个未变化的文件。"
+              f"\nIncremental: skipped {manifest.skipped} of {manifest.checked} unchanged files.")
+
     if output_base_dir:
         print(f"\n所有文件处理完成！结果已统一保存到目录:\n{output_base_dir}")
     else:
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Scripts import their helpers as ``_shared.*``, as when run from scripts/.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
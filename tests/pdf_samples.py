@@ -0,0 +1,71 @@
+"""Hand-built PDF files for the parser tests (no third-party writer needed)."""
+
+from __future__ import annotations
+
+import zlib
+
+
+def object_stream_pdf(page_texts: list[str]) -> bytes:
+    """A PDF written the way compact writers do (e.g. PyMuPDF ``use_objstms``).
+
+    The catalog, the page tree and the pages sit in a FlateDecode ``/ObjStm``,
+    the cross-reference data is a FlateDecode xref stream, and no dictionary
+    has whitespace between a key and a following name (``/Filter/FlateDecode``).
+    """
+    count = len(page_texts)
+    catalog, pages = 1, 2
+    page_numbers = [3 + i for i in range(count)]
+    content_numbers = [3 + count + i for i in range(count)]
+    objstm_number = 3 + 2 * count
+    xref_number = objstm_number + 1
+
+    members = [
+        (catalog, f"<</Type/Catalog/Pages {pages} 0 R>>"),
+        (pages, "<</Type/Pages/Kids[{}]/Count {}>>".format(
+            " ".join(f"{n} 0 R" for n in page_numbers), count
+        )),
+    ]
+    for page, content in zip(page_numbers, content_numbers):
+        members.append((page, f"<</Type/Page/Parent {pages} 0 R/MediaBox[0 0 612 792]/Contents {content} 0 R>>"))
+
+    out = bytearray(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+    offsets: dict[int, int] = {}
+
+    def add_stream(number: int, dictionary: str, payload: bytes) -> None:
+        offsets[number] = len(out)
+        packed = zlib.compress(payload)
+        out.extend(f"{number} 0 obj\n<<{dictionary}/Filter/FlateDecode/Length {len(packed)}>>stream\n".encode())
+        out.extend(packed)
+        out.extend(b"\nendstream\nendobj\n")
+
+    for content, text in zip(content_numbers, page_texts):
+        add_stream(content, "", f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode())
+
+    bodies = []
+    header = []
+    position = 0
+    for number, body in members:
+        header.append(f"{number} {position}")
+        bodies.append(body)
+        position += len(body) + 1
+    header_bytes = (" ".join(header) + "\n").encode()
+    add_stream(
+        objstm_number,
+        f"/Type/ObjStm/N {len(members)}/First {len(header_bytes)}",
+        header_bytes + "\n".join(bodies).encode(),
+    )
+
+    rows = bytearray()
+    compressed = {number: index for index, (number, _) in enumerate(members)}
+    # The xref stream lists itself, at the offset it is about to be written to.
+    offsets[xref_number] = xref_offset = len(out)
+    for number in range(xref_number + 1):
+        if number == 0:
+            rows += bytes([0]) + (0).to_bytes(4, "big") + (0xFFFF).to_bytes(2, "big")
+        elif number in compressed:
+            rows += bytes([2]) + objstm_number.to_bytes(4, "big") + compressed[number].to_bytes(2, "big")
+        else:
+            rows += bytes([1]) + offsets[number].to_bytes(4, "big") + (0).to_bytes(2, "big")
+    add_stream(xref_number, f"/Type/XRef/Size {xref_number + 1}/W[1 4 2]/Root {catalog} 0 R", bytes(rows))
+    out.extend(f"startxref\n{xref_offset}\n%%EOF\n".encode())
+    return bytes(out)
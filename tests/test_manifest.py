@@ -0,0 +1,54 @@
+import sys
+import threading
+import time
+import types
+
+from _shared import manifest as manifest_module
+from _shared.manifest import OutputManifest, script_version
+
+
+def test_version_covers_imported_shared_modules(tmp_path, monkeypatch):
+    script = tmp_path / "tool.py"
+    script.write_text("print('tool')\n")
+    helper = tmp_path / "helper.py"
+    helper.write_text("VALUE = 1\n")
+    module = types.ModuleType("_shared._test_helper")
+    module.__file__ = str(helper)
+    monkeypatch.setitem(sys.modules, "_shared._test_helper", module)
+
+    before = script_version(script)
+    assert OutputManifest("tool", str(script)).version == before
+    helper.write_text("VALUE = 2\n")
+    assert script_version(script) != before
+
+
+def test_concurrent_saves_keep_each_others_entries(tmp_path, monkeypatch):
+    script = tmp_path / "tool.py"
+    script.write_text("print('tool')\n")
+    read_entries = manifest_module._read_entries
+
+    def slow_read(path):
+        entries = read_entries(path)
+        time.sleep(0.05)  # widen the read-merge-replace window
+        return entries
+
+    monkeypatch.setattr(manifest_module, "_read_entries", slow_read)
+    manifests = []
+    for index in range(4):
+        source = tmp_path / f"in{index}.txt"
+        source.write_text(str(index))
+        output = tmp_path / f"out{index}.txt"
+        output.write_text(str(index))
+        manifest = OutputManifest("tool", str(script))
+        manifest.record(output, [source], {})
+        manifests.append(manifest)
+
+    threads = [threading.Thread(target=manifest.save) for manifest in manifests]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    entries = read_entries(str(tmp_path / manifest_module.MANIFEST_NAME))
+    assert sorted(entries) == [f"out{index}.txt" for index in range(4)]
+    assert not (tmp_path / f"{manifest_module.MANIFEST_NAME}.lock").exists()
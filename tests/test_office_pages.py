@@ -0,0 +1,46 @@
+import zipfile
+
+from _shared.office_pages import docx_saved_page_count, docx_word_count
+
+W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def _docx(path, words, saved_pages, saved_words=0, document=None):
+    if document is None:
+        paragraphs = "".join(
+            f'<w:p><w:r><w:t>{" ".join(["word"] * 100)}</w:t></w:r></w:p>' for _ in range(words // 100)
+        )
+        document = f'<w:document xmlns:w="{W}"><w:body>{paragraphs}</w:body></w:document>'
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("word/document.xml", document)
+        zf.writestr(
+            "docProps/app.xml",
+            f"<Properties><Pages>{saved_pages}</Pages><Words>{saved_words}</Words></Properties>",
+        )
+    return str(path)
+
+
+def _count(path):
+    """The callers' order: app.xml alone, then against the streamed word count."""
+    return docx_saved_page_count(path) or docx_saved_page_count(path, docx_word_count(path))
+
+
+def test_consistent_properties_skip_the_document_part(tmp_path):
+    # The document part is not even well-formed: it must not be read.
+    path = _docx(tmp_path / "a.docx", 0, 9, saved_words=3600, document="<broken")
+    assert docx_saved_page_count(path) == 9
+
+
+def test_saved_pages_checked_against_streamed_words_without_saved_words(tmp_path):
+    path = _docx(tmp_path / "a.docx", 3600, 9)
+    assert docx_saved_page_count(path) is None
+    assert _count(path) == 9
+    # Pictures and large fonts may spread few words over many pages.
+    assert _count(_docx(tmp_path / "b.docx", 100, 20)) == 20
+
+
+def test_stale_template_pages_ignored(tmp_path):
+    # A generator filled a one-page template with ~8 pages of text.
+    assert _count(_docx(tmp_path / "c.docx", 3600, 1)) is None
+    # Saved properties that disagree with each other are checked against the text.
+    assert _count(_docx(tmp_path / "d.docx", 3600, 1, saved_words=3600)) is None
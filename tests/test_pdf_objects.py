@@ -0,0 +1,23 @@
+from _shared.pdf_objects import XrefObjects, _parse_filters, count_pages, is_pages_node, load_objects
+
+from pdf_samples import object_stream_pdf
+
+
+def test_filter_name_may_follow_key_without_whitespace():
+    assert _parse_filters(b"<</Length 12/Filter/FlateDecode>>") == ["FlateDecode"]
+    assert _parse_filters(b"<</Filter[/ASCII85Decode/FlateDecode]>>") == ["ASCII85Decode", "FlateDecode"]
+    assert _parse_filters(b"<< /Filter /FlateDecode >>") == ["FlateDecode"]
+
+
+def test_load_objects_reads_compact_object_streams():
+    objects, catalog_ref = load_objects(object_stream_pdf(["a", "b", "c"]))
+    assert isinstance(objects, XrefObjects)
+    assert catalog_ref == (1, 0)
+    assert is_pages_node(objects[(2, 0)])
+    assert b"/Contents 6 0 R" in objects[(3, 0)].dict_part
+
+
+def test_count_pages_reads_compact_object_streams(tmp_path):
+    path = tmp_path / "objstm.pdf"
+    path.write_bytes(object_stream_pdf(["a", "b", "c", "d", "e"]))
+    assert count_pages(str(path)) == 5
@@ -0,0 +1,37 @@
+import scripts_pdf_slimmer_standalone as slimmer
+from _shared.pdf_objects import extract_ref, load_objects
+
+from pdf_samples import object_stream_pdf
+
+TEXTS = slimmer.SCRIPT_TEXTS["en"]
+
+
+def test_slims_object_stream_pdf(tmp_path):
+    source = tmp_path / "in.pdf"
+    source.write_bytes(object_stream_pdf(["alpha beta", "alpha beta gamma", "delta", "delta epsilon"]))
+    output = tmp_path / "out.pdf"
+
+    slimmer.slim_pdf(str(source), str(output), TEXTS)
+
+    objects, catalog_ref = load_objects(output.read_bytes())
+    pages_ref = extract_ref(objects[catalog_ref].dict_part, rb"/Pages")
+    pages_order, _, _ = slimmer.build_page_tree(objects, pages_ref)
+    assert [page["ref"] for page in pages_order] == [(4, 0), (6, 0)]
+
+
+def test_one_failing_file_does_not_abort_the_batch(tmp_path, monkeypatch, capsys):
+    files = [tmp_path / "bad.pdf", tmp_path / "good.pdf"]
+    for path in files:
+        path.write_bytes(b"%PDF-1.7\n")
+    processed = []
+
+    def fake_slim(input_path, *args):
+        if input_path.endswith("bad.pdf"):
+            raise KeyError((2, 0))
+        processed.append(input_path)
+
+    monkeypatch.setattr(slimmer, "slim_pdf", fake_slim)
+    slimmer._process_files([str(path) for path in files], TEXTS, None, None)
+
+    assert processed == [str(files[1])]
+    assert "KeyError" in capsys.readouterr().out
@@ -0,0 +1,22 @@
+import argparse
+
+import pytest
+
+from _shared.shards import add_shard_argument, select_shard
+
+
+def test_shards_cover_every_item_once_in_order():
+    items = list(range(10))
+    shards = [select_shard(items, (index, 3)) for index in range(1, 4)]
+    assert shards == [[0, 3, 6, 9], [1, 4, 7], [2, 5, 8]]
+    assert select_shard(items, None) is items
+
+
+def test_shard_argument_is_validated():
+    parser = argparse.ArgumentParser()
+    add_shard_argument(parser)
+    assert parser.parse_args(["--shard", "2/4"]).shard == (2, 4)
+    assert parser.parse_args([]).shard is None
+    for bad in ("0/2", "3/2", "x"):
+        with pytest.raises(SystemExit):
+            parser.parse_args(["--shard", bad])
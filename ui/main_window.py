@@ -5,9 +5,11 @@ ScriptGUI – the application's main window.
 ScriptGUI – 应用程序主窗口。
 
 Imports sub-components from:
-  core.executor        – ScriptExecutor
-  core.script_registry – scan / parse_params / extract_docstring
+  core.job_manager     – JobManager
+  core.script_registry – parse_params / extract_docstring
+  core.script_scanner  – ScriptScanner
   widgets.terminal     – EnhancedTerminalWidget
+  widgets.job_panel    – JobPanel
   widgets.dynamic_params – DynamicParamsWidget
 """
 
@@ -17,6 +19,7 @@ import platform
 import re
 import shlex
 import subprocess
+import time
 
 from PyQt6.QtCore import Qt, QProcess
 from PyQt6.QtGui import (
@@ -26,10 +29,10 @@ from PyQt6.QtGui import (
     QKeyEvent,
     QKeySequence,
     QPalette,
-    QTextCursor,
 )
 from PyQt6.QtWidgets import (
     QApplication,
+    QCheckBox,
     QFileDialog,
     QFrame,
     QHBoxLayout,
@@ -40,8 +43,8 @@ from PyQt6.QtWidgets import (
     QMainWindow,
     QMenu,
     QMessageBox,
-    QProgressBar,
     QPushButton,
+    QSpinBox,
     QSplitter,
     QTabWidget,
     QTextEdit,
@@ -49,11 +52,27 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
-from core.executor import ScriptExecutor
+from core.executor import (
+    DEFAULT_FLUSH_INTERVAL_MS,
+    DEFAULT_FLUSH_MAX_BYTES,
+    KILL_TIMEOUT_SECONDS,
+)
 from core.i18n import UI_TEXTS
+from core.job_manager import (
+    DEFAULT_MAX_CONCURRENT_JOBS,
+    JOB_RUNNING,
+    JOB_STOPPED,
+    Job,
+    JobManager,
+    shard_commands,
+    tag_lines,
+)
+from core.script_scanner import DEFAULT_MAX_WORKERS, ScriptScanner
 from core.utils import resource_path
 import core.script_registry as registry
 from widgets.dynamic_params import DynamicParamsWidget
+from widgets.job_panel import JobPanel
+from widgets.scrollback import DEFAULT_SCROLLBACK_LINES
 from widgets.terminal import EnhancedTerminalWidget
 
 
@@ -86,7 +105,20 @@ class ScriptGUI(QMainWindow):
         self.scripts_dir = scripts_dir
         self.current_script_path: str | None = None
         self.current_script_docstring: str = ""
-        self.script_executor: ScriptExecutor | None = None
+        self.job_manager = JobManager(
+            max_concurrent=self.config.getint(
+                "Preferences", "max_concurrent_jobs", fallback=DEFAULT_MAX_CONCURRENT_JOBS
+            ),
+            flush_interval_ms=self.config.getint(
+                "Preferences", "output_flush_ms", fallback=DEFAULT_FLUSH_INTERVAL_MS
+            ),
+            flush_max_bytes=self.config.getint(
+                "Preferences", "output_flush_bytes", fallback=DEFAULT_FLUSH_MAX_BYTES
+            ),
+            parent=self,
+        )
+        self.job_manager.job_state_changed.connect(self._on_job_state_changed)
+        self.script_scanner: ScriptScanner | None = None
         self.system_process: QProcess | None = None
         self.current_lang: str = "zh"
         self.undo_stack: list[list] = [[]]
@@ -103,6 +135,7 @@ class ScriptGUI(QMainWindow):
         # Build UI
         # ------------------------------------------------------------------
         self._init_ui()
+        self.job_manager.job_added.connect(self._on_job_added)
         self._create_actions()
         self.load_scripts()
         self._update_ui_language()
@@ -370,6 +403,27 @@ class ScriptGUI(QMainWindow):
         self.script_params = QLineEdit()
         params_layout.addWidget(self.params_label)
         params_layout.addWidget(self.script_params)
+
+        # Opt-in fan-out of the path list over several script processes,
+        # offered only for scripts that declare ``[parallel-shards]``.
+        # 可选：将路径列表分散到多个脚本进程中并行执行，仅对声明了
+        # ``[parallel-shards]`` 的脚本开放。
+        self.shards_checkbox = QCheckBox()
+        self.shards_checkbox.setEnabled(False)
+        self.shards_spinbox = QSpinBox()
+        self.shards_spinbox.setRange(2, max(2, os.cpu_count() or 2) * 2)
+        self.shards_spinbox.setValue(
+            self.config.getint(
+                "Preferences", "parallel_shards", fallback=min(4, os.cpu_count() or 2)
+            )
+        )
+        self.shards_spinbox.setEnabled(False)
+        self.shards_checkbox.toggled.connect(self._update_shards_state)
+        # Saved once editing ends (or a run starts), not on every spin step.
+        # 编辑结束（或开始运行）时保存，而非每次步进都保存。
+        self.shards_spinbox.editingFinished.connect(self._save_shard_preference)
+        params_layout.addWidget(self.shards_checkbox)
+        params_layout.addWidget(self.shards_spinbox)
         layout.addLayout(params_layout)
 
         # Run / Stop buttons -----------------------------------------
@@ -396,41 +450,41 @@ class ScriptGUI(QMainWindow):
         run_stop_layout.addWidget(self.stop_button)
         layout.addLayout(run_stop_layout)
 
-        # Progress bar -----------------------------------------------
-        self.progress_bar = QProgressBar()
-        self.progress_bar.setTextVisible(True)
-        self.progress_bar.setRange(0, 100)
-        self.progress_bar.setValue(0)
-        self.progress_bar.hide()
-
-        self.progress_label = QLabel("...")
-        self.progress_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.progress_label.hide()
-
-        layout.addWidget(self.progress_bar)
-        layout.addWidget(self.progress_label)
-
         # Output tabs ------------------------------------------------
         self.output_label = QLabel()
         self.tabs = QTabWidget()
 
-        self.console = QTextEdit()
-        self.console.setReadOnly(True)
-        self.console.setStyleSheet(
-            "background-color: #282c34; color: #abb2bf;"
-            " font-family: Consolas, 'Courier New', monospace;"
+        max_lines = self.config.getint(
+            "Preferences", "scrollback_lines", fallback=DEFAULT_SCROLLBACK_LINES
         )
+        # Job queue with one output pane, progress bar and stop button per job.
+        # 任务队列，每个任务都有各自的输出面板、进度条和停止按钮。
+        self.job_panel = JobPanel(self.job_manager, max_lines=max_lines)
 
-        self.terminal = EnhancedTerminalWidget()
+        self.terminal = EnhancedTerminalWidget(max_lines=max_lines)
+        self.terminal.set_scrollback(max_lines, self._scrollback_log_path("terminal"))
         self.terminal.command_entered.connect(self._handle_terminal_input)
 
-        self.tabs.addTab(self.console, "")
+        self.tabs.addTab(self.job_panel, "")
         self.tabs.addTab(self.terminal, "")
         layout.addWidget(self.output_label)
         layout.addWidget(self.tabs)
 
         return panel
 
+    def _scrollback_log_path(self, name: str) -> str | None:
+        """Return the spill-log path for the *name* view, or *None* if disabled.
+
+        Spilling is enabled by setting ``scrollback_log_dir`` in config.ini.
+
+        返回 *name* 视图的溢出日志路径；未启用时返回 None。
+        在 config.ini 中设置 ``scrollback_log_dir`` 即可启用。
+        """
+        log_dir = self.config.get("Preferences", "scrollback_log_dir", fallback="")
+        if not log_dir:
+            return None
+        return os.path.join(log_dir, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.log")
+
     def _create_actions(self) -> None:
         """Create global keyboard shortcuts (Undo / Redo).
 
@@ -464,18 +518,21 @@ class ScriptGUI(QMainWindow):
         self.script_info_label.setText(lang["script_info"])
         self.path_list_label.setText(lang["path_list_label"])
         self.run_button.setText(lang["run_button"])
-        self.stop_button.setText(lang.get("stop_button", "Stop Script"))
+        self.stop_button.setText(lang["stop_button"])
         self.browse_files_button.setText(lang["browse_files_button"])
         self.browse_dir_button.setText(lang["browse_dir_button"])
         self.params_label.setText(lang["params_label"])
+        self.shards_checkbox.setText(lang["parallel_shards_checkbox"])
+        self.shards_checkbox.setToolTip(lang["parallel_shards_tooltip"])
         self.script_params.setPlaceholderText(lang["params_placeholder"])
         self.output_label.setText(lang["output_label"])
-        self.tabs.setTabText(0, lang["stdout_tab"])
+        self.tabs.setTabText(0, lang["jobs_tab"])
         self.tabs.setTabText(1, lang["terminal_tab"])
-        self.statusBar().showMessage(lang["status_ready"])
+        self._update_job_status()
         self.switch_lang_button.setText(lang["switch_lang_button"])
         self.refresh_button.setToolTip(lang["refresh_button_tooltip"])
         self.terminal.set_language(self.current_lang)
+        self.job_panel.set_language(self.current_lang)
         self._update_script_list_display()
         self._update_remove_button_state()
         self._update_script_info_display()
@@ -510,19 +567,53 @@ class ScriptGUI(QMainWindow):
         self.current_script_path = None
         self.run_button.setEnabled(False)
         self.dynamic_params.clear()
+        self.shards_checkbox.setEnabled(False)
+        self._update_shards_state()
         self.load_scripts()
         self.statusBar().showMessage(UI_TEXTS[self.current_lang]["status_ready"], 2000)
 
     def load_scripts(self) -> None:
-        """Scan the scripts directory and populate the script list widget.
+        """Start a background scan that populates the script list incrementally.
+
+        The same scanner prefetches parameter schemas into the registry's
+        schema cache and, after the scan, parses scripts selected before
+        their prefetch finished (``_on_script_selected``).
 
-        扫描脚本目录并填充脚本列表控件。
+        启动后台扫描，逐步填充脚本列表。
+        同一扫描器还会把参数 schema 预取到注册表的缓存中，并在扫描结束后
+        解析预取尚未完成时就被选中的脚本（见 ``_on_script_selected``）。
         """
-        for info in registry.scan(self.scripts_dir):
-            item = QListWidgetItem()
-            item.setData(Qt.ItemDataRole.UserRole, info)
-            self.script_list.addItem(item)
-        self._update_script_list_display()
+        old_scanner = self.script_scanner
+        if old_scanner is not None:
+            old_scanner.cancel()
+            if old_scanner.isRunning():
+                old_scanner.finished.connect(old_scanner.deleteLater)
+            else:
+                old_scanner.deleteLater()
+        max_workers = self.config.getint(
+            "Preferences", "prefetch_workers", fallback=DEFAULT_MAX_WORKERS
+        )
+        # Parented to the window so Qt keeps the thread alive until it ends;
+        # it is kept (for request_schema) until the next scan replaces it.
+        # 以主窗口为父对象，确保线程结束前不会被 Qt 销毁；该对象会保留
+        # （供 request_schema 使用），直到下一次扫描将其替换。
+        scanner = ScriptScanner(self.scripts_dir, max_workers=max_workers, parent=self)
+        scanner.script_found.connect(self._on_script_found)
+        scanner.schema_ready.connect(self._on_schema_ready)
+        self.script_scanner = scanner
+        scanner.start()
+
+    def _on_script_found(self, info: dict) -> None:
+        """Append a newly discovered script to the list widget.
+
+        将新发现的脚本追加到列表控件。
+        """
+        if self.sender() is not self.script_scanner:
+            return  # Result from a cancelled scan / 来自已取消扫描的结果
+        item = QListWidgetItem()
+        item.setData(Qt.ItemDataRole.UserRole, info)
+        self._set_script_item_text(item)
+        self.script_list.addItem(item)
 
     def _update_script_list_display(self) -> None:
         """Update all list-item display texts to the current language.
@@ -530,13 +621,19 @@ class ScriptGUI(QMainWindow):
         将所有列表项的显示文字更新为当前语言。
         """
         for i in range(self.script_list.count()):
-            item = self.script_list.item(i)
-            data = item.data(Qt.ItemDataRole.UserRole)
-            if data:
-                display_name = (
-                    data["name_zh"] if self.current_lang == "zh" else data["name_en"]
-                )
-                item.setText(display_name)
+            self._set_script_item_text(self.script_list.item(i))
+
+    def _set_script_item_text(self, item: QListWidgetItem) -> None:
+        """Set *item*'s text to the script name in the current language.
+
+        将 *item* 的文字设置为当前语言下的脚本名称。
+        """
+        data = item.data(Qt.ItemDataRole.UserRole)
+        if data:
+            display_name = (
+                data["name_zh"] if self.current_lang == "zh" else data["name_en"]
+            )
+            item.setText(display_name)
 
     def _show_script_context_menu(self, position) -> None:
         """Show a context menu with 'Show in folder' for the right-clicked script.
@@ -597,13 +694,31 @@ class ScriptGUI(QMainWindow):
         """
         script_data = item.data(Qt.ItemDataRole.UserRole)
         self.current_script_path = script_data["path"]
+        self.shards_checkbox.setEnabled(script_data.get("parallel_shards", False))
+        self._update_shards_state()
         try:
             with open(self.current_script_path, "r", encoding="utf-8") as fh:
                 content = fh.read()
             self.current_script_docstring = registry.extract_docstring(content)
             self.run_button.setEnabled(True)
-            params = registry.parse_params(self.current_script_path)
-            self.dynamic_params.build_ui(params, self.current_lang)
+            # A cache hit (usually prefetched) is built at once.  A miss may
+            # spawn --gui-schema / --help, so it is parsed on the scanner's
+            # pool and the form is built in _on_schema_ready.
+            # 命中缓存（通常已预取）时立即构建表单。未命中时可能需要启动
+            # --gui-schema / --help，因此交给扫描器的线程池解析，表单在
+            # _on_schema_ready 中构建。
+            params = registry.cached_params(self.current_script_path)
+            if params is not None:
+                self.dynamic_params.build_ui(params, self.current_lang)
+            elif self.script_scanner is not None:
+                self.dynamic_params.show_placeholder(
+                    UI_TEXTS[self.current_lang]["params_loading"]
+                )
+                self.script_scanner.request_schema(self.current_script_path)
+            else:
+                self.dynamic_params.build_ui(
+                    registry.parse_params(self.current_script_path), self.current_lang
+                )
         except Exception as exc:  # noqa: BLE001
             self.current_script_docstring = (
                 f"{UI_TEXTS[self.current_lang]['info_read_error']}{exc}"
@@ -612,6 +727,19 @@ class ScriptGUI(QMainWindow):
             self.dynamic_params.clear()
         self._update_script_info_display()
 
+    def _on_schema_ready(self, script_path: str, params: list) -> None:
+        """Build the form once the selected script's schema arrives.
+
+        Prefetch results for other scripts only warm the cache.
+
+        所选脚本的 schema 到达后构建表单；其他脚本的预取结果仅用于预热缓存。
+        """
+        if self.sender() is not self.script_scanner:
+            return  # Result from a cancelled scan / 来自已取消扫描的结果
+        if script_path != self.current_script_path or not self.dynamic_params.is_placeholder():
+            return
+        self.dynamic_params.build_ui(params, self.current_lang)
+
     def _update_script_info_display(self) -> None:
         """Show the relevant language block of the script's docstring.
 
@@ -630,6 +758,9 @@ class ScriptGUI(QMainWindow):
                 selected_doc = chinese_doc if self.current_lang == "zh" else english_doc
                 display_text = re.sub(
                     r"\[display-name-..\](.*?)\n", "", selected_doc, count=2
+                )
+                display_text = display_text.replace(
+                    registry.PARALLEL_SHARDS_MARKER, ""
                 ).strip()
             except Exception as exc:  # noqa: BLE001
                 print(f"Error parsing docstring with '~~~': {exc}")
@@ -898,9 +1029,9 @@ class ScriptGUI(QMainWindow):
     # ==================================================================
 
     def _run_script(self) -> None:
-        """Assemble the command and launch the ScriptExecutor thread.
+        """Assemble the command and queue it as a new job.
 
-        组装命令并启动 ScriptExecutor 线程。
+        组装命令并将其作为新任务加入队列。
         """
         lang = UI_TEXTS[self.current_lang]
         if not self.current_script_path:
@@ -931,97 +1062,102 @@ class ScriptGUI(QMainWindow):
         if user_params:
             arguments.extend(shlex.split(user_params))
 
-        arguments.extend(paths)
-        command = [self.current_script_path] + arguments
+        shards = 1
+        if self.shards_checkbox.isEnabled() and self.shards_checkbox.isChecked():
+            shards = self.shards_spinbox.value()
+            self._save_shard_preference()
+        commands = shard_commands([self.current_script_path] + arguments, paths, shards)
 
-        self.console.clear()
-        self.run_button.setEnabled(False)
-        self.stop_button.setEnabled(True)
-        self.statusBar().showMessage(lang["status_running"])
+        item = self.script_list.currentItem()
+        title = item.text() if item else os.path.basename(self.current_script_path)
+        if len(commands) > 1:
+            title += f" ×{len(commands)}"
         self.tabs.setCurrentWidget(self.terminal)
-        self.progress_bar.hide()
-        self.progress_label.hide()
-        self.progress_bar.setValue(0)
-        self.progress_label.setText("...")
-
-        self.script_executor = ScriptExecutor(command)
-        self.script_executor.output_updated.connect(self._append_to_console)
-        self.script_executor.output_updated.connect(self.terminal.append_output)
-        self.script_executor.progress_updated.connect(self._update_progress_display)
-        self.script_executor.process_finished.connect(self._on_script_finished)
-        self.script_executor.start()
+
+        self.job_manager.submit(title, commands)
+
+    def _update_shards_state(self) -> None:
+        """Enable the shard count only while sharding applies / 仅在分片生效时启用分片数量"""
+        self.shards_spinbox.setEnabled(
+            self.shards_checkbox.isEnabled() and self.shards_checkbox.isChecked()
+        )
+
+    def _save_shard_preference(self) -> None:
+        """Persist the preferred shard count if it changed / 首选分片数量变化时将其持久化"""
+        value = str(self.shards_spinbox.value())
+        if self.config.get("Preferences", "parallel_shards", fallback=None) == value:
+            return
+        self.config.set("Preferences", "parallel_shards", value)
+        self._save_config()
+
+    def _on_job_added(self, job: Job) -> None:
+        """Show a new job in the panel and mirror its output to the terminal.
+
+        在面板中显示新任务，并将其输出镜像到终端。
+        """
+        self.job_panel.add_job(job, self._scrollback_log_path(f"job{job.job_id}"))
+        job.output_updated.connect(
+            lambda text, job_id=job.job_id: self._mirror_job_output(job_id, text)
+        )
+
+    def _mirror_job_output(self, job_id: int, text: str) -> None:
+        """Append a job's output to the terminal, tagging each line with its id.
+
+        将任务输出追加到终端，并为每行加上任务编号。
+        """
+        self.terminal.append_output(tag_lines(text, f"[#{job_id}] "))
 
     def _stop_script(self) -> None:
-        """Terminate the currently running script.
+        """Cancel all pending jobs and terminate all running ones.
 
-        终止当前正在运行的脚本。
+        取消所有排队任务并终止所有运行中的任务。
         """
-        if self.script_executor and self.script_executor.isRunning():
-            lang = UI_TEXTS[self.current_lang]
-            self.script_executor.terminate()
-            stop_msg = (
-                f"\n--- {lang.get('script_stopped_msg', 'Script execution stopped by user.')} ---\n"
-            )
-            self._append_to_console(stop_msg)
-            self.terminal.append_output(stop_msg)
-            self._on_script_finished(-1)
+        self.job_manager.stop_all()
 
-    def _on_script_finished(self, exit_code: int) -> None:
-        """Clean up and reset the UI after the script finishes.
+    def _on_job_state_changed(self, job: Job) -> None:
+        """Report finished jobs in the terminal and refresh the controls.
 
-        脚本结束后执行清理并重置 UI。
+        在终端中报告已结束的任务并刷新控件状态。
         """
         lang = UI_TEXTS[self.current_lang]
-        msg = lang["script_finished_msg"].format(exit_code=exit_code)
-        self._append_to_console(msg)
-        self.terminal.append_output(msg)
-        self.run_button.setEnabled(True)
-        self.stop_button.setEnabled(False)
-        self.statusBar().showMessage(lang["status_ready"])
-        self.progress_bar.hide()
-        self.progress_label.hide()
-        self.script_executor = None
+        if not job.is_active():
+            if job.state == JOB_STOPPED:
+                msg = f"[#{job.job_id}] {lang['script_stopped_msg'].strip()}\n"
+            else:
+                msg = f"[#{job.job_id}] " + lang["script_finished_msg"].format(
+                    exit_code=job.exit_code
+                ).strip() + "\n"
+            self.terminal.append_output(msg)
+        self._update_job_status()
 
-    def _append_to_console(self, text: str) -> None:
-        """Append *text* to the Standard Output tab.
+    def _update_job_status(self) -> None:
+        """Update the Stop button and status bar from the job queue.
 
-        将 *text* 追加到标准输出选项卡。
-        """
-        cursor = self.console.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.End)
-        self.console.setTextCursor(cursor)
-        self.console.insertPlainText(text)
-        self.console.ensureCursorVisible()
-
-    def _update_progress_display(
-        self, current_float: float, max_float: float, description: str
-    ) -> None:
-        """Update the progress bar from float progress values.
-
-        从浮点进度值更新进度条。
-        Maps floats to an integer scale to smooth out fractional steps.
-        将浮点数映射到整数刻度以平滑小数步长。
+        根据任务队列更新停止按钮和状态栏。
         """
-        if self.progress_bar.isHidden():
-            self.progress_bar.show()
-            self.progress_label.show()
-        max_int = int(max_float * 100)
-        current_int = int(current_float * 100)
-        self.progress_bar.setRange(0, max_int)
-        self.progress_bar.setValue(current_int)
-        self.progress_label.setText(description)
+        lang = UI_TEXTS[self.current_lang]
+        running = len(self.job_manager.running_jobs())
+        pending = len(self.job_manager.pending_jobs())
+        self.stop_button.setEnabled(bool(running or pending))
+        if running or pending:
+            self.statusBar().showMessage(
+                lang["status_jobs_running"].format(running=running, pending=pending)
+            )
+        else:
+            self.statusBar().showMessage(lang["status_ready"])
 
     # ==================================================================
     # Terminal / system-command handling
     # ==================================================================
 
     def _handle_terminal_input(self, text: str) -> None:
-        """Route user input to the running script or the system shell.
+        """Route user input to the selected running job or the system shell.
 
-        将用户输入路由到正在运行的脚本或系统 shell。
+        将用户输入路由到当前选中的运行中任务或系统 shell。
         """
-        if self.script_executor and self.script_executor.isRunning():
-            self.script_executor.send_input(text)
+        job = self.job_panel.current_job()
+        if job is not None and job.state == JOB_RUNNING:
+            job.send_input(text)
         else:
             self._execute_system_command(text)
 
@@ -1106,11 +1242,19 @@ class ScriptGUI(QMainWindow):
 
         窗口关闭前终止所有子进程。
         """
-        if self.script_executor and self.script_executor.isRunning():
-            self.script_executor.terminate()
+        if self.script_scanner is not None:
+            self.script_scanner.cancel()
+        self.job_manager.stop_all()
+        # Executor threads kill stragglers after KILL_TIMEOUT_SECONDS; wait for
+        # them so no QThread is destroyed while running.
+        # 执行器线程会在 KILL_TIMEOUT_SECONDS 秒后强制结束未退出的进程；等待它们
+        # 结束，避免 QThread 在运行中被销毁。
+        self.job_manager.wait_all((KILL_TIMEOUT_SECONDS + 1) * 1000)
         if (
             self.system_process
             and self.system_process.state() == QProcess.ProcessState.Running
         ):
             self.system_process.terminate()
+        self.job_panel.close_buffers()
+        self.terminal.output_display.buffer.close()
         event.accept()
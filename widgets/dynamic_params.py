@@ -29,6 +29,8 @@ class DynamicParamsWidget(QWidget):
     ----------
     build_ui(params, lang)  – populate the grid from a parameter list
     build_args()            – return a flat list of CLI argument strings
+    show_placeholder(text)  – show *text* while the parameters are being read
+    is_placeholder()        – whether the placeholder is showing
     clear()                 – remove all generated widgets
     """
 
@@ -38,6 +40,7 @@ class DynamicParamsWidget(QWidget):
         self._layout.setContentsMargins(0, 10, 0, 10)
         self._layout.setSpacing(10)
         self._param_widgets: list[QWidget] = []
+        self._placeholder: QLabel | None = None
         self.setVisible(False)
 
     # ------------------------------------------------------------------
@@ -158,6 +161,20 @@ class DynamicParamsWidget(QWidget):
                     args.extend([p_name, value])
         return args
 
+    def show_placeholder(self, text: str) -> None:
+        """Replace the form with a single *text* label until ``build_ui``.
+
+        在调用 ``build_ui`` 之前，以一行 *text* 标签代替表单。
+        """
+        self.clear()
+        self._placeholder = QLabel(text)
+        self._layout.addWidget(self._placeholder, 0, 0)
+        self.setVisible(True)
+
+    def is_placeholder(self) -> bool:
+        """Whether the placeholder is showing / 是否正在显示占位文字"""
+        return self._placeholder is not None
+
     def clear(self) -> None:
         """Remove all dynamically generated widgets and hide the panel.
 
@@ -168,6 +185,7 @@ class DynamicParamsWidget(QWidget):
             if item.widget():
                 item.widget().deleteLater()
         self._param_widgets = []
+        self._placeholder = None
         self.setVisible(False)
 
     # ------------------------------------------------------------------
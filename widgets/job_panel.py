@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+JobPanel – queue view plus one output pane per job.
+JobPanel – 任务队列视图，以及每个任务各自的输出面板。
+
+The upper half lists every job with its state (pending, running, finished,
+failed, stopped).  Selecting a row shows that job's ``JobPane`` below it:
+its own scrollback-limited output view, progress bar and stop button.
+
+上半部分列出所有任务及其状态（排队、运行中、已完成、失败、已停止）。
+选中某一行后，下方显示该任务的 ``JobPane``：独立的受限回滚输出视图、
+进度条和停止按钮。
+"""
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import (
+    QHBoxLayout,
+    QLabel,
+    QProgressBar,
+    QPushButton,
+    QSplitter,
+    QStackedWidget,
+    QTreeWidget,
+    QTreeWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from core.i18n import UI_TEXTS
+from core.job_manager import JOB_FAILED, JOB_FINISHED, JOB_STOPPED, Job, JobManager
+from widgets.scrollback import DEFAULT_SCROLLBACK_LINES, ScrollbackView
+
+# Queue view columns / 队列视图的列
+_COL_ID, _COL_SCRIPT, _COL_STATUS = range(3)
+
+
+class JobPane(QWidget):
+    """Output view, progress bar and stop button for a single job.
+
+    单个任务的输出视图、进度条和停止按钮。
+    """
+
+    def __init__(
+        self,
+        job: Job,
+        max_lines: int = DEFAULT_SCROLLBACK_LINES,
+        spill_path: str | None = None,
+        parent: QWidget | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.job = job
+        self.current_lang = "zh"
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        header_layout = QHBoxLayout()
+        self.title_label = QLabel()
+        self.stop_button = QPushButton()
+        self.stop_button.clicked.connect(job.stop)
+        header_layout.addWidget(self.title_label)
+        header_layout.addStretch()
+        header_layout.addWidget(self.stop_button)
+        layout.addLayout(header_layout)
+
+        self.output = ScrollbackView(max_lines, spill_path)
+        self.output.setStyleSheet(
+            "background-color: #282c34; color: #abb2bf;"
+            " font-family: Consolas, 'Courier New', monospace;"
+        )
+        layout.addWidget(self.output)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setTextVisible(True)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(0)
+        self.progress_bar.hide()
+
+        self.progress_label = QLabel("...")
+        self.progress_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.progress_label.hide()
+
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.progress_label)
+
+        job.output_updated.connect(self.output.append_text)
+        job.progress_updated.connect(self._update_progress)
+        job.state_changed.connect(self._on_state_changed)
+
+    def set_language(self, lang: str) -> None:
+        self.current_lang = lang
+        self.title_label.setText(f"#{self.job.job_id}  {self.job.title}")
+        self.stop_button.setText(UI_TEXTS[lang]["stop_job_button"])
+        self.stop_button.setEnabled(self.job.is_active())
+
+    def _update_progress(
+        self, current_float: float, max_float: float, description: str
+    ) -> None:
+        """Update the progress bar from float progress values.
+
+        从浮点进度值更新进度条。
+        """
+        if self.progress_bar.isHidden():
+            self.progress_bar.show()
+            self.progress_label.show()
+        self.progress_bar.setRange(0, int(max_float * 100))
+        self.progress_bar.setValue(int(current_float * 100))
+        self.progress_label.setText(description)
+
+    def _on_state_changed(self, state: str) -> None:
+        lang = UI_TEXTS[self.current_lang]
+        if state in (JOB_FINISHED, JOB_FAILED):
+            self.output.append_text(
+                lang["script_finished_msg"].format(exit_code=self.job.exit_code)
+            )
+        elif state == JOB_STOPPED:
+            self.output.append_text(f"\n--- {lang['script_stopped_msg'].strip()} ---\n")
+        if not self.job.is_active():
+            self.stop_button.setEnabled(False)
+            self.progress_bar.hide()
+            self.progress_label.hide()
+
+
+class JobPanel(QWidget):
+    """Queue view of all jobs with a stacked per-job output pane.
+
+    所有任务的队列视图，以及按任务切换的输出面板。
+
+    Public API
+    ----------
+    add_job(job, spill_path)   – show a newly submitted job
+    current_job()              – the job whose pane is visible
+    set_language(lang)         – re-translate all texts
+    close_buffers()            – close every pane's spill file
+    """
+
+    def __init__(
+        self,
+        manager: JobManager,
+        max_lines: int = DEFAULT_SCROLLBACK_LINES,
+        parent: QWidget | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.manager = manager
+        self.max_lines = max_lines
+        self.current_lang = "zh"
+        # Per-job widgets keyed by job id / 以任务 id 为键的各任务控件
+        self._items: dict[int, QTreeWidgetItem] = {}
+        self._panes: dict[int, JobPane] = {}
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        layout.addWidget(splitter)
+
+        queue_widget = QWidget()
+        queue_layout = QVBoxLayout(queue_widget)
+        queue_layout.setContentsMargins(0, 0, 0, 0)
+        header_layout = QHBoxLayout()
+        self.queue_label = QLabel()
+        self.clear_button = QPushButton()
+        self.clear_button.clicked.connect(self._clear_finished)
+        header_layout.addWidget(self.queue_label)
+        header_layout.addStretch()
+        header_layout.addWidget(self.clear_button)
+        queue_layout.addLayout(header_layout)
+
+        self.queue_view = QTreeWidget()
+        self.queue_view.setColumnCount(3)
+        self.queue_view.setRootIsDecorated(False)
+        self.queue_view.setAlternatingRowColors(True)
+        self.queue_view.currentItemChanged.connect(self._on_current_item_changed)
+        queue_layout.addWidget(self.queue_view)
+
+        self.pane_stack = QStackedWidget()
+        splitter.addWidget(queue_widget)
+        splitter.addWidget(self.pane_stack)
+        splitter.setSizes([120, 400])
+
+        manager.job_state_changed.connect(self._on_job_state_changed)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def add_job(self, job: Job, spill_path: str | None = None) -> None:
+        """Add a row and an output pane for *job* and select it.
+
+        为 *job* 添加一行及输出面板，并选中它。
+        """
+        pane = JobPane(job, self.max_lines, spill_path)
+        pane.set_language(self.current_lang)
+        self.pane_stack.addWidget(pane)
+        self._panes[job.job_id] = pane
+
+        item = QTreeWidgetItem()
+        item.setData(_COL_ID, Qt.ItemDataRole.UserRole, job.job_id)
+        self._items[job.job_id] = item
+        self._update_item(job)
+        self.queue_view.addTopLevelItem(item)
+        self.queue_view.setCurrentItem(item)
+
+    def current_job(self) -> Job | None:
+        pane = self.pane_stack.currentWidget()
+        return pane.job if isinstance(pane, JobPane) else None
+
+    def set_language(self, lang: str) -> None:
+        self.current_lang = lang
+        texts = UI_TEXTS[lang]
+        self.queue_label.setText(texts["job_queue_label"])
+        self.clear_button.setText(texts["clear_finished_button"])
+        self.queue_view.setHeaderLabels(
+            [texts["job_col_id"], texts["job_col_script"], texts["job_col_status"]]
+        )
+        for pane in self._panes.values():
+            pane.set_language(lang)
+            self._update_item(pane.job)
+
+    def close_buffers(self) -> None:
+        for pane in self._panes.values():
+            pane.output.buffer.close()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _update_item(self, job: Job) -> None:
+        item = self._items.get(job.job_id)
+        if item is None:
+            return
+        item.setText(_COL_ID, str(job.job_id))
+        item.setText(_COL_SCRIPT, job.title)
+        item.setText(_COL_STATUS, UI_TEXTS[self.current_lang][f"job_status_{job.state}"])
+
+    def _on_job_state_changed(self, job: Job) -> None:
+        self._update_item(job)
+
+    def _on_current_item_changed(self, current: QTreeWidgetItem | None, _previous) -> None:
+        if current is None:
+            return
+        pane = self._panes.get(current.data(_COL_ID, Qt.ItemDataRole.UserRole))
+        if pane is not None:
+            self.pane_stack.setCurrentWidget(pane)
+
+    def _clear_finished(self) -> None:
+        """Remove rows and panes of jobs that have ended.
+
+        移除已结束任务的行和输出面板。
+        """
+        for job in self.manager.clear_finished():
+            item = self._items.pop(job.job_id, None)
+            if item is not None:
+                self.queue_view.takeTopLevelItem(self.queue_view.indexOfTopLevelItem(item))
+            pane = self._panes.pop(job.job_id, None)
+            if pane is not None:
+                pane.output.buffer.close()
+                self.pane_stack.removeWidget(pane)
+                pane.deleteLater()
+            job.deleteLater()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ScrollbackView – a read-only output view with a bounded line history.
+ScrollbackView – 具有有界行历史的只读输出视图。
+
+The view keeps at most ``max_lines`` lines.  Lines are stored in a ring buffer
+(``ScrollbackBuffer``) and rendered by a ``QPlainTextEdit`` with a matching
+``maximumBlockCount``, which lays out only the visible blocks and drops the
+oldest block in O(1).  The cost of an insert therefore stays flat no matter
+how long the session runs.  Evicted lines can optionally be spilled to a log
+file on disk.
+
+视图最多保留 ``max_lines`` 行。各行存储在环形缓冲区（``ScrollbackBuffer``）中，
+并由设置了相同 ``maximumBlockCount`` 的 ``QPlainTextEdit`` 渲染；后者只对可见块
+进行布局，并以 O(1) 代价丢弃最旧的块，因此无论会话多长，每次插入的开销都保持
+不变。被淘汰的行可选择性地写入磁盘日志文件。
+"""
+
+import os
+from collections import deque
+from typing import TextIO
+
+from PyQt6.QtGui import QTextCursor
+from PyQt6.QtWidgets import QPlainTextEdit, QWidget
+
+# Default number of lines kept in a view's scrollback.
+# 视图回滚历史默认保留的行数。
+DEFAULT_SCROLLBACK_LINES = 10000
+
+
+class ScrollbackBuffer:
+    """Ring buffer of output lines with optional spill-to-disk of evicted lines.
+
+    输出行的环形缓冲区，可选择将被淘汰的行写入磁盘。
+
+    Text is fed in arbitrary chunks; the last, unterminated line is kept as
+    ``partial`` until its newline arrives.
+
+    文本可以任意分块输入；最后一个未以换行结尾的行会作为 ``partial`` 保留，
+    直到其换行符到达。
+    """
+
+    def __init__(self, max_lines: int = DEFAULT_SCROLLBACK_LINES, spill_path: str | None = None) -> None:
+        self.lines: deque[str] = deque(maxlen=max(1, max_lines))
+        self.partial = ""
+        self.spill_path = spill_path
+        self._spill_file: TextIO | None = None
+
+    @property
+    def max_lines(self) -> int:
+        return self.lines.maxlen or 1
+
+    def feed(self, text: str) -> None:
+        """Append *text*, completing lines at each ``\\n``.
+
+        追加 *text*，在每个 ``\\n`` 处结束一行。
+        """
+        parts = text.split("\n")
+        self.partial += parts[0]
+        for part in parts[1:]:
+            self._push(self.partial)
+            self.partial = part
+
+    def replace_partial(self, text: str) -> None:
+        """Overwrite the unterminated last line (carriage-return semantics).
+
+        覆盖最后一个未结束的行（回车符语义）。
+        """
+        self.partial = text
+
+    def clear(self) -> None:
+        """Drop all lines; spilled history stays on disk.
+
+        清空所有行；已写入磁盘的历史保持不变。
+        """
+        self.lines.clear()
+        self.partial = ""
+        if self._spill_file is not None:
+            self._spill_file.flush()
+
+    def set_max_lines(self, max_lines: int) -> None:
+        """Change the capacity, spilling lines that no longer fit.
+
+        修改容量，并将放不下的行写入磁盘。
+        """
+        max_lines = max(1, max_lines)
+        while len(self.lines) > max_lines:
+            self._spill(self.lines.popleft())
+        self.lines = deque(self.lines, maxlen=max_lines)
+
+    def set_spill_path(self, spill_path: str | None) -> None:
+        """Set (or disable with *None*) the log file for evicted lines.
+
+        设置被淘汰行的日志文件（传入 None 则禁用）。
+        """
+        self.close()
+        self.spill_path = spill_path
+
+    def close(self) -> None:
+        """Close the spill file if it is open / 若日志文件已打开则关闭"""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def text(self) -> str:
+        """Return the retained history as one string / 以单个字符串返回保留的历史"""
+        return "".join(line + "\n" for line in self.lines) + self.partial
+
+    def _push(self, line: str) -> None:
+        if len(self.lines) == self.max_lines:
+            self._spill(self.lines[0])
+        self.lines.append(line)
+
+    def _spill(self, line: str) -> None:
+        if not self.spill_path:
+            return
+        if self._spill_file is None:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.spill_path)), exist_ok=True)
+                self._spill_file = open(self.spill_path, "a", encoding="utf-8")
+            except OSError as exc:
+                print(f"Could not open scrollback log {self.spill_path}: {exc}")
+                self.spill_path = None
+                return
+        self._spill_file.write(line + "\n")
+
+
+class ScrollbackView(QPlainTextEdit):
+    """Read-only, scrollback-limited text view backed by ``ScrollbackBuffer``.
+
+    由 ``ScrollbackBuffer`` 支撑、回滚历史受限的只读文本视图。
+
+    Public API
+    ----------
+    append_text(text)             – insert *text* verbatim at the end
+    append_lines(text)            – terminal-style insert (skips blank lines,
+                                    ``\\r``-terminated lines overwrite in place)
+    clear()                       – drop the visible history
+    set_max_lines(n)              – change the scrollback cap
+    set_spill_path(path)          – enable/disable the evicted-line log file
+    """
+
+    def __init__(
+        self,
+        max_lines: int = DEFAULT_SCROLLBACK_LINES,
+        spill_path: str | None = None,
+        parent: QWidget | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.buffer = ScrollbackBuffer(max_lines, spill_path)
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        # One extra block for the unterminated line after the last newline.
+        # 为最后一个换行符之后的未结束行额外预留一个块。
+        self.setMaximumBlockCount(self.buffer.max_lines + 1)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def append_text(self, text: str) -> None:
+        """Insert *text* verbatim at the end of the view.
+
+        将 *text* 原样插入视图末尾。
+        """
+        if not text:
+            return
+        self.buffer.feed(text)
+        cursor = self._end_cursor()
+        cursor.insertText(text)
+        self._scroll_to_end()
+
+    def append_lines(self, text: str) -> None:
+        """Insert *text* line by line with terminal semantics.
+
+        Empty lines are skipped and a line ending in ``\\r`` overwrites the
+        current line in place (progress bars).
+
+        按终端语义逐行插入 *text*：跳过空行，以 ``\\r`` 结尾的行原地覆盖当前行
+        （用于进度条）。
+        """
+        cursor = self._end_cursor()
+        for line in text.replace("\r\n", "\n").split("\n"):
+            if not line:
+                continue
+            if line.endswith("\r"):
+                cursor.movePosition(
+                    QTextCursor.MoveOperation.StartOfBlock,
+                    QTextCursor.MoveMode.KeepAnchor,
+                )
+                cursor.insertText(line[:-1])
+                self.buffer.replace_partial(line[:-1])
+            else:
+                cursor.insertText(line + "\n")
+                self.buffer.feed(line + "\n")
+        self._scroll_to_end()
+
+    def clear(self) -> None:  # type: ignore[override]
+        """Clear the view and its buffer / 清空视图及其缓冲区"""
+        self.buffer.clear()
+        super().clear()
+
+    def set_max_lines(self, max_lines: int) -> None:
+        """Change the scrollback cap / 修改回滚历史上限"""
+        self.buffer.set_max_lines(max_lines)
+        self.setMaximumBlockCount(self.buffer.max_lines + 1)
+
+    def set_spill_path(self, spill_path: str | None) -> None:
+        """Enable (path) or disable (*None*) spilling evicted lines to disk.
+
+        启用（传入路径）或禁用（传入 None）将被淘汰的行写入磁盘。
+        """
+        self.buffer.set_spill_path(spill_path)
+
+    # ------------------------------------------------------------------
+    # Private helpers
+    # ------------------------------------------------------------------
+
+    def _end_cursor(self) -> QTextCursor:
+        # A private cursor leaves the user's selection untouched.
+        # 使用独立光标，不影响用户的选区。
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        return cursor
+
+    def _scroll_to_end(self) -> None:
+        scroll_bar = self.verticalScrollBar()
+        scroll_bar.setValue(scroll_bar.maximum())
@@ -9,10 +9,11 @@ EnhancedTerminalWidget – 显示脚本输出并接受交互输入的终端风
 import os
 
 from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QKeyEvent, QPalette, QTextCursor
-from PyQt6.QtWidgets import QHBoxLayout, QLabel, QLineEdit, QTextEdit, QVBoxLayout, QWidget
+from PyQt6.QtGui import QKeyEvent, QPalette
+from PyQt6.QtWidgets import QHBoxLayout, QLabel, QLineEdit, QVBoxLayout, QWidget
 
 from core.i18n import UI_TEXTS
+from widgets.scrollback import DEFAULT_SCROLLBACK_LINES, ScrollbackView
 
 
 class EnhancedTerminalWidget(QWidget):
@@ -25,18 +26,18 @@ class EnhancedTerminalWidget(QWidget):
     # 用户在输入行按下 Enter 时发出。
     command_entered = pyqtSignal(str)
 
-    def __init__(self, parent=None) -> None:
+    def __init__(self, parent=None, max_lines: int = DEFAULT_SCROLLBACK_LINES) -> None:
         super().__init__(parent)
         self.history: list[str] = []
         self.history_index: int = 0
         self.current_lang: str = "zh"
-        self._init_ui()
+        self._init_ui(max_lines)
 
     # ------------------------------------------------------------------
     # Setup
     # ------------------------------------------------------------------
 
-    def _init_ui(self) -> None:
+    def _init_ui(self, max_lines: int) -> None:
         """Build the widget's internal layout.
 
         构建控件内部布局。
@@ -44,8 +45,9 @@ class EnhancedTerminalWidget(QWidget):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
 
-        self.output_display = QTextEdit()
-        self.output_display.setReadOnly(True)
+        # Scrollback-limited view – memory and insert cost stay bounded.
+        # 回滚历史受限的视图 – 内存与插入开销保持有界。
+        self.output_display = ScrollbackView(max_lines)
 
         input_layout = QHBoxLayout()
         self.prompt_label = QLabel("$")
@@ -80,26 +82,15 @@ class EnhancedTerminalWidget(QWidget):
 
         将 *text* 追加到显示区，智能处理 ``\\r`` 以支持进度条等原地更新。
         """
-        cursor = self.output_display.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.End)
-        self.output_display.setTextCursor(cursor)
-
-        lines = text.replace("\r\n", "\n").split("\n")
-        for line in lines:
-            if not line:
-                continue
-            if line.endswith("\r"):
-                cursor.movePosition(QTextCursor.MoveOperation.StartOfLine)
-                cursor.movePosition(
-                    QTextCursor.MoveOperation.EndOfLine,
-                    QTextCursor.MoveMode.KeepAnchor,
-                )
-                cursor.removeSelectedText()
-                cursor.insertText(line[:-1])
-            else:
-                cursor.insertText(line + "\n")
+        self.output_display.append_lines(text)
+
+    def set_scrollback(self, max_lines: int, spill_path: str | None = None) -> None:
+        """Set the scrollback cap and the optional log file for evicted lines.
 
-        self.output_display.ensureCursorVisible()
+        设置回滚历史上限，以及可选的被淘汰行日志文件。
+        """
+        self.output_display.set_max_lines(max_lines)
+        self.output_display.set_spill_path(spill_path)
 
     def apply_theme(self) -> None:
         """Re-apply theme-aware stylesheets to the terminal sub-widgets.